@@ -0,0 +1,198 @@
+"""
+Stub yt-dlp for the benchmarks.
+
+Understands the subset of yt-dlp that SeaDog uses, against URLs served by
+benchmarks.media_server:
+
+    --flat-playlist -j URL                  stream playlist entries (or the single video's info)
+    --flat-playlist -J [--playlist-items 1] URL
+    [options] -o TEMPLATE URL               download: URL.part -> final file, progress
+                                            lines in --progress-template format if given
+
+--write-info-json and --write-thumbnail write NAME.info.json and a small
+NAME.jpg next to the download. Other options are accepted and ignored. With
+-x, post-processing is simulated by sleeping SEADOG_BENCH_PP_SECONDS
+(default 0) between "started" and "finished" postprocess lines.
+"""
+
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+# options that take a value (so their value is not mistaken for the URL)
+_VALUE_OPTIONS = {
+    "-o", "--output", "-f", "--format", "--audio-format", "--progress-template",
+    "--playlist-items", "--download-archive", "--concurrent-fragments", "-N",
+    "--downloader", "--downloader-args", "--sleep-interval", "--extractor-args",
+    "--cookies", "--cookies-from-browser", "--ffmpeg-location", "--retries",
+}
+
+
+def parse_args(argv):
+    flags, values, positional = set(), {}, []
+    it = iter(argv)
+    for arg in it:
+        if arg in _VALUE_OPTIONS:
+            values.setdefault(arg, []).append(next(it, ""))
+        elif arg.startswith("-"):
+            flags.add(arg)
+        else:
+            positional.append(arg)
+    return flags, values, positional
+
+
+def iter_listing(url):
+    """Entries of a /playlist/ URL as they arrive, or None for a media URL."""
+    if "/playlist/" not in urlsplit(url).path:
+        return None
+
+    def gen():
+        with urllib.request.urlopen(url) as response:
+            for line in response:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    return gen()
+
+
+def single_info(url):
+    video_id = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return {"_type": "video", "id": video_id, "title": video_id, "extractor_key": "Generic", "webpage_url": url}
+
+
+def probe(url, flags, values):
+    entries = iter_listing(url)
+    if "-j" in flags:
+        for record in entries if entries is not None else [single_info(url)]:
+            print(json.dumps(record), flush=True)
+        return 0
+
+    if entries is None:
+        print(json.dumps(single_info(url)))
+        return 0
+    limit = int(values["--playlist-items"][-1]) if "--playlist-items" in values else None
+    listed = []
+    for entry in entries:
+        listed.append(entry)
+        if limit is not None and len(listed) >= limit:
+            break
+    first = listed[0] if listed else {}
+    print(json.dumps({
+        "_type": "playlist",
+        "id": first.get("playlist_id"),
+        "title": first.get("playlist"),
+        "extractor_key": "Generic",
+        "playlist_count": first.get("playlist_count", len(listed)),
+        "entries": listed,
+    }))
+    return 0
+
+
+def progress_prefixes(values):
+    """{"download": prefix, "postprocess": prefix} taken from --progress-template values."""
+    prefixes = {}
+    for template in values.get("--progress-template", []):
+        kind, _, text = template.partition(":")
+        prefixes[kind] = text.split("{", 1)[0]
+    return prefixes
+
+
+def download(url, flags, values, index=None):
+    info = single_info(url)
+    video_id = info["id"]
+    template = (values.get("-o") or values.get("--output") or ["%(title)s.%(ext)s"])[-1]
+    ext = "mp3" if "-x" in flags else "mp4"
+    final = os.path.join(os.path.dirname(template), f"{index if index is not None else 'NA'} - {video_id}.{ext}")
+    part = final + ".part"
+    prefixes = progress_prefixes(values)
+
+    def report(status, done, total, speed):
+        if "download" in prefixes:
+            progress = {
+                "status": status, "downloaded_bytes": done, "total_bytes": total,
+                "speed": speed, "eta": (total - done) / speed if speed else None,
+                "tmpfilename": part, "filename": final,
+            }
+            print(prefixes["download"] + json.dumps({"phase": "download", "id": video_id, "progress": progress}), flush=True)
+        else:
+            print(f"[download] {100.0 * done / total if total else 0:5.1f}% of {total} bytes", flush=True)
+
+    start = os.path.getsize(part) if os.path.exists(part) else 0
+    request = urllib.request.Request(url, headers={"Range": f"bytes={start}-"} if start else {})
+    try:
+        response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+        print(f"ERROR: [generic] {video_id}: HTTP Error {e.code}: {e.reason}", flush=True)
+        return 1
+
+    print(f"[download] Destination: {part}", flush=True)
+    total = start + int(response.headers.get("Content-Length") or 0)
+    done = start
+    began = last_report = time.monotonic()
+    report("downloading", done, total, None)
+    with response, open(part, "ab" if start else "wb") as f:
+        while True:
+            chunk = response.read(64 * 1024)
+            if not chunk:
+                break
+            f.write(chunk)
+            done += len(chunk)
+            now = time.monotonic()
+            if now - last_report >= 0.1:
+                last_report = now
+                report("downloading", done, total, (done - start) / max(now - began, 1e-6))
+    report("finished", done, total, (done - start) / max(time.monotonic() - began, 1e-6))
+    os.replace(part, final)
+
+    root = os.path.splitext(final)[0]
+    if "--write-info-json" in flags:
+        with open(root + ".info.json", "w", encoding="utf-8") as f:
+            json.dump({**info, "playlist_index": index, "uploader": "Bench Artist", "upload_date": "20240101"}, f)
+    if "--write-thumbnail" in flags:
+        with open(root + ".jpg", "wb") as f:
+            f.write(b"\xff\xd8\xff\xe0" + b"\0" * 2048 + b"\xff\xd9")
+
+    pp_seconds = float(os.environ.get("SEADOG_BENCH_PP_SECONDS", "0") or 0)
+    if "-x" not in flags:
+        return 0
+    if "postprocess" in prefixes:
+        for status in ("started", "finished"):
+            progress = {"status": status, "postprocessor": "ExtractAudio" if ext == "mp3" else "Merger"}
+            print(prefixes["postprocess"] + json.dumps({"phase": "postprocess", "id": video_id, "progress": progress}), flush=True)
+            if status == "started" and pp_seconds:
+                time.sleep(pp_seconds)
+    elif pp_seconds:
+        time.sleep(pp_seconds)
+    return 0
+
+
+def main(argv=None):
+    flags, values, positional = parse_args(sys.argv[1:] if argv is None else argv)
+    if "--version" in flags:
+        print("2099.01.01 (seadog benchmark stub)")
+        return 0
+    if not positional:
+        print("ERROR: no URL given", file=sys.stderr)
+        return 2
+    url = positional[-1]
+
+    try:
+        if "--flat-playlist" in flags:
+            return probe(url, flags, values)
+        entries = iter_listing(url)
+        if entries is None:
+            return download(url, flags, values)
+        results = [download(e["url"], flags, values, e.get("playlist_index")) for e in entries]
+        return 1 if any(results) else 0
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", flush=True)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Local HTTP server with synthetic playlists and media for the benchmarks.
+
+URLs (all parameters optional):
+
+    /playlist/<name>?n=20&size=2097152&latency=0&rate=0&entry_latency=0.005&duration=0
+        One JSON entry per line, flat-playlist style, `entry_latency` seconds
+        apart. Entry URLs point at /media/ with the same size/latency/rate.
+        Entries report `duration` seconds when it is given.
+
+    /media/<id>?size=2097152&latency=0&rate=0
+        `size` bytes of filler after `latency` seconds, sent at `rate`
+        bytes/second (0 = as fast as possible). Honours "Range: bytes=N-" so
+        an interrupted download can continue.
+
+Usage (example):
+    from benchmarks.media_server import MediaServer
+
+    with MediaServer() as server:
+        url = server.playlist_url("pl", n=50, size=1 << 20)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+CHUNK = 64 * 1024
+_FILLER = b"\0" * CHUNK
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        kind, _, name = parts.path.strip("/").partition("/")
+        try:
+            if kind == "playlist":
+                self._playlist(name, params)
+            elif kind == "media":
+                self._media(name, params)
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            # client went away (cancelled download); nothing to clean up
+            pass
+
+    def _playlist(self, name, params):
+        n = int(params.get("n", 20))
+        entry_latency = float(params.get("entry_latency", 0))
+        duration = float(params.get("duration", 0))
+        media_query = urlencode({k: params[k] for k in ("size", "latency", "rate") if k in params})
+        host = f"http://{self.headers.get('Host')}"
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for i in range(1, n + 1):
+            video_id = f"{name}-{i:05d}"
+            entry = {
+                "_type": "url",
+                "ie_key": "Generic",
+                "id": video_id,
+                "title": video_id,
+                "url": f"{host}/media/{video_id}?{media_query}",
+                "playlist_id": name,
+                "playlist": name,
+                "playlist_index": i,
+                "playlist_count": n,
+            }
+            if duration:
+                entry["duration"] = duration
+            self.wfile.write((json.dumps(entry) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if entry_latency:
+                time.sleep(entry_latency)
+        self.close_connection = True
+
+    def _media(self, name, params):
+        size = int(params.get("size", 2 * 1024 * 1024))
+        latency = float(params.get("latency", 0))
+        rate = float(params.get("rate", 0))
+
+        start = 0
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            start = min(size, int(range_header[6:].split("-")[0] or 0))
+
+        if latency:
+            time.sleep(latency)
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.end_headers()
+
+        sent = 0
+        began = time.monotonic()
+        remaining = size - start
+        while remaining > 0:
+            n = min(CHUNK, remaining)
+            self.wfile.write(_FILLER[:n])
+            remaining -= n
+            sent += n
+            if rate:
+                ahead = sent / rate - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def log_message(self, *args):
+        pass
+
+
+class MediaServer:
+    """The benchmark server, run from a daemon thread on a free local port."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-media", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def playlist_url(self, name: str, **params) -> str:
+        return f"{self.base_url}/playlist/{name}?{urlencode(params)}"
+
+    def media_url(self, name: str, **params) -> str:
+        return f"{self.base_url}/media/{name}?{urlencode(params)}"
+
+    def start(self) -> "MediaServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,340 @@
+"""
+SeaDog engine benchmarks (offline, reproducible).
+
+A stub yt-dlp (benchmarks/fake_ytdlp.py) is put first on PATH and downloads
+synthetic playlists from a local HTTP server (benchmarks/media_server.py),
+so the real Downloader code paths run without network access or the real
+yt-dlp. Measured:
+
+- probe:    time to the first playlist entry and to the full listing
+- download: Downloader wall time and throughput per playlist size and concurrency
+- cancel:   stop() -> job finished latency, plus leftover .part files / processes
+- log_sink: cost of BufferedLogSink.append() from worker threads (needs PyQt5)
+
+Results are printed as one JSON document (or written with --output) for
+regression tracking; a short text summary goes to stderr.
+
+Usage (example):
+    python -m benchmarks.run
+    python -m benchmarks.run --items 1,10,50 --concurrency 1,4 --repeat 3 --output bench.json
+    python -m benchmarks.run --only download --item-size 8388608 --rate 4194304
+
+Linux/macOS only (the stub is started through a small shell shim).
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.media_server import MediaServer  # noqa: E402
+
+BENCHMARKS = ("probe", "download", "cancel", "log_sink")
+
+
+# -----------------
+# Environment
+# -----------------
+def install_stub(bin_dir: Path):
+    """Put a `yt-dlp` shim that runs fake_ytdlp.py first on PATH (inherited by subprocesses)."""
+    shim = bin_dir / "yt-dlp"
+    stub = Path(__file__).resolve().parent / "fake_ytdlp.py"
+    shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{stub}" "$@"\n')
+    shim.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=False
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _running_processes(marker: str) -> int:
+    """Processes whose command line mentions `marker` (Linux /proc only; -1 if unknown)."""
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return -1
+    count = 0
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            if marker in (entry / "cmdline").read_bytes().decode("utf-8", "replace"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def _summary(values):
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+        "runs": [round(v, 6) for v in values],
+    }
+
+
+# -----------------
+# Benchmarks
+# -----------------
+def bench_probe(server, args):
+    from engine.downloader import Downloader
+
+    results = []
+    for n in args.items:
+        first, full = [], []
+        for run in range(args.repeat):
+            url = server.playlist_url(f"probe{n}r{run}", n=n, entry_latency=args.entry_latency)
+            started = time.monotonic()
+            entries, _single = Downloader()._probe_playlist(url, None)
+            first.append(time.monotonic() - started)
+            count = sum(1 for _ in entries or [])
+            full.append(time.monotonic() - started)
+        results.append({
+            "bench": "probe", "items": n, "entries_listed": count,
+            "first_entry_seconds": _summary(first), "full_listing_seconds": _summary(full),
+        })
+    return results
+
+
+def bench_download(server, args, work_dir: Path):
+    from engine.downloader import Downloader
+
+    results = []
+    for n in args.items:
+        for concurrency in args.concurrency:
+            walls, rates, runs_ok = [], [], 0
+            metrics = None
+            for run in range(args.repeat):
+                out_dir = work_dir / f"download-{n}-{concurrency}-{run}"
+                out_dir.mkdir(parents=True)
+                url = server.playlist_url(
+                    f"dl{n}c{concurrency}r{run}", n=n, size=args.item_size,
+                    latency=args.latency, rate=args.rate, entry_latency=args.entry_latency,
+                )
+                done = threading.Event()
+                outcome = []
+                downloader = Downloader()
+                started = time.monotonic()
+                downloader.download(
+                    url=url, out_dir=str(out_dir), mode=args.mode, concurrency=concurrency,
+                    postprocess=args.postprocess,
+                    progress_callback=lambda event: None,
+                    finished_callback=lambda ok: (outcome.append(ok), done.set()),
+                )
+                done.wait(args.timeout)
+                wall = time.monotonic() - started
+                downloader.join(5)
+
+                metrics = downloader.metrics
+                total_bytes = sum(i.bytes for i in metrics.items) if metrics else 0
+                walls.append(wall)
+                rates.append(total_bytes / wall if wall else 0.0)
+                runs_ok += bool(outcome and outcome[0])
+                shutil.rmtree(out_dir, ignore_errors=True)
+
+            items = metrics.items if metrics else []
+            results.append({
+                "bench": "download", "items": n, "concurrency": concurrency,
+                "item_size": args.item_size, "postprocess": args.postprocess, "runs_ok": runs_ok, "runs": args.repeat,
+                "wall_seconds": _summary(walls),
+                "throughput_bytes_per_second": _summary(rates),
+                # from the last run's engine.metrics.JobMetrics
+                "probe_first_entry_seconds": metrics.probe_first_entry_seconds if metrics else None,
+                "probe_seconds": metrics.probe_seconds if metrics else None,
+                "mean_item_download_seconds": statistics.mean(i.download_seconds for i in items) if items else None,
+                "mean_item_queue_wait_seconds": statistics.mean(i.queue_wait_seconds for i in items) if items else None,
+                "mean_item_postprocess_seconds": statistics.mean(i.postprocess_seconds for i in items) if items else None,
+            })
+    return results
+
+
+def bench_cancel(server, args, work_dir: Path):
+    from engine.downloader import Downloader
+    from engine.progress import PHASE_DOWNLOAD
+
+    results = []
+    for concurrency in args.concurrency:
+        latencies, parts_left, procs_left = [], [], []
+        for run in range(args.repeat):
+            out_dir = work_dir / f"cancel-{concurrency}-{run}"
+            out_dir.mkdir(parents=True)
+            # large, slow items so the job is mid-transfer when stopped
+            url = server.playlist_url(
+                f"cancel{concurrency}r{run}", n=max(concurrency * 2, 2),
+                size=1 << 30, rate=max(args.rate, 1 << 20),
+            )
+            transferring = threading.Event()
+            done = threading.Event()
+            downloader = Downloader()
+            downloader.download(
+                url=url, out_dir=str(out_dir), mode=args.mode, concurrency=concurrency,
+                progress_callback=lambda event: transferring.set() if event.phase == PHASE_DOWNLOAD else None,
+                finished_callback=lambda ok: done.set(),
+            )
+            if not transferring.wait(args.timeout):
+                downloader.stop()
+                downloader.join(args.timeout)
+                continue
+            time.sleep(0.2)
+
+            started = time.monotonic()
+            downloader.stop()
+            done.wait(args.timeout)
+            latencies.append(time.monotonic() - started)
+            downloader.join(5)
+
+            parts_left.append(len(list(out_dir.glob("*.part"))))
+            procs_left.append(_running_processes(str(out_dir)))
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+        results.append({
+            "bench": "cancel", "concurrency": concurrency,
+            "latency_seconds": _summary(latencies) if latencies else None,
+            "part_files_left": parts_left,
+            "processes_left": procs_left,
+        })
+    return results
+
+
+def bench_log_sink(args):
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication, QTextEdit
+        from gui.log_sink import BufferedLogSink
+    except ImportError as e:
+        return [{"bench": "log_sink", "skipped": f"PyQt5 not available: {e}"}]
+
+    app = QApplication.instance() or QApplication([])
+    results = []
+    for producers in args.concurrency:
+        text_edit = QTextEdit()
+        sink = BufferedLogSink(text_edit)
+        lines = args.log_lines
+        per_thread = max(1, lines // producers)
+
+        def produce(tag):
+            for i in range(per_thread):
+                sink.append(f"[{tag}] [download]  42.0% of 10.00MiB at 1.00MiB/s ETA 00:05 line {i}")
+
+        threads = [threading.Thread(target=produce, args=(t,)) for t in range(producers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        append_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sink.flush()
+        app.processEvents()
+        flush_seconds = time.perf_counter() - started
+
+        total = per_thread * producers
+        results.append({
+            "bench": "log_sink", "producers": producers, "lines": total,
+            "append_ns_per_line": append_seconds / total * 1e9,
+            "flush_seconds": flush_seconds,
+        })
+        sink.deleteLater()
+        text_edit.deleteLater()
+    return results
+
+
+# -----------------
+# Entry point
+# -----------------
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="SeaDog engine benchmarks")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--items", type=_int_list, default=[1, 10, 50], help="Playlist sizes (default 1,10,50)")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4], help="Concurrency levels (default 1,4)")
+    parser.add_argument("--item-size", type=int, default=2 * 1024 * 1024, help="Bytes per item (default 2 MiB)")
+    parser.add_argument("--rate", type=int, default=0, help="Bytes/second per connection (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each media response")
+    parser.add_argument("--entry-latency", type=float, default=0.005, help="Seconds between listed entries")
+    parser.add_argument("--pp-seconds", type=float, default=0.0, help="Simulated post-processing per item")
+    parser.add_argument("--mode", choices=("audio", "video"), default="audio")
+    parser.add_argument("--postprocess", choices=("inline", "deferred"), default="inline",
+                        help="Audio post-processing mode (deferred needs ffmpeg and mutagen)")
+    parser.add_argument("--log-lines", type=int, default=100000, help="Lines per log_sink run")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per configuration (median reported)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-run timeout in seconds")
+    parser.add_argument("--output", default=None, help="Write JSON here instead of stdout")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    selected = [b for b in args.only.split(",") if b]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    args.repeat = max(1, args.repeat)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="seadog-bench-"))
+    bin_dir = work_dir / "bin"
+    bin_dir.mkdir()
+    install_stub(bin_dir)
+    os.environ["SEADOG_BENCH_PP_SECONDS"] = str(args.pp_seconds)
+
+    results = []
+    try:
+        with MediaServer() as server:
+            for name in selected:
+                began = time.monotonic()
+                if name == "probe":
+                    results += bench_probe(server, args)
+                elif name == "download":
+                    results += bench_download(server, args, work_dir)
+                elif name == "cancel":
+                    results += bench_cancel(server, args, work_dir)
+                elif name == "log_sink":
+                    results += bench_log_sink(args)
+                print(f"{name}: {time.monotonic() - began:.1f}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Headless command line interface (no PyQt5 import).
+
+    seadog download URL [URL ...] [--mode audio|video] [--out DIR]
+        [--quality Q] [--priority N] [--notify] [--json]
+    seadog sync [URL ...] [--mode audio|video] [--out DIR]
+        [--quality Q] [--priority N] [--notify] [--json]
+    seadog daemon [--interval SEC] [--metrics-port PORT] [--json]
+    seadog resume [--json]
+    seadog index DIR [DIR ...] [--json]
+
+download  queues every URL on the shared DownloadQueue and waits for them.
+sync      checks followed playlists (config["follow_playlists"], or the URLs
+          given) once, downloads new items and exits.
+daemon    keeps the playlist monitor running until SIGINT/SIGTERM. Jobs still
+          running at shutdown are resumed on the next start. --metrics-port
+          serves Prometheus metrics on http://127.0.0.1:PORT/metrics.
+resume    finishes jobs that were interrupted when SeaDog last stopped.
+index     adds existing music/video libraries to the media store, so videos
+          already on disk are linked instead of downloaded again.
+
+With --json every line on stdout is one JSON object:
+    {"type": "status", "url": ..., "message": ...}
+    {"type": "progress", "url": ..., "item_index": ..., "downloaded_bytes": ..., ...}
+    {"type": "finished", "url": ..., "ok": true}
+    {"type": "summary", "ok": 3, "failed": 0, "cancelled": 0}
+
+Exit codes: 0 everything succeeded, 1 at least one download failed,
+2 usage error, 130 interrupted.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+from dataclasses import asdict
+
+COMMANDS = ("download", "sync", "daemon", "resume", "index")
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class _Output:
+    """Thread-safe printer for plain text or JSON lines."""
+
+    def __init__(self, as_json: bool, stream=None):
+        self.as_json = as_json
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def status(self, msg: str, url: str = None):
+        if self.as_json:
+            self._write({"type": "status", "url": url, "message": msg})
+        else:
+            self._write(msg)
+
+    def progress(self, event, url: str = None):
+        # Plain output already carries yt-dlp's own status lines
+        if self.as_json:
+            self._write({"type": "progress", "url": url, **asdict(event)})
+
+    def record(self, record_type: str, **fields):
+        if self.as_json:
+            self._write({"type": record_type, **fields})
+        elif record_type == "summary":
+            self._write(
+                f"Done: {fields['ok']} succeeded, {fields['failed']} failed, {fields['cancelled']} cancelled."
+            )
+
+    def _write(self, data):
+        line = json.dumps(data) if isinstance(data, dict) else data
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="seadog", description="SeaDog headless mode")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--json", action="store_true", help="Print JSON lines instead of text")
+
+    def target(p):
+        p.add_argument("--mode", choices=("audio", "video"), default="audio", help="Download music or video")
+        p.add_argument("--out", default=None, help="Output directory (default: from config)")
+        p.add_argument("--quality", default=None,
+                       help="Audio quality 0-9 (music) or best/1080p/720p/480p (video)")
+        p.add_argument("--priority", type=int, default=0, help="Queue priority (higher runs first)")
+        p.add_argument("--notify", action="store_true", help="Send a Gotify notification when done")
+
+    p_download = sub.add_parser("download", help="Download one or more URLs and exit")
+    p_download.add_argument("urls", nargs="+", metavar="URL")
+    target(p_download)
+    common(p_download)
+
+    p_sync = sub.add_parser("sync", help="Check followed playlists once and download new items")
+    p_sync.add_argument("urls", nargs="*", metavar="URL", help="Playlists to sync (default: followed playlists)")
+    target(p_sync)
+    common(p_sync)
+
+    p_daemon = sub.add_parser("daemon", help="Monitor followed playlists until stopped")
+    p_daemon.add_argument("--interval", type=float, default=None, help="Seconds between checks (default: from config)")
+    p_daemon.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this local port")
+    common(p_daemon)
+
+    p_resume = sub.add_parser("resume", help="Finish downloads interrupted by the last exit")
+    common(p_resume)
+
+    p_index = sub.add_parser("index", help="Index existing libraries for reuse by later downloads")
+    p_index.add_argument("dirs", nargs="+", metavar="DIR")
+    common(p_index)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+
+    out = _Output(args.json)
+    handler = {
+        "download": cmd_download, "sync": cmd_sync, "daemon": cmd_daemon, "resume": cmd_resume,
+        "index": cmd_index,
+    }[args.command]
+    try:
+        return handler(args, out)
+    except KeyboardInterrupt:
+        from engine.job_queue import get_download_queue
+        get_download_queue().cancel_all()
+        out.status("Interrupted; cancelling downloads.")
+        return EXIT_INTERRUPTED
+    finally:
+        _shutdown()
+
+
+# -----------------
+# Commands
+# -----------------
+def cmd_download(args, out: _Output) -> int:
+    controller = _controller(args.mode)
+    for url in args.urls:
+        _start(controller, args, url, out)
+
+    _wait_idle()
+    return _summary(out)
+
+
+def cmd_sync(args, out: _Output) -> int:
+    from engine.playlist_monitor import PlaylistMonitor
+
+    monitor = PlaylistMonitor(
+        status_callback=out.status,
+        quality=args.quality,
+        priority=args.priority,
+        send_notification=True if args.notify else None,
+    )
+    if args.urls:
+        settings = {"mode": args.mode, "out_dir": args.out or ""}
+        for url in args.urls:
+            monitor.check_playlist(url, settings)
+    else:
+        monitor.check_all()
+
+    _wait_idle()
+    return _summary(out)
+
+
+def cmd_daemon(args, out: _Output) -> int:
+    from engine.playlist_monitor import PlaylistMonitor
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    from engine.job_queue import get_download_queue
+
+    from controllers.jobs import resume_unfinished
+
+    queue = get_download_queue()
+    resumed = resume_unfinished(status_callback=out.status, queue=queue)
+    if resumed:
+        out.status(f"Resumed {len(resumed)} interrupted job(s).")
+
+    metrics_server = None
+    if args.metrics_port:
+        from engine.metrics import serve_metrics
+        try:
+            metrics_server = serve_metrics(args.metrics_port)
+            out.status(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+        except OSError as e:
+            out.status(f"Could not serve metrics on port {args.metrics_port}: {e}")
+
+    monitor = PlaylistMonitor(status_callback=out.status, enabled=True, interval=args.interval)
+    monitor.start()
+    out.status("Playlist monitor running; stop with Ctrl+C or SIGTERM.")
+    try:
+        while not stop.wait(1.0):
+            pass
+    finally:
+        monitor.stop()
+        # unfinished jobs stay journaled and resume on the next start
+        queue.shutdown()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+
+    out.status("Playlist monitor stopped.")
+    return EXIT_OK
+
+
+def cmd_resume(args, out: _Output) -> int:
+    from controllers.jobs import resume_unfinished
+
+    resumed = resume_unfinished(status_callback=out.status)
+    out.status(f"Resumed {len(resumed)} interrupted job(s).")
+    _wait_idle()
+    return _summary(out)
+
+
+def cmd_index(args, out: _Output) -> int:
+    from engine.media_store import get_media_store
+
+    store = get_media_store()
+    removed = store.prune()
+    if removed:
+        out.status(f"Forgot {removed} file(s) that no longer exist.")
+    for directory in args.dirs:
+        scanned, indexed = store.scan(directory, status_callback=out.status)
+        out.record("indexed", dir=directory, scanned=scanned, indexed=indexed)
+    return EXIT_OK
+
+
+# -----------------
+# Internal helpers
+# -----------------
+def _controller(mode):
+    from controllers.jobs import controller_for
+    return controller_for(mode)
+
+
+def _start(controller, args, url, out: _Output):
+    kwargs = dict(
+        url=url,
+        output_dir=args.out,
+        send_notification=args.notify,
+        priority=args.priority,
+        progress_callback=lambda msg, url=url: out.status(msg, url),
+        progress_event_callback=lambda event, url=url: out.progress(event, url),
+        finished_callback=lambda ok, url=url: out.record("finished", url=url, ok=ok),
+    )
+    if args.quality is not None:
+        kwargs["video_quality" if args.mode == "video" else "audio_quality"] = args.quality
+    return controller.start_download(**kwargs)
+
+
+def _wait_idle():
+    from engine.job_queue import get_download_queue
+
+    # short waits keep Ctrl+C responsive; wait_idle() also waits for the jobs'
+    # finished callbacks, which hand tagging and Gotify to the pools _shutdown() drains
+    queue = get_download_queue()
+    while not queue.wait_idle(timeout=1.0):
+        pass
+
+
+def _summary(out: _Output) -> int:
+    from engine.job_queue import get_download_queue, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+
+    jobs = get_download_queue().jobs()
+    counts = {
+        "ok": sum(1 for j in jobs if j.status == JOB_DONE),
+        "failed": sum(1 for j in jobs if j.status == JOB_FAILED),
+        "cancelled": sum(1 for j in jobs if j.status == JOB_CANCELLED),
+    }
+    out.record("summary", **counts)
+    if counts["cancelled"]:
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if counts["failed"] else EXIT_OK
+
+
+def _shutdown():
+    """Deliver pending notifications and config changes before exiting."""
+    from engine.postprocess import shutdown_postprocessor
+    from utils.config import ConfigManager
+    from utils.gotify import get_notifier
+    from utils.kid3 import shutdown_tagger
+
+    shutdown_postprocessor()
+    shutdown_tagger()
+    get_notifier().close(timeout=10)
+    ConfigManager().flush()
@@ -0,0 +1,73 @@
+"""
+Downloader.download() keywords built from the config.
+
+Shared by the Music and Video controllers, so a download behaves the same
+whether it was started from a tab, the CLI, the playlist monitor or
+resumed after a restart.
+
+- job_options(): the JSON-serializable options (kept in the job journal)
+- shared_services(): process-wide caches that are not journaled and are
+  added again when a job is resumed
+
+Usage (example):
+    from controllers.download_options import job_options, shared_services
+
+    kwargs = {**job_options(config, "audio", quality="0"), **shared_services(config)}
+    queue.submit(url=url, out_dir=out_dir, mode="audio", **kwargs)
+"""
+
+from engine.downloader import DEFAULT_VIDEO_FORMAT, accelerated_video_args
+from engine.media_store import get_media_store
+from engine.probe_cache import get_probe_cache
+from engine.session import session_options
+
+VIDEO_FORMATS = {
+    "best": DEFAULT_VIDEO_FORMAT,
+    "1080p": "bv*[height<=1080]+ba/best",
+    "720p": "bv*[height<=720]+ba/best",
+    "480p": "bv*[height<=480]+ba/best",
+}
+
+
+def job_options(config, mode: str, quality=None, accelerated=None) -> dict:
+    """
+    Options for one job. `quality` is the audio quality (0-9) for music or a
+    VIDEO_FORMATS key for video; `accelerated` None follows the config.
+    """
+    options = {
+        "delay": config.get("playlist_delay", 0),
+        "concurrency": config.get("max_concurrent_downloads", 1),
+        "engine": config.get("download_engine", "subprocess"),
+        "use_archive": config.get("use_download_archive", True),
+        "min_free_space": (
+            int(config.get("min_free_space_mb", 500)) * 1024 * 1024
+            if config.get("check_free_space", True) else None
+        ),
+        "session_options": session_options(config),
+    }
+
+    if mode == "audio":
+        options["postprocess"] = config.get("audio_postprocess", "inline")
+        options["extra_ytdlp_args"] = ["--audio-quality", str("0" if quality is None else quality)]
+        return options
+
+    extra_args = ["-f", VIDEO_FORMATS.get(quality or "best", DEFAULT_VIDEO_FORMAT)]
+    # Accelerated mode: parallel fragments and/or aria2c multi-connection
+    if accelerated is None:
+        accelerated = config.get("video_accelerated_download", False)
+    if accelerated:
+        extra_args += accelerated_video_args(
+            fragments=config.get("video_concurrent_fragments", 8),
+            use_aria2c=config.get("video_use_aria2c", True),
+        )
+    options["extra_ytdlp_args"] = extra_args
+    return options
+
+
+def shared_services(config) -> dict:
+    """The probe cache and media store, as enabled in the config."""
+    cache_ttl = config.get("probe_cache_ttl", 3600)
+    return {
+        "probe_cache": get_probe_cache(cache_ttl, config.get("probe_cache_size", 200)) if cache_ttl else None,
+        "media_store": get_media_store() if config.get("media_store_enabled", True) else None,
+    }
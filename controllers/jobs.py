@@ -0,0 +1,39 @@
+"""
+Jobs that are not started from a tab: downloads resumed after a restart and
+items queued by the playlist monitor. Both go through the Music / Video
+controllers, so they get the same options, tagging and notifications as
+a download started by hand.
+
+Usage (example):
+    from controllers.jobs import controller_for, resume_unfinished
+
+    resumed = resume_unfinished(status_callback=print)
+    controller_for("audio").start_download(url, output_dir="/home/eric/Music")
+"""
+
+from typing import Callable, Dict, List, Optional
+
+
+def controller_for(mode: str, config=None, queue=None):
+    """A MusicController for "audio", else a VideoController."""
+    if mode == "video":
+        from controllers.video_controller import VideoController
+        return VideoController(config, queue)
+    from controllers.music_controller import MusicController
+    return MusicController(config, queue)
+
+
+def resume_unfinished(status_callback: Optional[Callable[[str], None]] = None, queue=None) -> List:
+    """Re-queue journaled jobs interrupted by the last exit, through their mode's controller."""
+    if queue is None:
+        from engine.job_queue import get_download_queue
+        queue = get_download_queue()
+    controllers: Dict[str, object] = {}
+
+    def resume(record, status):
+        mode = record["mode"]
+        if mode not in controllers:
+            controllers[mode] = controller_for(mode, queue=queue)
+        return controllers[mode].resume(record, status)
+
+    return queue.resume_unfinished(status_callback, resume=resume)
@@ -1,71 +1,141 @@
-from engine.downloader import Downloader
+from controllers.download_options import job_options, shared_services
+from engine.job_queue import get_download_queue
 from utils.config import ConfigManager
+from utils.gotify import send_gotify_notification
+from utils.kid3 import get_tagger, launch_kid3, tag_items
 
 
 class MusicController:
-    def __init__(self):
-        self.config = ConfigManager()
-        self.downloader = Downloader()
-        self.current_thread = None
+    def __init__(self, config=None, queue=None):
+        self.config = config if config is not None else ConfigManager()
+        self.queue = queue if queue is not None else get_download_queue()
+        self.jobs = []
 
     def start_download(
         self,
         url,
         output_dir=None,
         open_kid3=False,
+        audio_quality="0",
         send_notification=False,
         progress_callback=None,
+        progress_event_callback=None,
         finished_callback=None,
+        priority=0,
     ):
         """
-        Starts a background download using Downloader.
+        Queues a background download on the shared DownloadQueue and returns the job.
+
+        audio_quality is passed to yt-dlp's --audio-quality (0 = best, 9 = worst).
+        progress_callback receives status lines, progress_event_callback receives
+        engine.progress.ProgressEvent objects.
         """
         if not output_dir or output_dir.strip() == "":
             output_dir = self.config.get("music_output_dir")
 
-        # Playlist delay from config (default 0)
-        delay = self.config.get("playlist_delay", 0)
+        return self._submit(
+            url, output_dir, job_options(self.config, "audio", quality=audio_quality), priority,
+            open_kid3, send_notification, progress_callback, progress_event_callback, finished_callback,
+        )
+
+    def resume(self, record, status_callback=None):
+        """
+        Re-queue an interrupted job from the journal (see DownloadQueue.resume_unfinished)
+        with its original options; finished music is tagged as usual.
+        """
+        return self._submit(
+            record["url"], record["out_dir"], record["options"], record["priority"],
+            open_kid3=False,
+            send_notification=bool(self.config.get("gotify_enabled", False)),
+            progress_callback=status_callback,
+            job_key=record["job_key"],
+        )
+
+    def cancel_download(self):
+        """Cancel every queued or running download started by this controller."""
+        for job in self.jobs:
+            self.queue.cancel(job.job_id)
+        self.jobs = []
 
-        # Threaded download
-        self.current_thread = self.downloader.download(
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _submit(
+        self,
+        url,
+        output_dir,
+        options,
+        priority=0,
+        open_kid3=False,
+        send_notification=False,
+        progress_callback=None,
+        progress_event_callback=None,
+        finished_callback=None,
+        job_key=None,
+    ):
+        # Queued download; the shared queue starts it when a slot is free
+        submitted = []
+        job = self.queue.submit(
             url=url,
             out_dir=output_dir,
             mode="audio",
-            delay=delay,
+            priority=priority,
+            job_key=job_key,
             status_callback=progress_callback,
+            progress_callback=progress_event_callback,
             finished_callback=lambda ok: self._on_finished(
                 ok,
+                submitted[0] if submitted else None,
                 output_dir,
                 open_kid3,
                 send_notification,
+                progress_callback,
                 finished_callback,
             ),
+            **{**options, **shared_services(self.config)},
         )
-        return self.current_thread
+        submitted.append(job)
+        self.jobs = [j for j in self.jobs if j.active] + [job]
+        return job
 
-    def cancel_download(self):
-        """Stop any ongoing download."""
-        self.downloader.stop()
-
-    # -----------------
-    # Internal helper
-    # -----------------
     def _on_finished(
         self,
         success,
+        job,
         output_dir,
         open_kid3,
         send_notification,
+        status_callback,
         user_finished_callback,
     ):
-        if open_kid3 and success:
-            kid3_path = self.config.get("kid3_path", "kid3")
-            try:
-                import subprocess
-                subprocess.Popen([kid3_path, output_dir])
-            except Exception as e:
-                print(f"Failed to open Kid3: {e}")
+        kid3_path = self.config.get("kid3_path", "kid3")
+        items = tag_items(job.downloaded) if job is not None else []
+        if items and self.config.get("auto_tag_music", True):
+            # tagged in the background; Kid3 opens only for files the rules couldn't finish
+            get_tagger().tag_async(
+                items, lambda report: self._on_tagged(report, open_kid3, kid3_path, status_callback)
+            )
+        elif open_kid3 and success:
+            launch_kid3([output_dir], kid3_path)
+
+        if send_notification:
+            title = "Music Download Completed" if success else "Music Download Failed"
+            send_gotify_notification(title, f"Output directory: {output_dir}")
 
         # propagate to GUI if needed
         if user_finished_callback:
             user_finished_callback(success)
+
+    def _on_tagged(self, report, open_kid3, kid3_path, status_callback):
+        store = shared_services(self.config)["media_store"]
+        if store is not None:
+            # tagging changed the files' size; the store drops records whose size doesn't match
+            for result in report.results:
+                if result.changed:
+                    store.refresh(result.path)
+        if status_callback:
+            status_callback(report.summary())
+            for result in report.failed:
+                status_callback(f"Needs tagging ({result.reason}): {result.path}")
+        if open_kid3 and report.failed_paths:
+            launch_kid3(report.failed_paths, kid3_path)
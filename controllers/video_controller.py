@@ -1,12 +1,13 @@
-from engine.downloader import Downloader
+from controllers.download_options import job_options, shared_services
+from engine.job_queue import get_download_queue
 from utils.config import ConfigManager
 from utils.gotify import send_gotify_notification
 
 class VideoController:
-    def __init__(self):
-        self.config = ConfigManager()
-        self.downloader = Downloader()
-        self.current_thread = None
+    def __init__(self, config=None, queue=None):
+        self.config = config if config is not None else ConfigManager()
+        self.queue = queue if queue is not None else get_download_queue()
+        self.jobs = []
 
     def start_download(
         self,
@@ -14,51 +15,72 @@ class VideoController:
         output_dir=None,
         video_quality="best",
         progress_callback=None,
+        progress_event_callback=None,
         finished_callback=None,
+        priority=0,
         send_notification=False,
+        accelerated=None,
     ):
         if output_dir is None or output_dir.strip() == "":
             output_dir = self.config.get("video_output_dir")
 
-        delay = self.config.get("playlist_delay", 0)
-
-        quality_map = {
-            "best": "bv*+ba/best",
-            "1080p": "bv*[height<=1080]+ba/best",
-            "720p": "bv*[height<=720]+ba/best",
-            "480p": "bv*[height<=480]+ba/best",
-        }
+        options = job_options(self.config, "video", quality=video_quality, accelerated=accelerated)
+        return self._submit(
+            url, output_dir, options, priority, send_notification,
+            progress_callback, progress_event_callback, finished_callback,
+        )
 
-        fmt = quality_map.get(video_quality, "bv*+ba/best")
+    def resume(self, record, status_callback=None):
+        """Re-queue an interrupted job from the journal (see DownloadQueue.resume_unfinished)."""
+        return self._submit(
+            record["url"], record["out_dir"], record["options"], record["priority"],
+            send_notification=bool(self.config.get("gotify_enabled", False)),
+            progress_callback=status_callback,
+            job_key=record["job_key"],
+        )
 
-        extra_args = ["-f", fmt]
+    def cancel_download(self):
+        """Cancel every queued or running download started by this controller."""
+        for job in self.jobs:
+            self.queue.cancel(job.job_id)
+        self.jobs = []
 
-        self.current_thread = self.downloader.download(
+    # -----------------
+    # Internal helper
+    # -----------------
+    def _submit(
+        self,
+        url,
+        output_dir,
+        options,
+        priority=0,
+        send_notification=False,
+        progress_callback=None,
+        progress_event_callback=None,
+        finished_callback=None,
+        job_key=None,
+    ):
+        job = self.queue.submit(
             url=url,
             out_dir=output_dir,
             mode="video",
-            delay=delay,
+            priority=priority,
+            job_key=job_key,
             status_callback=progress_callback,
-            extra_ytdlp_args=extra_args,
+            progress_callback=progress_event_callback,
             finished_callback=lambda ok: self._on_finished(
                 ok, output_dir, send_notification, finished_callback
             ),
+            **{**options, **shared_services(self.config)},
         )
 
-        return self.current_thread
+        self.jobs = [j for j in self.jobs if j.active] + [job]
+        return job
 
-
-    # -----------------
-    # Internal helper
-    # -----------------
     def _on_finished(self, success, output_dir, send_notification, user_finished_callback):
         if send_notification:
             title = "Video Download Completed" if success else "Video Download Failed"
-            message = f"Output directory: {output_dir}"
-            try:
-                send_gotify_notification(title, message)
-            except Exception as e:
-                print(f"Gotify notification failed: {e}")
+            send_gotify_notification(title, f"Output directory: {output_dir}")
 
         if user_finished_callback:
             user_finished_callback(success)
@@ -0,0 +1,93 @@
+"""
+Persistent download archive.
+
+Remembers which items (extractor + video ID) have already been downloaded
+into a given output directory in a given mode, so re-running a playlist only
+fetches what is new.
+
+Records live in a small SQLite database next to config.json. A job loads the
+keys for its scope once into a set, so every per-item check is O(1).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+from utils.paths import config_path
+
+ArchiveKey = Tuple[str, str]  # (extractor, video_id)
+
+
+def archive_scope(out_dir: str, mode: str) -> str:
+    """Scope string for an output directory + mode pair."""
+    return f"{mode}:{os.path.realpath(os.path.expanduser(out_dir))}"
+
+
+class DownloadArchive:
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            db_path = config_path("archive.sqlite3")
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        os.makedirs(self.db_path.parent, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS downloads (
+                scope        TEXT NOT NULL,
+                extractor    TEXT NOT NULL,
+                video_id     TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (scope, extractor, video_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    # -----------------
+    # Public API
+    # -----------------
+    def load_scope(self, out_dir: str, mode: str) -> Set[ArchiveKey]:
+        """Return every archived (extractor, video_id) for this output dir + mode."""
+        scope = archive_scope(out_dir, mode)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT extractor, video_id FROM downloads WHERE scope = ?", (scope,)
+            ).fetchall()
+        return {(extractor, video_id) for extractor, video_id in rows}
+
+    def contains(self, out_dir: str, mode: str, extractor: str, video_id: str) -> bool:
+        scope = archive_scope(out_dir, mode)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM downloads WHERE scope = ? AND extractor = ? AND video_id = ?",
+                (scope, extractor, video_id),
+            ).fetchone()
+        return row is not None
+
+    def add(self, out_dir: str, mode: str, extractor: str, video_id: str):
+        """Record a completed download."""
+        scope = archive_scope(out_dir, mode)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads (scope, extractor, video_id, completed_at) VALUES (?, ?, ?, ?)",
+                (scope, extractor, video_id, time.time()),
+            )
+            self._conn.commit()
+
+    def remove(self, out_dir: str, mode: str, extractor: str, video_id: str):
+        """Forget an item so the next run downloads it again."""
+        scope = archive_scope(out_dir, mode)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM downloads WHERE scope = ? AND extractor = ? AND video_id = ?",
+                (scope, extractor, video_id),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
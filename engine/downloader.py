@@ -11,21 +11,396 @@ Usage (example):
         out_dir="/home/eric/konosuba-Music",
         mode="audio",              # "audio" or "video"
         delay=5,                   # seconds between playlist items
+        concurrency=3,             # playlist items downloaded in parallel
+        engine="inprocess",        # "subprocess" or "inprocess"
         status_callback=print,     # receives status lines/messages
+        progress_callback=print,   # receives engine.progress.ProgressEvent objects
         finished_callback=lambda ok: print("done", ok)
     )
 
-    # to stop/cancel:
+    # to stop/cancel (yt-dlp and its ffmpeg children are signalled together;
+    # unfinished .part files are removed):
     dl.stop()
 """
 
+import glob
+import logging
+import re
+import shutil
+import signal
 import subprocess
 import threading
 import time
 import json
 import shlex
 import os
-from typing import Callable, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from engine.media_store import media_variant
+from engine.metrics import ItemMetrics, JobMetrics, get_metrics
+from engine.pacing import get_rate_limiter, is_throttle_message, retry_backoff
+from engine.postprocess import AudioTask, deferred_audio_args, deferred_available, get_postprocessor
+from engine.progress import (
+    PHASE_DOWNLOAD, PHASE_POSTPROCESS, ProgressEvent, event_from_hook, parse_progress_line, progress_template_args,
+)
+from engine.session import JobSession, is_session_rejected
+from utils.formatting import format_size
+from utils.logging import get_logger
+from utils.paths import DiskSpacePreflight, ensure_dir
+
+ENGINE_SUBPROCESS = "subprocess"
+ENGINE_INPROCESS = "inprocess"
+
+# audio post-processing: by yt-dlp per item, or afterwards on engine.postprocess's pool
+POSTPROCESS_INLINE = "inline"
+POSTPROCESS_DEFERRED = "deferred"
+
+# extra attempts an item gets when it failed because of rate limiting
+THROTTLE_RETRIES = 3
+
+# seconds stop() waits after SIGTERM before killing yt-dlp and its children
+STOP_GRACE_SECONDS = 2.0
+
+# default video format selection (see _build_command)
+DEFAULT_VIDEO_FORMAT = "bv*+ba/best"
+
+_log = get_logger("downloader")
+_ytdlp_log = get_logger("ytdlp")
+
+# yt-dlp output lines that name the item's file; the last one is the final file
+_OUTPUT_FILE_RES = (
+    re.compile(r"^\[download\] Destination: (.+)$"),
+    re.compile(r"^\[download\] (.+) has already been downloaded"),
+    re.compile(r"^\[(?:ExtractAudio|VideoConvertor|VideoRemuxer)\] Destination: (.+)$"),
+    re.compile(r'^\[Merger\] Merging formats into "(.+)"$'),
+    re.compile(r'^\[MoveFiles\] Moving file ".+" to "(.+)"$'),
+)
+
+
+def _popen_group(cmd, **kwargs) -> subprocess.Popen:
+    """
+    Start a process in its own process group, so yt-dlp and the ffmpeg /
+    aria2c processes it starts can be signalled together.
+    """
+    if os.name == "posix":
+        kwargs["start_new_session"] = True
+    else:
+        kwargs["creationflags"] = kwargs.get("creationflags", 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+    return subprocess.Popen(cmd, **kwargs)
+
+
+def _signal_group(proc: subprocess.Popen, kill: bool = False):
+    """
+    SIGTERM (or SIGKILL) the process group started by _popen_group().
+    Nothing is sent once the leader has been reaped: its PID, which is the
+    group ID, may then belong to a new process group (another job's yt-dlp).
+    """
+    if proc.returncode is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL if kill else signal.SIGTERM)
+        elif proc.poll() is None:
+            proc.kill() if kill else proc.terminate()
+    except OSError:
+        # group already gone
+        pass
+
+
+def _reap(proc: subprocess.Popen, timeout: float = STOP_GRACE_SECONDS) -> Optional[int]:
+    """Wait for a signalled process; kill its group if it outlives `timeout`."""
+    try:
+        return proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _signal_group(proc, kill=True)
+        try:
+            return proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+
+
+def partial_files(part_path: str) -> List[str]:
+    """
+    Leftovers of an unfinished yt-dlp download whose temporary file is
+    `part_path` (NAME.part): the .part file, its fragments and .ytdl / .aria2
+    state, and ffmpeg's NAME.temp.EXT files from post-processing.
+    """
+    final = part_path[:-5] if part_path.endswith(".part") else part_path
+    root, _ext = os.path.splitext(final)
+    candidates = [part_path, f"{final}.ytdl", f"{part_path}.aria2"]
+    candidates += glob.glob(f"{glob.escape(part_path)}-Frag*")
+    candidates += glob.glob(f"{glob.escape(root)}.temp.*")
+    return [path for path in candidates if os.path.isfile(path)]
+
+
+def accelerated_video_args(fragments: int = 8, use_aria2c: bool = True) -> List[str]:
+    """
+    yt-dlp arguments for the accelerated video mode: `fragments` DASH/HLS
+    fragments downloaded in parallel and, when aria2c is installed (and
+    `use_aria2c` is set), aria2c with as many connections per file.
+    """
+    fragments = max(1, int(fragments or 1))
+    args = ["--concurrent-fragments", str(fragments)]
+    if use_aria2c and shutil.which("aria2c"):
+        connections = min(16, fragments)
+        args += [
+            "--downloader", "aria2c",
+            "--downloader-args", f"aria2c:-x{connections} -s{connections} -k1M --summary-interval=0",
+        ]
+    return args
+
+
+
+@dataclass
+class PlaylistEntry:
+    """One item found by the playlist probe."""
+    url: str
+    video_id: Optional[str] = None
+    extractor: Optional[str] = None      # lower-case extractor key, e.g. "youtube"
+    title: Optional[str] = None
+    playlist_count: Optional[int] = None  # size of the parent playlist, if the extractor knows it
+    playlist: Optional[str] = None        # title of the parent playlist
+    uploader: Optional[str] = None        # channel / uploader name
+    duration: Optional[float] = None      # seconds
+    filesize_approx: Optional[int] = None  # bytes, when the extractor estimates it
+
+    @property
+    def archive_key(self):
+        if self.video_id and self.extractor:
+            return (self.extractor, self.video_id)
+        return None
+
+
+def entry_from_probe(e) -> Optional[PlaylistEntry]:
+    """
+    Turn one flat-playlist entry (probe record) into a PlaylistEntry (None if unusable).
+    """
+    # entries may be dicts with 'url' or 'id' or 'webpage_url'
+    if isinstance(e, dict):
+        url_piece = e.get("url") or e.get("id") or e.get("webpage_url")
+        video_id = e.get("id")
+        extractor = e.get("ie_key") or e.get("extractor_key")
+        title = e.get("title")
+        playlist_count = e.get("playlist_count") or e.get("n_entries")
+        playlist = e.get("playlist_title") or e.get("playlist")
+        uploader = e.get("channel") or e.get("uploader")
+        duration = e.get("duration")
+        filesize_approx = e.get("filesize_approx") or e.get("filesize")
+    else:
+        url_piece = e  # sometimes it's a string id
+        video_id, extractor, title, playlist_count, playlist, uploader = None, None, None, None, None, None
+        duration, filesize_approx = None, None
+    if not url_piece:
+        return None
+
+    # if it's an ID like 'VIDEOID', convert to full youtube watch URL
+    if len(url_piece) == 11 and not url_piece.startswith("http"):
+        item_url = f"https://www.youtube.com/watch?v={url_piece}"
+        video_id = video_id or url_piece
+        extractor = extractor or "Youtube"
+    elif url_piece.startswith("http"):
+        item_url = url_piece
+    else:
+        # fallback - assume ID
+        item_url = f"https://www.youtube.com/watch?v={url_piece}"
+        video_id = video_id or url_piece
+        extractor = extractor or "Youtube"
+
+    return PlaylistEntry(
+        url=item_url,
+        video_id=video_id,
+        extractor=extractor.lower() if extractor else None,
+        title=title,
+        playlist_count=playlist_count,
+        playlist=playlist,
+        uploader=uploader,
+        duration=duration,
+        filesize_approx=filesize_approx,
+    )
+
+
+@dataclass
+class DownloadedItem:
+    """A file finished by the current job (see Downloader.downloaded)."""
+    path: str
+    item_index: int
+    entry: PlaylistEntry
+
+
+def _safe_filename(name: str) -> str:
+    """A title as yt-dlp would write it into a file name."""
+    try:
+        from yt_dlp.utils import sanitize_filename
+        return sanitize_filename(name)
+    except ImportError:
+        return name.replace("/", "\u29f8").replace("\\", "\u29f9").replace("\0", "")
+
+
+class _OrderedStatus:
+    """
+    Serialises per-item status lines so the caller sees them in playlist order.
+
+    The lowest unfinished item streams straight through; lines from items that
+    run ahead of it are buffered and flushed once every earlier item is done.
+    """
+
+    def __init__(self, status_callback: Optional[Callable[[str], None]]):
+        self._callback = status_callback
+        self._lock = threading.Lock()
+        self._head = 1
+        self._buffers: Dict[int, List[str]] = {}
+        self._finished: Set[int] = set()
+
+    def emit(self, idx: int, msg: str):
+        if not self._callback:
+            return
+        with self._lock:
+            if idx == self._head:
+                self._callback(msg)
+            else:
+                self._buffers.setdefault(idx, []).append(msg)
+
+    def finish(self, idx: int):
+        with self._lock:
+            self._finished.add(idx)
+            while self._head in self._finished:
+                self._finished.discard(self._head)
+                self._head += 1
+                self._flush(self._head)
+
+    def skip(self, idx: int):
+        """Mark an item that was never started (e.g. cancelled) as finished."""
+        self.finish(idx)
+
+    def _flush(self, idx: int):
+        for msg in self._buffers.pop(idx, []):
+            if self._callback:
+                self._callback(msg)
+
+
+class _ItemProgress:
+    """
+    Turns yt-dlp progress output for one item into ProgressEvents.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[ProgressEvent], None]],
+        item_index: int,
+        item_count: Optional[int],
+        part_callback: Optional[Callable[[str], None]] = None,
+    ):
+        self._callback = callback
+        self.item_index = item_index
+        self.item_count = item_count
+        # part_callback(path) is called once per new yt-dlp .part file
+        self._part_callback = part_callback
+        self._last_part: Optional[str] = None
+        # throughput: bytes per downloaded file, first/last download event time
+        self._file_bytes: Dict[str, int] = {}
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self.peak_speed = 0.0
+        # post-processing: seconds per postprocessor (FFmpegExtractAudio, EmbedThumbnail, ...)
+        self.postprocessors: Dict[str, float] = {}
+        self._pp_started: Dict[str, float] = {}
+        # set by Downloader._download_one_with_retries
+        self.attempts = 0
+        self.throttled = 0
+        # the item's final file, once known (for the media store)
+        self.output_path: Optional[str] = None
+
+    def feed_line(self, line: str) -> bool:
+        """Handle a --progress-template line. Returns False for ordinary output."""
+        event = parse_progress_line(line, self.item_index, self.item_count)
+        if event is None:
+            return False
+        self._emit(event)
+        return True
+
+    def note_output(self, line: str):
+        """Remember the file named by a yt-dlp output line (destination, merge, move)."""
+        for pattern in _OUTPUT_FILE_RES:
+            match = pattern.match(line)
+            if match:
+                path = match.group(1).strip()
+                self.output_path = path[:-5] if path.endswith(".part") else path
+                return
+
+    def feed_hook(self, phase: str, status: dict):
+        """Handle a progress/postprocessor hook dict from the in-process engine."""
+        self._emit(event_from_hook(phase, status, self.item_index, self.item_count))
+
+    @property
+    def downloaded_bytes(self) -> int:
+        return sum(self._file_bytes.values())
+
+    @property
+    def files(self) -> List[str]:
+        """Downloaded files (final names) that exist on disk, largest first."""
+        existing = [path for path in self._file_bytes if path and os.path.isfile(path)]
+        return sorted(existing, key=lambda path: self._file_bytes[path], reverse=True)
+
+    @property
+    def download_seconds(self) -> float:
+        if self._first_at is None or self._last_at is None:
+            return 0.0
+        return self._last_at - self._first_at
+
+    def metrics(self, url: str, ok: bool, queue_wait: float = 0.0, probe_seconds: float = 0.0) -> ItemMetrics:
+        """ItemMetrics for this item; call when its download has finished."""
+        postprocess = sum(self.postprocessors.values())
+        if not postprocess and self._last_at is not None:
+            # no per-step events (e.g. external downloader): time after the last transfer
+            postprocess = time.monotonic() - self._last_at
+        return ItemMetrics(
+            item_index=self.item_index,
+            url=url,
+            ok=ok,
+            probe_seconds=probe_seconds,
+            queue_wait_seconds=queue_wait,
+            download_seconds=self.download_seconds,
+            bytes=self.downloaded_bytes,
+            peak_bytes_per_second=self.peak_speed,
+            attempts=self.attempts,
+            throttled=self.throttled,
+            postprocess_seconds=postprocess,
+            postprocessors=dict(self.postprocessors),
+        )
+
+    def _emit(self, event: ProgressEvent):
+        if event.phase == PHASE_POSTPROCESS and event.status == "finished" and event.filename:
+            # in-process hooks carry the file each postprocessor left behind
+            self.output_path = event.filename
+        if event.phase == PHASE_POSTPROCESS and event.postprocessor:
+            now = time.monotonic()
+            if event.status == "started":
+                self._pp_started[event.postprocessor] = now
+            elif event.status == "finished" and event.postprocessor in self._pp_started:
+                seconds = now - self._pp_started.pop(event.postprocessor)
+                self.postprocessors[event.postprocessor] = self.postprocessors.get(event.postprocessor, 0.0) + seconds
+        if event.phase == PHASE_DOWNLOAD:
+            now = time.monotonic()
+            if event.speed:
+                self.peak_speed = max(self.peak_speed, event.speed)
+            if self._first_at is None:
+                self._first_at = now
+            self._last_at = now
+            done = event.downloaded_bytes or 0
+            if event.status == "finished" and event.total_bytes:
+                done = max(done, event.total_bytes)
+            key = event.filename or ""
+            if key.endswith(".part"):
+                key = key[:-5]     # the "finished" event names the final file
+                if self._part_callback and event.filename != self._last_part:
+                    self._last_part = event.filename
+                    self._part_callback(event.filename)
+            self._file_bytes[key] = max(self._file_bytes.get(key, 0), done)
+        if self._callback:
+            self._callback(event)
 
 
 class Downloader:
@@ -33,7 +408,43 @@ class Downloader:
         # threading/process control
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
-        self._current_process: Optional[subprocess.Popen] = None
+        self._processes_lock = threading.Lock()
+        self._processes: Set[subprocess.Popen] = set()
+        # woken by stop() and by workers freeing a slot (playlist dispatcher)
+        self._wakeup = threading.Condition()
+        # .part files of the current job, removed if it is cancelled (see stop())
+        self._part_files: Set[str] = set()
+        self._cleanup_on_stop = True
+        # in-process yt-dlp engine for the current job (None = subprocess engine)
+        self._engine = None
+        # download archive for the current job (None = archive disabled)
+        self._archive = None
+        # playlist probe cache for the current job (None = always probe)
+        self._probe_cache = None
+        # job journal handle for the current job (None = not resumable)
+        self._journal = None
+        # bytes transferred by the current job (for the throughput summary)
+        self._transfer_lock = threading.Lock()
+        self._job_bytes = 0
+        # measurements of the current (or last) job; see engine.metrics
+        self.metrics: Optional[JobMetrics] = None
+        # files finished by the current (or last) job, in completion order
+        self.downloaded: List[DownloadedItem] = []
+        # global media store for the current job (None = always download)
+        self._media_store = None
+        self._variant = ""
+        # the current job's minimum seconds between item starts (passed to the host's pacer)
+        self._delay = 0.0
+        # free-space estimate for the current job (None = no disk space check)
+        self._preflight: Optional[DiskSpacePreflight] = None
+        # cookies / YouTube session of the current job (None = yt-dlp defaults)
+        self._session: Optional[JobSession] = None
+        # queue job ID of the current job, for log records (None = not queued)
+        self._job_id: Optional[int] = None
+        # deferred audio post-processing for the current job (None = inline)
+        self._postprocessor = None
+        self._audio_quality = "0"
+        self._pp_futures: List = []
 
     # -----------------
     # Public API
@@ -43,24 +454,69 @@ class Downloader:
         url: str,
         out_dir: str,
         mode: str = "audio",                 # "audio" or "video"
-        delay: float = 0.0,                  # seconds between playlist items
+        delay: float = 0.0,                  # minimum seconds between item starts (per host)
         retries: int = 0,                    # retries per item
-        retry_delay: float = 5.0,            # seconds between retries
+        retry_delay: float = 5.0,            # first retry backoff (doubles, jittered)
         status_callback: Optional[Callable[[str], None]] = None,
         finished_callback: Optional[Callable[[bool], None]] = None,
-        extra_ytdlp_args: Optional[list] = None
+        extra_ytdlp_args: Optional[list] = None,
+        concurrency: int = 1,                # playlist items downloaded in parallel
+        engine: str = ENGINE_SUBPROCESS,     # "subprocess" or "inprocess"
+        use_archive: bool = False,           # skip items already downloaded to out_dir
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        probe_cache=None,                    # engine.probe_cache.ProbeCache to reuse playlist listings
+        journal=None,                        # engine.journal.JournalHandle for resumable jobs
+        postprocess: str = POSTPROCESS_INLINE,   # audio: "inline" or "deferred"
+        media_store=None,                    # engine.media_store.MediaStore to reuse earlier downloads
+        job_id: Optional[int] = None,        # queue job ID, added to log records
+        min_free_space: Optional[int] = None,  # bytes to keep free; None = no disk space check
+        session_options: Optional[dict] = None,  # engine.session.session_options(config): cookies, YouTube session
     ) -> threading.Thread:
         """
         Start a threaded download. Returns the Thread object.
 
         - status_callback(msg) will be called with output lines and status updates.
+          Playlist item lines are prefixed with "[idx/total]" and delivered in
+          playlist order, even when several items download at once.
+        - progress_callback(event) receives typed engine.progress.ProgressEvent objects
+          (item index, bytes, total, speed, ETA, phase). When given, yt-dlp's progress
+          output is consumed here and no longer forwarded to status_callback.
+        - probe_cache (an engine.probe_cache.ProbeCache) reuses recent playlist listings
+          instead of probing again; stale listings are revalidated with a first-page probe.
         - finished_callback(success_bool) will be called when entire operation finishes.
+        - concurrency bounds how many yt-dlp processes run at the same time.
+        - Item starts are paced per host, shared with every other job: `delay`
+          is this job's floor (other jobs keep theirs), throttling (HTTP 429 etc.) backs off exponentially and
+          the pace recovers while items succeed. Rate-limited items get up to
+          THROTTLE_RETRIES extra attempts.
+        - engine="inprocess" drives yt_dlp.YoutubeDL inside this process instead of
+          starting a yt-dlp subprocess per item (falls back to subprocess if the
+          yt_dlp module cannot be imported).
+        - use_archive=True skips items recorded in the download archive for this
+          out_dir + mode and records every item that completes.
+        - journal (an engine.journal.JournalHandle) records per-item state
+          (pending / partial / done / failed) and skips items an earlier,
+          interrupted run of the same job already completed.
+        - postprocess="deferred" (audio) lets yt-dlp only download; MP3 transcoding,
+          tagging and cover art run on engine.postprocess's process pool while the
+          next items download. Falls back to inline if ffmpeg or mutagen is missing.
+        - media_store (an engine.media_store.MediaStore) links a file already
+          downloaded for the same video (extractor and ID) and quality into out_dir (hardlink,
+          reflink or copy; never a hardlink for music, which is tagged per copy)
+          instead of downloading it, and indexes new files.
+        - min_free_space (bytes) fails the job before an item starts if the estimated
+          size of what is left (see utils.paths.DiskSpacePreflight) would leave less
+          than this much free in out_dir.
+        - session_options (see engine.session.session_options) loads the cookie
+          profile once for the whole job, shared by the probe and every worker,
+          and reuses a cached YouTube guest session (visitor data, PO token).
         """
         if self._thread and self._thread.is_alive():
             raise RuntimeError("Downloader already running")
 
         # clear stop flag
         self._stop_event.clear()
+        self._job_id = job_id
 
         # -----------------
         # Build yt-dlp args
@@ -68,11 +524,8 @@ class Downloader:
         # Copy list so we don't mutate the caller's list
         extra_args = list(extra_ytdlp_args) if extra_ytdlp_args else []
 
-        # Native yt-dlp playlist delay
-        if delay and delay > 0:
-            extra_args.extend([
-                "--sleep-interval", str(delay)
-            ])
+        # `delay` is the minimum spacing between item starts, enforced by the
+        # shared per-host pacer (engine.pacing) - not passed to yt-dlp as well
 
         # -----------------
         # Start worker thread
@@ -89,6 +542,16 @@ class Downloader:
                 status_callback,
                 finished_callback,
                 extra_args,   # ← pass modified args
+                max(1, int(concurrency or 1)),
+                engine,
+                use_archive,
+                progress_callback,
+                probe_cache,
+                journal,
+                postprocess,
+                media_store,
+                min_free_space,
+                session_options,
             ),
             daemon=True,
         )
@@ -96,171 +559,922 @@ class Downloader:
         return self._thread
 
 
-    def stop(self):
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the current job's thread. Returns False if it is still running."""
+        thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    @property
+    def cancelled(self) -> bool:
+        """True once stop() has been called for the current job."""
+        return self._stop_event.is_set()
+
+    def stop(self, cleanup: bool = True):
         """
-        Signal to stop and terminate any running yt-dlp process.
+        Signal to stop and terminate every running yt-dlp process group
+        (yt-dlp plus the ffmpeg / aria2c processes it started). Groups still
+        alive after STOP_GRACE_SECONDS are killed.
+
+        With cleanup=True the job's unfinished .part / .ytdl / .temp files are
+        removed when it ends; pass False to keep them so a later run can
+        continue (app shutdown with resumable jobs).
         """
+        self._cleanup_on_stop = cleanup
         self._stop_event.set()
-        if self._current_process:
-            try:
-                self._current_process.terminate()
-            except Exception:
-                pass
+        with self._wakeup:
+            self._wakeup.notify_all()
+        with self._processes_lock:
+            processes = list(self._processes)
+        for proc in processes:
+            _signal_group(proc)
+        if processes:
+            timer = threading.Timer(STOP_GRACE_SECONDS, self._kill_groups, args=(processes,))
+            timer.daemon = True
+            timer.start()
 
     # -----------------
     # Internal helpers
     # -----------------
+    @staticmethod
+    def _kill_groups(processes):
+        # groups whose yt-dlp was reaped meanwhile are skipped by _signal_group()
+        for proc in processes:
+            _signal_group(proc, kill=True)
+
+    def _track(self, proc: subprocess.Popen):
+        with self._processes_lock:
+            self._processes.add(proc)
+        # stop() may have run between the caller's check and Popen
+        if self._stop_event.is_set():
+            _signal_group(proc)
+
+    def _untrack(self, proc: subprocess.Popen):
+        with self._processes_lock:
+            self._processes.discard(proc)
+
+    def _remove_partial_files(self, status_callback):
+        with self._transfer_lock:
+            parts, self._part_files = self._part_files, set()
+        removed = 0
+        for part in parts:
+            for path in partial_files(part):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        if removed and status_callback:
+            status_callback(f"Removed {removed} partial file(s).")
+
     def _run(
         self,
-        url, out_dir, mode, delay, retries, retry_delay, status_callback, finished_callback, extra_ytdlp_args
+        url, out_dir, mode, delay, retries, retry_delay, status_callback, finished_callback, extra_ytdlp_args,
+        concurrency=1, engine=ENGINE_SUBPROCESS, use_archive=False, progress_callback=None, probe_cache=None,
+        journal=None, postprocess=POSTPROCESS_INLINE, media_store=None, min_free_space=None, session_options=None,
     ):
         ok = True
+        started_at = time.monotonic()
+        self._job_bytes = 0
+        self._part_files = set()
+        self._cleanup_on_stop = True
+        self.metrics = JobMetrics(url, mode)
+        self.downloaded = []
         try:
             if status_callback:
                 status_callback(f"Preparing download: mode={mode} url={url}")
+            _log.info("Preparing download (%s)", mode, extra={"job": self._job_id, "url": url})
 
-            os.makedirs(out_dir, exist_ok=True)
+            out_dir = ensure_dir(out_dir)
+            self._preflight = DiskSpacePreflight(out_dir, mode, min_free_space) if min_free_space is not None else None
 
-            # Detect playlist
-            playlist_entries = self._probe_playlist(url, status_callback)
-            if playlist_entries:
+            self._session = self._open_session(session_options, status_callback)
+            self._engine = self._create_engine(engine, status_callback)
+            self._archive = self._open_archive(use_archive, status_callback)
+            self._probe_cache = probe_cache
+            self._journal = journal
+            self._postprocessor = self._open_postprocessor(postprocess, mode, extra_ytdlp_args, status_callback)
+            self._media_store = media_store
+            self._variant = self._media_variant(mode, extra_ytdlp_args)
+            self._delay = max(0.0, float(delay or 0.0))
+            if journal is not None and journal.resumed and status_callback:
+                status_callback("Resuming interrupted job; completed items will be skipped.")
+
+            # Detect playlist (entries stream in while the probe is still running)
+            playlist_entries, single = self._probe_playlist(url, status_callback)
+            self.metrics.probe_first_entry_seconds = time.monotonic() - self.metrics.started_at
+            if playlist_entries is not None:
                 if status_callback:
-                    status_callback(f"Detected playlist with {len(playlist_entries)} entries.")
-                for idx, entry_url in enumerate(playlist_entries, start=1):
-                    if self._stop_event.is_set():
-                        ok = False
-                        if status_callback:
-                            status_callback("Download cancelled by user.")
-                        break
+                    status_callback(f"Detected playlist (concurrency={concurrency}); starting as entries arrive.")
+                ok = self._run_playlist(
+                    playlist_entries, out_dir, mode, delay, retries, retry_delay,
+                    status_callback, extra_ytdlp_args, concurrency, progress_callback,
+                )
 
+            else:
+                # Single URL (not a detected playlist)
+                self.metrics.probe_seconds = self.metrics.probe_first_entry_seconds
+                single = single or PlaylistEntry(url=url)
+                archived = self._archived_keys(out_dir, mode)
+                if single.archive_key in archived:
+                    if status_callback:
+                        status_callback(f"Skipping (already downloaded): {url}")
+                elif journal is not None and journal.is_done(1, single.video_id):
                     if status_callback:
-                        status_callback(f"Downloading item {idx}/{len(playlist_entries)}: {entry_url}")
+                        status_callback(f"Skipping (completed before restart): {url}")
+                elif self._out_of_space(1, single, status_callback):
+                    ok = False
+                elif not get_rate_limiter().pacer_for(url).acquire(self._stop_event, self._delay):
+                    # stopped while waiting for the pacer: nothing was downloaded
+                    ok = False
+                else:
+                    if status_callback:
+                        status_callback("Downloading single item...")
+                    queue_wait = time.monotonic() - self.metrics.started_at - self.metrics.probe_seconds
+                    progress = self._start_item(progress_callback, 1, 1, single, status_callback)
+                    success = self._reuse_stored(single, out_dir, progress, status_callback) or \
+                        self._download_one_with_retries(
+                            url, out_dir, mode, retries, retry_delay, status_callback, extra_ytdlp_args, progress,
+                        )
+                    outcome = []
 
-                    success = self._download_one_with_retries(
-                        entry_url, out_dir, mode, retries, retry_delay, status_callback, extra_ytdlp_args
-                    )
-                    if not success:
-                        ok = False
-                        # continue to next item or break? We'll continue but mark overall as failed.
-                        if status_callback:
-                            status_callback(f"Failed to download item: {entry_url}")
-
-                    # Delay between playlist items (respect stop)
-                    for s in range(int(delay)):
-                        if self._stop_event.is_set():
-                            break
-                        time.sleep(1)
-                    # handle fractional seconds
-                    frac = delay - int(delay)
-                    if frac and not self._stop_event.is_set():
-                        time.sleep(frac)
+                    def done(item_ok):
+                        item = progress.metrics(url, item_ok, queue_wait, self.metrics.probe_seconds)
+                        self.metrics.add_item(item, get_metrics())
+                        self._log_item(single, item)
+                        if item_ok:
+                            self._record_media(single, progress)
+                            self._record_downloaded(1, single, progress)
+                        outcome.append(item_ok)
 
-            else:
-                # Single URL (not a detected playlist)
-                if status_callback:
-                    status_callback("Downloading single item...")
-                success = self._download_one_with_retries(
-                    url, out_dir, mode, retries, retry_delay, status_callback, extra_ytdlp_args
-                )
-                ok = ok and success
+                    self._after_download(success, progress, status_callback, done)
+                    self._wait_postprocess()
+                    success = bool(outcome and outcome[0])
+                    if success:
+                        self._record_archive(single, out_dir, mode)
+                    if journal is not None:
+                        journal.finished(1, success)
+                    ok = ok and success
 
         except Exception as e:
             ok = False
+            _log.exception("Downloader error", extra={"job": self._job_id, "url": url})
             if status_callback:
                 status_callback(f"Downloader error: {e}")
 
         finally:
             # cleanup
-            self._current_process = None
+            with self._processes_lock:
+                self._processes.clear()
+            if self._engine is not None:
+                self._engine.close()
+                self._engine = None
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+            self._probe_cache = None
+            self._journal = None
+            self._wait_postprocess()
+            self._postprocessor = None
+            self._media_store = None
+            self._preflight = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._stop_event.is_set() and self._cleanup_on_stop:
+                self._remove_partial_files(status_callback)
+            if self._job_bytes and status_callback:
+                elapsed = max(time.monotonic() - started_at, 1e-6)
+                status_callback(
+                    f"Job throughput: {format_size(self._job_bytes)} in {elapsed:.1f}s "
+                    f"({format_size(self._job_bytes / elapsed)}/s)"
+                )
+            self.metrics.finish(ok, get_metrics())
+            if status_callback and self.metrics.items:
+                for line in self.metrics.summary_lines():
+                    status_callback(line)
             if finished_callback:
                 try:
                     finished_callback(ok)
                 except Exception:
                     pass
 
-    def _probe_playlist(self, url: str, status_callback: Optional[Callable[[str], None]] = None):
+    def _run_playlist(
+        self, entries, out_dir, mode, delay, retries, retry_delay, status_callback, extra_ytdlp_args, concurrency,
+        progress_callback=None,
+    ) -> bool:
         """
-        Probe the URL to see if it's a playlist. If playlist, return list of item URLs in order.
-        Returns [] if not a playlist or probe failed.
+        Download playlist entries on a bounded pool of `concurrency` workers.
+        `entries` may be a lazy iterator; items start as soon as they are yielded.
+        Item starts are paced by the shared per-host pacer (see _run). Returns overall success.
         """
-        try:
-            # use --flat-playlist -J to get JSON with entries (lightweight)
-            cmd = ["yt-dlp", "--flat-playlist", "-J", url]
-            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=False)
-            if proc.returncode != 0:
-                # not necessarily an error; treat as single item
-                if status_callback:
-                    status_callback(f"Playlist probe returned non-zero (treat as single item): {proc.stderr.strip()}")
-                return []
-
-            payload = proc.stdout
-            data = json.loads(payload)
-            entries = data.get("entries")
-            if not entries:
-                return []
-
-            # entries may be dicts with 'url' or 'id' or 'webpage_url'
-            item_urls = []
-            for e in entries:
-                if isinstance(e, dict):
-                    url_piece = e.get("url") or e.get("id") or e.get("webpage_url")
-                else:
-                    url_piece = e  # sometimes it's a string id
-                if not url_piece:
+        ordered = _OrderedStatus(status_callback)
+        running = 0
+        results: Dict[int, bool] = {}
+        cancelled = False
+        out_of_space = False
+        archived = self._archived_keys(out_dir, mode)
+        skipped = 0
+        resumed = 0
+        idx = 0
+
+        def worker(idx, entry, probe_wait, listed_at):
+            total = entry.playlist_count or "?"
+            tag = f"[{idx}/{total}]"
+
+            def item_status(msg):
+                ordered.emit(idx, f"{tag} {msg}")
+
+            handed_off = False
+            try:
+                queue_wait = time.monotonic() - listed_at
+                item_status(f"Downloading item {idx}/{total}: {entry.url}")
+                progress = self._start_item(progress_callback, idx, entry.playlist_count, entry, item_status)
+                success = self._reuse_stored(entry, out_dir, progress, item_status) or \
+                    self._download_one_with_retries(
+                        entry.url, out_dir, mode, retries, retry_delay, item_status, extra_ytdlp_args, progress,
+                    )
+
+                # called at once, or by the post-processing pool when the item is processed
+                def done(item_ok):
+                    try:
+                        item = progress.metrics(entry.url, item_ok, queue_wait, probe_wait)
+                        self.metrics.add_item(item, get_metrics())
+                        self._log_item(entry, item)
+                        if self._preflight is not None:
+                            self._preflight.done(idx)
+                        if item_ok:
+                            self._record_archive(entry, out_dir, mode)
+                            self._record_media(entry, progress)
+                            self._record_downloaded(idx, entry, progress)
+                        else:
+                            item_status(f"Failed to download item: {entry.url}")
+                        if self._journal is not None:
+                            self._journal.finished(idx, item_ok)
+                        results[idx] = item_ok
+                    finally:
+                        ordered.finish(idx)
+
+                handed_off = True
+                self._after_download(success, progress, item_status, done)
+            finally:
+                if not handed_off:
+                    ordered.finish(idx)
+                # the next download may start while this item is post-processed
+                release_slot()
+
+        def release_slot():
+            nonlocal running
+            with self._wakeup:
+                running -= 1
+                self._wakeup.notify_all()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="seadog-dl") as pool:
+            for idx, (entry, probe_wait, listed_at) in enumerate(self._timed_entries(entries), start=1):
+                if self._stop_event.is_set():
+                    cancelled = True
+                    ordered.skip(idx)
+                    break
+
+                if entry.archive_key in archived:
+                    total = entry.playlist_count or "?"
+                    ordered.emit(idx, f"[{idx}/{total}] Skipping (already downloaded): {entry.url}")
+                    results[idx] = True
+                    skipped += 1
+                    if self._preflight is not None:
+                        # listed, but nothing to download
+                        self._preflight.skip(idx, entry.playlist_count)
+                    ordered.finish(idx)
                     continue
-                # if it's an ID like 'VIDEOID', convert to full youtube watch URL
-                if len(url_piece) == 11 and not url_piece.startswith("http"):
-                    item_urls.append(f"https://www.youtube.com/watch?v={url_piece}")
-                elif url_piece.startswith("http"):
-                    item_urls.append(url_piece)
+
+                if self._journal is not None and self._journal.is_done(idx, entry.video_id):
+                    total = entry.playlist_count or "?"
+                    ordered.emit(idx, f"[{idx}/{total}] Skipping (completed before restart): {entry.url}")
+                    results[idx] = True
+                    resumed += 1
+                    if self._preflight is not None:
+                        # listed, but nothing to download
+                        self._preflight.skip(idx, entry.playlist_count)
+                    ordered.finish(idx)
+                    continue
+
+                if self._out_of_space(idx, entry, status_callback):
+                    out_of_space = True
+                    ordered.skip(idx)
+                    break
+
+                # Wait for a free worker; stop() wakes this up at once
+                with self._wakeup:
+                    self._wakeup.wait_for(lambda: running < concurrency or self._stop_event.is_set())
+                    if not self._stop_event.is_set():
+                        running += 1
+                if self._stop_event.is_set():
+                    cancelled = True
+                    ordered.skip(idx)
+                    break
+
+                # Per-host pacing (shared with other jobs; respects stop)
+                if not get_rate_limiter().pacer_for(entry.url).acquire(self._stop_event, self._delay):
+                    release_slot()
+                    cancelled = True
+                    ordered.skip(idx)
+                    break
+
+                pool.submit(worker, idx, entry, probe_wait, listed_at)
+
+            # Stop the probe if we left the listing early
+            close = getattr(entries, "close", None)
+            if close:
+                close()
+
+        self._wait_postprocess()
+
+        if out_of_space:
+            return False
+        if cancelled or self._stop_event.is_set():
+            if status_callback:
+                status_callback("Download cancelled by user.")
+            return False
+
+        total = idx
+        if status_callback:
+            status_callback(f"Processed {total} playlist entries.")
+            if skipped:
+                status_callback(f"Skipped {skipped} of {total} items already in the download archive.")
+            if resumed:
+                status_callback(f"Skipped {resumed} of {total} items completed before the restart.")
+
+        return len(results) == total and all(results.values())
+
+    def _open_postprocessor(self, postprocess, mode, extra_ytdlp_args, status_callback):
+        if mode != "audio" or postprocess != POSTPROCESS_DEFERRED:
+            return None
+        if not deferred_available():
+            if status_callback:
+                status_callback("Deferred post-processing needs ffmpeg and mutagen; processing inline.")
+            return None
+        args = list(extra_ytdlp_args or [])
+        if "--audio-quality" in args[:-1]:
+            self._audio_quality = args[args.index("--audio-quality") + 1]
+        self._pp_futures = []
+        return get_postprocessor()
+
+    def _after_download(self, success, progress, status_callback, done):
+        """
+        Finish an item. With deferred post-processing the downloaded file goes
+        to the pool and done(ok) is called once it is processed; otherwise
+        done(success) is called at once.
+        """
+        files = []
+        if success and self._postprocessor is not None:
+            files = progress.files
+            if not files and progress.output_path and os.path.isfile(progress.output_path):
+                # "has already been downloaded": no progress events, only the output line
+                files = [progress.output_path]
+        if not files:
+            done(success)
+            return
+
+        try:
+            future = self._postprocessor.submit(AudioTask(source=files[0], quality=self._audio_quality))
+        except Exception as e:
+            if status_callback:
+                status_callback(f"Could not start post-processing: {e}")
+            done(False)
+            return
+
+        if status_callback:
+            status_callback(f"Queued for post-processing: {os.path.basename(files[0])}")
+
+        # set once done() has run; the pool future completes before its callbacks do
+        handled = threading.Event()
+
+        def on_processed(f):
+            try:
+                finish(f)
+            finally:
+                handled.set()
+
+        def finish(f):
+            if f.cancelled():
+                result = {"ok": False, "error": "cancelled", "steps": {}}
+            elif f.exception() is not None:
+                result = {"ok": False, "error": str(f.exception()), "steps": {}}
+            else:
+                result = f.result()
+            progress.postprocessors.update(result.get("steps") or {})
+            if result["ok"]:
+                progress.output_path = result["path"]
+            if status_callback:
+                if result["ok"]:
+                    seconds = sum(progress.postprocessors.values())
+                    status_callback(f"Post-processed {os.path.basename(result['path'])} in {seconds:.1f}s")
                 else:
-                    # fallback - assume ID
-                    item_urls.append(f"https://www.youtube.com/watch?v={url_piece}")
+                    status_callback(f"Post-processing failed: {result['error']}")
+            if not result["ok"]:
+                _log.warning(
+                    "Post-processing failed: %s", result["error"],
+                    extra={"job": self._job_id, "item": progress.item_index, "path": files[0]},
+                )
+            done(result["ok"])
+
+        with self._transfer_lock:
+            self._pp_futures.append((future, handled))
+        future.add_done_callback(on_processed)
 
-            return item_urls
+    def _wait_postprocess(self):
+        """Wait for this job's post-processing; on stop, drop work that hasn't started."""
+        with self._transfer_lock:
+            futures = list(self._pp_futures)
+        pending = set(f for f, _handled in futures)
+        while pending:
+            if self._stop_event.is_set():
+                for future in pending:
+                    future.cancel()
+            _done, pending = wait_futures(pending, timeout=0.5)
+        for _future, handled in futures:
+            handled.wait()
+        with self._transfer_lock:
+            self._pp_futures = [f for f in self._pp_futures if f not in futures]
+
+    def _timed_entries(self, entries) -> Iterator[Tuple[PlaylistEntry, float, float]]:
+        """
+        Yield (entry, seconds spent waiting for it, time it arrived) and record
+        the full listing time in self.metrics once the listing is exhausted.
+        """
+        iterator = iter(entries)
+        while True:
+            wait_start = time.monotonic()
+            try:
+                entry = next(iterator)
+            except StopIteration:
+                self.metrics.probe_seconds = time.monotonic() - self.metrics.started_at
+                return
+            now = time.monotonic()
+            yield entry, now - wait_start, now
+
+    def _create_engine(self, engine, status_callback):
+        """
+        Return an InProcessEngine for engine="inprocess", or None for the subprocess engine.
+        """
+        if engine != ENGINE_INPROCESS:
+            return None
+        try:
+            from engine.inprocess import InProcessEngine
+            return InProcessEngine(self._stop_event)
+        except ImportError as e:
+            if status_callback:
+                status_callback(f"In-process engine unavailable ({e}); using yt-dlp subprocess.")
+            return None
+
+    def _open_session(self, session_options, status_callback) -> Optional[JobSession]:
+        if not session_options:
+            return None
+        session = JobSession(session_options)
+        session.load(status_callback)
+        return session
+
+    def _session_args(self, url) -> List[str]:
+        """Cookie / session options for a yt-dlp request to `url` (see engine.session)."""
+        return self._session.ytdlp_args(url) if self._session is not None else []
+
+    def _open_archive(self, use_archive, status_callback):
+        if not use_archive:
+            return None
+        try:
+            from engine.archive import DownloadArchive
+            return DownloadArchive()
+        except Exception as e:
+            if status_callback:
+                status_callback(f"Download archive unavailable ({e}); downloading everything.")
+            return None
+
+    @staticmethod
+    def _media_variant(mode, extra_ytdlp_args) -> str:
+        """Media store key part for this job: audio quality, or the video format selection."""
+        args = list(extra_ytdlp_args or [])
+
+        def value_of(*options):
+            for i, arg in enumerate(args[:-1]):
+                if arg in options:
+                    return args[i + 1]
+            return None
+
+        if mode == "audio":
+            return media_variant(mode, value_of("--audio-quality") or "0")
+        return media_variant(mode, value_of("-f", "--format") or DEFAULT_VIDEO_FORMAT)
+
+    def _reuse_stored(self, entry: PlaylistEntry, out_dir, progress, status_callback) -> bool:
+        """Link an earlier download of this item from the media store. True if it was reused."""
+        # only with a known extractor: a bare ID could belong to another site's video
+        if self._media_store is None or entry.archive_key is None or self._stop_event.is_set():
+            return False
+
+        def filename(ext):
+            # same name as the "%(playlist_index)s - %(title)s.%(ext)s" template (per-item URL: no index)
+            return f"NA - {_safe_filename(entry.title or entry.video_id)}{ext}"
+
+        try:
+            reused = self._media_store.reuse(*entry.archive_key, self._variant, out_dir, filename)
+        except Exception as e:
+            if status_callback:
+                status_callback(f"Media store unavailable ({e}); downloading.")
+            return False
+        if reused is None:
+            return False
+        path, method = reused
+        progress.output_path = path
+        if status_callback:
+            status_callback(f"Reused earlier download ({method}): {os.path.basename(path)}")
+        return True
+
+    def _record_media(self, entry: PlaylistEntry, progress):
+        if self._media_store is None or entry.archive_key is None or not progress.output_path:
+            return
+        try:
+            if os.path.isfile(progress.output_path):
+                self._media_store.add(*entry.archive_key, self._variant, progress.output_path)
+        except Exception:
+            pass
+
+    def _out_of_space(self, idx, entry: PlaylistEntry, status_callback) -> bool:
+        """Add the item to the free-space estimate; True (and a message) if the rest of the job won't fit."""
+        if self._preflight is None:
+            return False
+        self._preflight.add(idx, entry.filesize_approx, entry.duration, entry.playlist_count)
+        problem = self._preflight.shortfall()
+        if problem is None:
+            return False
+        _log.error(problem, extra={"job": self._job_id, "item": idx})
+        if status_callback:
+            status_callback(problem)
+        return True
+
+    def _log_item(self, entry: PlaylistEntry, item: ItemMetrics):
+        extra = {
+            "job": self._job_id, "item": item.item_index, "video_id": entry.video_id, "url": entry.url,
+            "seconds": round(item.download_seconds + item.postprocess_seconds, 3), "bytes": item.bytes,
+            "attempts": item.attempts,
+        }
+        if item.ok:
+            _log.info("Item finished", extra=extra)
+        else:
+            _log.warning("Item failed", extra=extra)
+
+    def _record_downloaded(self, idx, entry: PlaylistEntry, progress):
+        if progress.output_path:
+            with self._transfer_lock:
+                self.downloaded.append(DownloadedItem(progress.output_path, idx, entry))
+
+    def _archived_keys(self, out_dir, mode) -> Set:
+        if self._archive is None:
+            return set()
+        return self._archive.load_scope(out_dir, mode)
+
+    def _record_archive(self, entry: PlaylistEntry, out_dir, mode):
+        if self._archive is None or entry.archive_key is None:
+            return
+        try:
+            self._archive.add(out_dir, mode, *entry.archive_key)
+        except Exception:
+            pass
+
+    def _probe_playlist(
+        self, url: str, status_callback: Optional[Callable[[str], None]] = None
+    ) -> Tuple[Optional[Iterator[PlaylistEntry]], Optional[PlaylistEntry]]:
+        """
+        Probe the URL to see if it's a playlist, without waiting for the full listing.
+
+        Returns (entries, single): if playlist, `entries` is an iterator that
+        yields PlaylistEntry items in order while the probe keeps enumerating,
+        and `single` is None. Otherwise `entries` is None and `single` describes
+        the URL itself when the probe identified it.
+        """
+        try:
+            cached = self._cached_entries(url, status_callback)
+            if cached is not None:
+                return iter(cached), None
+
+            if self._engine is not None:
+                records = self._engine.iter_probe(url, status_callback, self._session_args(url))
+            else:
+                records = self._iter_probe_process(url, status_callback)
+
+            first = next(records, None)
+            if first is None:
+                return None, None
+
+            if not self._is_playlist_record(first):
+                records.close()
+                return None, self._single_from_probe(url, first)
+
+            def entries():
+                listing = []
+                try:
+                    for record in self._chain_first(first, records):
+                        entry = entry_from_probe(record)
+                        if entry:
+                            listing.append(entry)
+                            yield entry
+                    # only complete listings are worth caching
+                    if self._probe_cache is not None and listing and not self._stop_event.is_set():
+                        self._probe_cache.put(
+                            url, [asdict(e) for e in listing], listing[0].playlist_count or len(listing)
+                        )
+                finally:
+                    records.close()
+
+            return entries(), None
 
         except Exception as e:
             if status_callback:
                 status_callback(f"Playlist probe exception: {e}")
-            return []
+            return None, None
+
+    def _cached_entries(self, url, status_callback) -> Optional[List[PlaylistEntry]]:
+        """
+        Cached playlist entries for `url`, revalidating stale ones with a
+        first-page probe. None means the caller must probe.
+        """
+        cache = self._probe_cache
+        if cache is None:
+            return None
+
+        record = cache.get(url)
+        if record is not None:
+            revalidated = False
+            if not cache.is_fresh(record):
+                count, first_id = self._probe_head(url)
+                revalidated = cache.matches(record, count, first_id)
+                if not revalidated:
+                    record = None
+
+            if record is not None:
+                cache.record_hit(url, revalidated=revalidated)
+                if status_callback:
+                    how = "revalidated" if revalidated else "fresh"
+                    status_callback(f"Using cached playlist listing ({record['entry_count']} entries, {how}).")
+                return [PlaylistEntry(**e) for e in record["entries"]]
+
+        cache.record_miss()
+        return None
+
+    def _probe_head(self, url) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Cheap first-page probe: returns (playlist entry count, first entry ID).
+        """
+        try:
+            if self._engine is not None:
+                data = self._engine.probe_head(url, self._session_args(url))
+            else:
+                cmd = ["yt-dlp", *self._session_args(url), "--flat-playlist", "-J", "--playlist-items", "1", url]
+                proc = _popen_group(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                self._track(proc)
+                try:
+                    stdout, _ = proc.communicate()
+                finally:
+                    self._untrack(proc)
+                data = json.loads(stdout) if proc.returncode == 0 and not self._stop_event.is_set() else None
+        except Exception:
+            data = None
+        if not data:
+            return None, None
+
+        entries = data.get("entries") or []
+        first = entry_from_probe(entries[0]) if entries else None
+        return data.get("playlist_count"), first.video_id if first else None
+
+    def _iter_probe_process(self, url, status_callback) -> Iterator[dict]:
+        """
+        Run `yt-dlp --flat-playlist -j` and yield one JSON record per line as it
+        is printed: playlist entries for a playlist, or the single video's info.
+        Closing the generator terminates the probe process.
+        """
+        cmd = ["yt-dlp", *self._session_args(url), "--flat-playlist", "-j", url]
+        proc = _popen_group(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+        self._track(proc)
+
+        # Drain stderr on the side so a chatty extractor can't block stdout
+        stderr_tail = deque(maxlen=20)
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_tail.extend(line.rstrip() for line in proc.stderr), daemon=True
+        )
+        stderr_thread.start()
+
+        try:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                if self._stop_event.is_set():
+                    break
+                line = line.strip()
+                if not line.startswith("{"):
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+            proc.wait()
+            stderr_thread.join(timeout=1)
+            if proc.returncode not in (0, None) and not self._stop_event.is_set():
+                # not necessarily an error; treat as single item / end of listing
+                if status_callback:
+                    status_callback(f"Playlist probe returned non-zero: {' '.join(stderr_tail)}")
+        finally:
+            if proc.poll() is None:
+                _signal_group(proc)
+                _reap(proc)
+            self._untrack(proc)
+
+    @staticmethod
+    def _chain_first(first, rest):
+        yield first
+        yield from rest
+
+    @staticmethod
+    def _is_playlist_record(record: dict) -> bool:
+        """True for a flat playlist entry, False for a (single) video's own info."""
+        return bool(record.get("playlist_id") or record.get("playlist")) or record.get("_type") in ("url", "url_transparent")
+
+    @staticmethod
+    def _single_from_probe(url: str, data: dict) -> PlaylistEntry:
+        extractor = data.get("extractor_key") or data.get("ie_key")
+        return PlaylistEntry(
+            url=url,
+            video_id=data.get("id"),
+            extractor=extractor.lower() if extractor else None,
+            title=data.get("title"),
+            uploader=data.get("channel") or data.get("uploader"),
+            duration=data.get("duration"),
+            filesize_approx=data.get("filesize_approx") or data.get("filesize"),
+        )
+
+    def _start_item(self, progress_callback, item_index, item_count, entry, status_callback) -> _ItemProgress:
+        """
+        Mark an item as pending in the journal (noting a .part file left by an
+        earlier run) and return its progress tracker. A tracker is returned even
+        without progress_callback, since metrics are taken from it.
+        """
+        journal = self._journal
+
+        def on_part(path):
+            with self._transfer_lock:
+                self._part_files.add(path)
+            if journal is not None:
+                journal.partial(item_index, path)
+
+        if journal is not None:
+            part = journal.partial_path(item_index)
+            if part and status_callback:
+                status_callback(f"Continuing partial download: {os.path.basename(part)}")
+            journal.pending(item_index, entry.url, entry.video_id)
+        return _ItemProgress(progress_callback, item_index, item_count, part_callback=on_part)
+
+    def _download_one_with_retries(
+        self, url, out_dir, mode, retries, retry_delay, status_callback, extra_ytdlp_args, progress=None
+    ):
+        """
+        Download one item (the caller has already taken a pacing token).
+        Failures are retried `retries` times with jittered exponential backoff;
+        rate-limited failures get up to THROTTLE_RETRIES more attempts and are
+        reported to the host's pacer, which slows every job using that host.
+        """
+        pacer = get_rate_limiter().pacer_for(url)
+        throttled = threading.Event()
+        # checked once here, so the per-line cost is nil when yt-dlp output isn't logged
+        log_lines = _ytdlp_log.isEnabledFor(logging.DEBUG)
+        log_errors = _ytdlp_log.isEnabledFor(logging.WARNING)
+        context = {"job": self._job_id, "item": progress.item_index if progress is not None else None}
+        session = self._session
+        session_rejected = threading.Event()
+
+        def watch(line):
+            if is_throttle_message(line):
+                throttled.set()
+            if session is not None and is_session_rejected(line):
+                session_rejected.set()
+            if progress is not None:
+                progress.note_output(line)
+            if log_lines:
+                _ytdlp_log.debug(line, extra=context)
+            elif log_errors and line.startswith("ERROR:"):
+                _ytdlp_log.warning(line, extra=context)
+            if status_callback:
+                status_callback(line)
 
-    def _download_one_with_retries(self, url, out_dir, mode, retries, retry_delay, status_callback, extra_ytdlp_args):
         attempts = 0
-        while attempts <= retries and not self._stop_event.is_set():
+        throttle_retries = 0
+        while not self._stop_event.is_set():
             attempts += 1
+            throttled.clear()
+            session_rejected.clear()
+            if progress is not None:
+                progress.attempts = attempts
             if status_callback:
                 status_callback(f"Attempt {attempts} for {url}")
-            success = self._download_one(url, out_dir, mode, status_callback, extra_ytdlp_args)
+            success = self._download_one(url, out_dir, mode, watch, extra_ytdlp_args, progress)
             if success:
+                pacer.report_success()
                 return True
-            if attempts <= retries:
+            if session_rejected.is_set():
+                # the next attempt starts a new YouTube session
+                session.rejected()
+
+            if throttled.is_set():
+                pacer.report_throttle()
+                throttle_retries += 1
+                _log.warning("Rate limited by %s", pacer.host, extra={**context, "url": url, "attempts": attempts})
+                if progress is not None:
+                    progress.throttled = throttle_retries
+                if throttle_retries > THROTTLE_RETRIES:
+                    return False
+                if status_callback:
+                    status_callback(
+                        f"Rate limited by {pacer.host}; backing off {pacer.backoff_remaining():.0f}s (all jobs)."
+                    )
+            elif attempts - throttle_retries > retries:
+                return False
+            else:
+                wait = retry_backoff(attempts - throttle_retries, retry_delay)
+                _log.info("Retrying in %.1fs", wait, extra={**context, "url": url, "attempts": attempts})
                 if status_callback:
-                    status_callback(f"Retrying in {retry_delay} seconds...")
-                for _ in range(int(retry_delay)):
-                    if self._stop_event.is_set():
-                        break
-                    time.sleep(1)
-                frac = retry_delay - int(retry_delay)
-                if frac and not self._stop_event.is_set():
-                    time.sleep(frac)
+                    status_callback(f"Retrying in {wait:.1f} seconds...")
+                if self._stop_event.wait(wait):
+                    return False
+
+            # the retry is a new request: take a pacing token like any item start
+            if not pacer.acquire(self._stop_event, self._delay):
+                return False
         return False
 
-    def _download_one(self, url, out_dir, mode, status_callback, extra_ytdlp_args):
+    def _download_one(self, url, out_dir, mode, status_callback, extra_ytdlp_args, progress=None):
         """
         Build a yt-dlp command for either audio or video and run it, streaming output to status_callback.
+        Progress is reported as ProgressEvents through `progress` (an _ItemProgress) when given.
         Returns True on success, False otherwise.
         """
+        if self._engine is not None:
+            # progress comes from hooks; skip yt-dlp's own progress printing
+            progress_args = ["--no-progress"] if progress else []
+            cmd = self._build_command(url, out_dir, mode, extra_ytdlp_args, progress_args)
+            if status_callback:
+                status_callback(f"Running in-process: {' '.join(shlex.quote(x) for x in cmd)}")
+            success = self._engine.download(cmd[1:], status_callback, progress)
+            if status_callback:
+                status_callback(
+                    "yt-dlp finished successfully for item." if success else "yt-dlp reported a failure for item."
+                )
+            if success:
+                self._report_throughput(progress, status_callback)
+            return success
+
+        progress_args = progress_template_args() if progress else []
+        cmd = self._build_command(url, out_dir, mode, extra_ytdlp_args, progress_args)
+        success = self._run_process(cmd, status_callback, progress)
+        if success:
+            self._report_throughput(progress, status_callback)
+        return success
+
+    def _report_throughput(self, progress: Optional[_ItemProgress], status_callback):
+        """Log the achieved transfer rate of one item and add it to the job total."""
+        if progress is None or not progress.downloaded_bytes:
+            return
+        size = progress.downloaded_bytes
+        with self._transfer_lock:
+            self._job_bytes += size
+        seconds = progress.download_seconds
+        if status_callback:
+            if seconds > 0:
+                status_callback(f"Downloaded {format_size(size)} in {seconds:.1f}s ({format_size(size / seconds)}/s)")
+            else:
+                status_callback(f"Downloaded {format_size(size)}")
+
+    def _build_command(self, url, out_dir, mode, extra_ytdlp_args, progress_args=None) -> List[str]:
+        """
+        Build the full yt-dlp command line (starting with "yt-dlp") for one item.
+        """
         # output template: include playlist_index if playlist; otherwise just title
         out_template = os.path.join(out_dir, "%(playlist_index)s - %(title)s.%(ext)s")
         # For single items, playlist_index may not be present; that's okay.
 
         base_cmd = ["yt-dlp"]
 
+        # cookies and session state shared by the job (extra args can override them)
+        base_cmd.extend(self._session_args(url))
+
         # append extra args if provided
         if extra_ytdlp_args:
             base_cmd.extend(extra_ytdlp_args)
 
-        if mode == "audio":
+        if progress_args:
+            base_cmd.extend(progress_args)
+
+        if mode == "audio" and self._postprocessor is not None:
+            # download only; engine.postprocess transcodes and tags afterwards
+            cmd = base_cmd + deferred_audio_args() + ["-o", out_template, url]
+        elif mode == "audio":
             cmd = base_cmd + [
                 "-x",
                 "--audio-format", "mp3",
@@ -273,37 +1487,44 @@ class Downloader:
         else:
             # video mode - prefer requested extension if possible, allow best fallback
             # user can pass extra_ytdlp_args to change format selection
-            cmd = base_cmd + [
-                "-f", "bv*+ba/best",
+            has_format = any(a in ("-f", "--format") for a in (extra_ytdlp_args or []))
+            cmd = base_cmd + ([] if has_format else ["-f", DEFAULT_VIDEO_FORMAT]) + [
                 "-o", os.path.join(out_dir, "%(playlist_index)s - %(title)s.%(ext)s"),
                 url
             ]
 
+        return cmd
+
+    def _run_process(self, cmd, status_callback, progress=None) -> bool:
+        """
+        Run a yt-dlp subprocess, streaming output to status_callback
+        (progress template lines go to `progress` instead).
+        Returns True on success, False otherwise.
+        """
         if status_callback:
             status_callback(f"Running: {' '.join(shlex.quote(x) for x in cmd)}")
 
+        proc: Optional[subprocess.Popen] = None
         try:
             # start process
-            self._current_process = subprocess.Popen(
+            proc = _popen_group(
                 cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
             )
+            self._track(proc)
 
             # stream output
-            assert self._current_process.stdout is not None
-            for line in self._current_process.stdout:
+            assert proc.stdout is not None
+            for line in proc.stdout:
                 if self._stop_event.is_set():
-                    # try to terminate process gracefully
-                    try:
-                        self._current_process.terminate()
-                    except Exception:
-                        pass
+                    # stop() already signalled the group; don't wait for EOF
                     break
+                line = line.rstrip()
+                if progress and progress.feed_line(line):
+                    continue
                 if status_callback:
-                    status_callback(line.rstrip())
+                    status_callback(line)
 
-            self._current_process.wait()
-            code = self._current_process.returncode
-            self._current_process = None
+            code = _reap(proc) if self._stop_event.is_set() else proc.wait()
 
             if code == 0:
                 if status_callback:
@@ -315,12 +1536,14 @@ class Downloader:
                 return False
 
         except Exception as e:
+            _log.warning("Exception running yt-dlp", exc_info=True, extra={"job": self._job_id})
             if status_callback:
                 status_callback(f"Exception running yt-dlp: {e}")
-            try:
-                if self._current_process:
-                    self._current_process.terminate()
-            except Exception:
-                pass
-            self._current_process = None
+            if proc is not None:
+                _signal_group(proc)
+                _reap(proc)
             return False
+
+        finally:
+            if proc is not None:
+                self._untrack(proc)
@@ -0,0 +1,215 @@
+"""
+In-process yt-dlp engine.
+
+Drives yt_dlp.YoutubeDL directly instead of forking a `yt-dlp` process per
+playlist item, so the interpreter start-up and extractor import cost is paid
+once per job rather than once per item.
+
+The engine takes the same argument list the subprocess path would pass on the
+command line and converts it with yt_dlp.parse_options(), so both engines
+honour exactly the same options.
+"""
+
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from engine.progress import PHASE_DOWNLOAD, PHASE_POSTPROCESS
+
+# YoutubeDL options set by engine.session's arguments
+_SESSION_OPTS = ("cookiefile", "cookiesfrombrowser", "extractor_args")
+
+
+class _CallbackLogger:
+    """
+    Minimal yt-dlp logger that forwards output to a status callback.
+    The callback (and progress sink) is swapped per item so one YoutubeDL
+    can serve many items.
+    """
+
+    def __init__(self):
+        self.callback: Optional[Callable[[str], None]] = None
+        self.progress = None  # downloader._ItemProgress for the current item
+
+    def _emit(self, msg: str):
+        if self.callback:
+            for line in str(msg).splitlines():
+                self.callback(line.rstrip())
+
+    def debug(self, msg):
+        # yt-dlp routes both screen output and verbose output through debug()
+        if not str(msg).startswith("[debug] "):
+            self._emit(msg)
+
+    def info(self, msg):
+        self._emit(msg)
+
+    def warning(self, msg):
+        self._emit(f"WARNING: {msg}")
+
+    def error(self, msg):
+        self._emit(msg)
+
+
+class InProcessEngine:
+    """
+    One engine is created per Downloader job and closed when the job ends.
+    YoutubeDL is not thread-safe, so each worker thread keeps its own instance
+    per distinct option set and reuses it for every item it downloads.
+    """
+
+    def __init__(self, stop_event: threading.Event):
+        import yt_dlp  # deferred: only needed when this engine is selected
+
+        self._yt_dlp = yt_dlp
+        self._stop_event = stop_event
+        self._local = threading.local()
+        self._all_lock = threading.Lock()
+        self._all: List[object] = []
+
+    # -----------------
+    # Public API
+    # -----------------
+    def iter_probe(
+        self, url: str, status_callback: Optional[Callable[[str], None]] = None, session_args: Optional[List[str]] = None,
+    ) -> Iterator[dict]:
+        """
+        Flat-extract `url` lazily (the in-process equivalent of
+        `yt-dlp --flat-playlist -j`). For a playlist, yields one entry dict per
+        item as the extractor pages through it; otherwise yields the single
+        video's info. Yields nothing if extraction failed. `session_args` are
+        the job's cookie / session options (see engine.session).
+        """
+        logger = _CallbackLogger()
+        logger.callback = status_callback
+        opts = {
+            **self._session_opts(session_args),
+            "extract_flat": "in_playlist",
+            "skip_download": True,
+            "quiet": True,
+            "logger": logger,
+        }
+        with self._yt_dlp.YoutubeDL(opts) as ydl:
+            try:
+                # process=False keeps playlist entries as a lazy generator
+                info = ydl.extract_info(url, download=False, process=False)
+                for _ in range(3):
+                    if not info or info.get("_type") not in ("url", "url_transparent"):
+                        break
+                    info = ydl.extract_info(info["url"], download=False, ie_key=info.get("ie_key"), process=False)
+            except Exception as e:
+                if status_callback:
+                    status_callback(f"Playlist probe returned an error (treat as single item): {e}")
+                return
+
+            if not info:
+                return
+
+            if info.get("_type") not in ("playlist", "multi_video"):
+                yield ydl.sanitize_info(info)
+                return
+
+            playlist_count = info.get("playlist_count")
+            for index, entry in enumerate(info.get("entries") or [], start=1):
+                if self._stop_event.is_set():
+                    return
+                if not entry:
+                    continue
+                entry = dict(entry)
+                entry.setdefault("_type", "url")
+                entry.setdefault("playlist_id", info.get("id"))
+                entry.setdefault("playlist_index", index)
+                if playlist_count:
+                    entry.setdefault("playlist_count", playlist_count)
+                yield ydl.sanitize_info(entry)
+
+    def probe_head(self, url: str, session_args: Optional[List[str]] = None) -> Optional[dict]:
+        """
+        Flat-extract only the first playlist item (cheap revalidation probe).
+        Returns the sanitized info dict, or None if extraction failed.
+        """
+        opts = {
+            **self._session_opts(session_args),
+            "extract_flat": "in_playlist",
+            "skip_download": True,
+            "quiet": True,
+            "playlist_items": "1",
+            "logger": _CallbackLogger(),
+        }
+        try:
+            with self._yt_dlp.YoutubeDL(opts) as ydl:
+                return ydl.sanitize_info(ydl.extract_info(url, download=False))
+        except Exception:
+            return None
+
+    def download(self, args: List[str], status_callback: Optional[Callable[[str], None]] = None, progress=None) -> bool:
+        """
+        Download using yt-dlp command-line style `args` (without the leading
+        "yt-dlp"; the last element is the URL). Progress hook data is passed to
+        `progress.feed_hook()` when given. Returns True on success.
+        """
+        if self._stop_event.is_set():
+            return False
+
+        url = args[-1]
+        ydl, logger = self._instance_for(tuple(args[:-1]))
+        logger.callback = status_callback
+        logger.progress = progress
+        try:
+            return ydl.download([url]) == 0
+        except self._yt_dlp.utils.DownloadCancelled:
+            return False
+        except Exception as e:
+            if status_callback:
+                status_callback(f"ERROR: {e}")
+            return False
+        finally:
+            logger.callback = None
+            logger.progress = None
+
+    def close(self):
+        """Release every YoutubeDL instance created for this job."""
+        with self._all_lock:
+            instances, self._all = self._all, []
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _session_opts(self, session_args: Optional[List[str]]) -> dict:
+        """The YoutubeDL options that session command-line args set (cookies, extractor args)."""
+        if not session_args:
+            return {}
+        ydl_opts = self._yt_dlp.parse_options(list(session_args)).ydl_opts
+        return {key: ydl_opts[key] for key in _SESSION_OPTS if ydl_opts.get(key)}
+
+    def _instance_for(self, option_args: Tuple[str, ...]):
+        cache: Dict[Tuple[str, ...], tuple] = getattr(self._local, "instances", None)
+        if cache is None:
+            cache = self._local.instances = {}
+
+        if option_args not in cache:
+            ydl_opts = self._yt_dlp.parse_options(list(option_args)).ydl_opts
+            logger = _CallbackLogger()
+            ydl_opts["logger"] = logger
+            ydl_opts["progress_hooks"] = [
+                lambda d, logger=logger: self._on_hook(logger, PHASE_DOWNLOAD, d)
+            ]
+            ydl_opts["postprocessor_hooks"] = [
+                lambda d, logger=logger: self._on_hook(logger, PHASE_POSTPROCESS, d)
+            ]
+            ydl = self._yt_dlp.YoutubeDL(ydl_opts)
+            cache[option_args] = (ydl, logger)
+            with self._all_lock:
+                self._all.append(ydl)
+
+        return cache[option_args]
+
+    def _on_hook(self, logger: _CallbackLogger, phase: str, status: dict):
+        if logger.progress is not None:
+            logger.progress.feed_hook(phase, status)
+        if self._stop_event.is_set():
+            raise self._yt_dlp.utils.DownloadCancelled("Download cancelled by user.")
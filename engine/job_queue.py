@@ -0,0 +1,480 @@
+"""
+Central download job queue shared by the Music and Video controllers.
+
+Jobs are accepted at any time and started by a small scheduler that honours a
+global concurrency limit, per-mode limits ("audio" / "video") and job
+priorities (higher runs first, FIFO within a priority). Each running job gets
+its own Downloader, so several jobs can be in flight at once.
+
+With a JobJournal attached, every job and its per-item progress is written
+to disk; resume_unfinished() re-queues jobs that were still queued or running
+when the app stopped, and their Downloaders skip items that already finished.
+
+Usage (example):
+    from engine.job_queue import get_download_queue
+
+    queue = get_download_queue()
+    job = queue.submit(
+        url="https://www.youtube.com/playlist?list=...",
+        out_dir="/home/eric/Music",
+        mode="audio",
+        priority=0,
+        status_callback=print,
+        finished_callback=lambda ok: print("done", ok),
+        delay=2,                # any other Downloader.download() keyword
+    )
+    queue.pause()               # no new jobs start; running jobs continue
+    queue.resume()
+    queue.cancel(job.job_id)
+"""
+
+import itertools
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from engine.downloader import DownloadedItem, Downloader
+from engine.metrics import JobMetrics, get_metrics
+from utils.logging import get_logger
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+_log = get_logger("queue")
+
+
+@dataclass
+class DownloadJob:
+    job_id: int
+    url: str
+    out_dir: str
+    mode: str
+    priority: int = 0
+    status: str = JOB_QUEUED
+    progress: int = 0                    # overall percent, from progress events
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    download_kwargs: dict = field(default_factory=dict, repr=False)
+    status_callback: Optional[Callable[[str], None]] = field(default=None, repr=False)
+    progress_callback: Optional[Callable] = field(default=None, repr=False)
+    finished_callback: Optional[Callable[[bool], None]] = field(default=None, repr=False)
+    downloader: Optional[Downloader] = field(default=None, repr=False)
+    job_key: Optional[str] = None        # journal key, stable across restarts
+    metrics: Optional[JobMetrics] = field(default=None, repr=False)   # set when the job finishes
+    downloaded: List[DownloadedItem] = field(default_factory=list, repr=False)  # set when the job finishes
+    _item_progress: Dict[int, float] = field(default_factory=dict, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+
+class DownloadQueue:
+    def __init__(
+        self,
+        max_concurrent_jobs: int = 2,
+        mode_limits: Optional[Dict[str, int]] = None,
+        journal=None,
+        metrics_textfile: str = "",
+    ):
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._jobs: Dict[int, DownloadJob] = {}
+        self._order: Dict[int, int] = {}      # job_id -> submission sequence (FIFO tiebreak)
+        self._paused = False
+        self._shutting_down = False
+        self._finishing = 0                   # finished jobs whose finished_callback is still running
+        self._listeners: List[Callable[[], None]] = []
+        self.max_concurrent_jobs = max(1, int(max_concurrent_jobs))
+        self.mode_limits: Dict[str, int] = dict(mode_limits or {})
+        self.journal = journal                 # engine.journal.JobJournal, or None
+        self.metrics_textfile = metrics_textfile  # Prometheus textfile rewritten after each job ("" = off)
+
+    # -----------------
+    # Public API
+    # -----------------
+    def submit(
+        self,
+        url: str,
+        out_dir: str,
+        mode: str = "audio",
+        priority: int = 0,
+        status_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable] = None,
+        finished_callback: Optional[Callable[[bool], None]] = None,
+        job_key: Optional[str] = None,
+        **download_kwargs,
+    ) -> DownloadJob:
+        """
+        Queue a download. Extra keyword arguments are passed through to
+        Downloader.download(). Returns the DownloadJob.
+        job_key continues a journaled job (see resume_unfinished()).
+        """
+        resuming = job_key is not None
+        if self.journal is not None and job_key is None:
+            job_key = uuid.uuid4().hex
+            self._journal_call(
+                "add_job", job_key, url, out_dir, mode, priority,
+                {k: v for k, v in download_kwargs.items() if k not in ("probe_cache", "media_store")},
+            )
+
+        with self._lock:
+            job = DownloadJob(
+                job_id=next(self._ids),
+                url=url,
+                out_dir=out_dir,
+                mode=mode,
+                priority=int(priority),
+                download_kwargs=download_kwargs,
+                status_callback=status_callback,
+                progress_callback=progress_callback,
+                finished_callback=finished_callback,
+                job_key=job_key,
+            )
+            self._jobs[job.job_id] = job
+            self._order[job.job_id] = next(self._seq)
+
+        self._emit(job, f"{'Resumed' if resuming else 'Queued'} job {job.job_id} ({mode}): {url}")
+        _log.info("%s %s job", "Resumed" if resuming else "Queued", mode, extra={"job": job.job_id, "url": url})
+        self._schedule()
+        return job
+
+    def cancel(self, job_id: int):
+        """Cancel a queued job, or stop a running one."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or not job.active:
+                return
+            if job.status == JOB_QUEUED:
+                job.status = JOB_CANCELLED
+                job.finished_at = time.time()
+                self._journal_call("set_job_status", job.job_key, JOB_CANCELLED)
+                self._finishing += 1
+                downloader = None
+            else:
+                downloader = job.downloader
+
+        if downloader is not None:
+            downloader.stop()
+        else:
+            self._emit(job, "Job cancelled before it started.")
+            self._notify_finished(job, False)
+        self._changed()
+
+    def resume_unfinished(
+        self,
+        status_callback: Optional[Callable[[str], None]] = None,
+        resume: Optional[Callable[[dict, Optional[Callable[[str], None]]], DownloadJob]] = None,
+    ) -> List[DownloadJob]:
+        """
+        Re-queue journaled jobs that had not finished when the app last stopped.
+        resume(record, status_callback) re-submits one journal record (see
+        controllers.jobs.resume_unfinished, which restores the caches and the
+        controller's finish handling); without it the record is submitted as is
+        and callbacks given at the original submit() are not restored.
+        """
+        if self.journal is None:
+            return []
+        active_keys = {j.job_key for j in self.jobs() if j.active}
+        resumed = []
+        for record in self._journal_call("unfinished_jobs") or []:
+            if record["job_key"] in active_keys:
+                continue
+            if resume is not None:
+                resumed.append(resume(record, status_callback))
+                continue
+            resumed.append(self.submit(
+                url=record["url"],
+                out_dir=record["out_dir"],
+                mode=record["mode"],
+                priority=record["priority"],
+                status_callback=status_callback,
+                job_key=record["job_key"],
+                **record["options"],
+            ))
+        return resumed
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop for application exit: no new jobs start and running downloads are
+        stopped, but the journal keeps them (and queued jobs) as unfinished so
+        resume_unfinished() picks them up on the next start.
+        """
+        with self._lock:
+            self._paused = True
+            self._shutting_down = True
+            downloaders = [j.downloader for j in self._jobs.values() if j.status == JOB_RUNNING and j.downloader]
+        for downloader in downloaders:
+            # keep .part files: the resumed job continues them
+            downloader.stop(cleanup=self.journal is None)
+        deadline = time.monotonic() + timeout
+        for downloader in downloaders:
+            downloader.join(max(0.0, deadline - time.monotonic()))
+
+    def cancel_all(self, mode: Optional[str] = None):
+        for job in self.jobs():
+            if job.active and (mode is None or job.mode == mode):
+                self.cancel(job.job_id)
+
+    def set_priority(self, job_id: int, priority: int):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.status == JOB_QUEUED:
+                job.priority = int(priority)
+        self._changed()
+        self._schedule()
+
+    def pause(self):
+        """Stop starting new jobs. Running jobs are left to finish."""
+        with self._lock:
+            self._paused = True
+        self._changed()
+
+    def resume(self):
+        with self._lock:
+            self._paused = False
+        self._changed()
+        self._schedule()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def set_limits(self, max_concurrent_jobs: Optional[int] = None, mode_limits: Optional[Dict[str, int]] = None):
+        with self._lock:
+            if max_concurrent_jobs is not None:
+                self.max_concurrent_jobs = max(1, int(max_concurrent_jobs))
+            if mode_limits is not None:
+                self.mode_limits = dict(mode_limits)
+        self._schedule()
+
+    def jobs(self) -> List[DownloadJob]:
+        """Snapshot of all jobs in queue order: running, then queued by priority, then finished."""
+        rank = {JOB_RUNNING: 0, JOB_QUEUED: 1}
+        with self._lock:
+            return sorted(
+                self._jobs.values(),
+                key=lambda j: (
+                    rank.get(j.status, 2),
+                    -j.priority if j.status == JOB_QUEUED else 0,
+                    self._order[j.job_id],
+                ),
+            )
+
+    def clear_finished(self):
+        with self._lock:
+            for job_id in [j.job_id for j in self._jobs.values() if not j.active]:
+                del self._jobs[job_id]
+                del self._order[job_id]
+        self._changed()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no job is queued or running and the finished_callbacks of
+        finished jobs have returned. Returns False on timeout.
+        """
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: not self._finishing and not any(j.active for j in self._jobs.values()),
+                timeout,
+            )
+
+    def add_listener(self, callback: Callable[[], None]):
+        """callback() is called (from any thread) whenever the queue changes."""
+        self._listeners.append(callback)
+
+    # -----------------
+    # Scheduling
+    # -----------------
+    def _schedule(self):
+        to_start = []
+        with self._lock:
+            if self._paused:
+                return
+            running = [j for j in self._jobs.values() if j.status == JOB_RUNNING]
+            per_mode: Dict[str, int] = {}
+            for j in running:
+                per_mode[j.mode] = per_mode.get(j.mode, 0) + 1
+
+            queued = sorted(
+                (j for j in self._jobs.values() if j.status == JOB_QUEUED),
+                key=lambda j: (-j.priority, self._order[j.job_id]),
+            )
+            slots = self.max_concurrent_jobs - len(running)
+            for job in queued:
+                if slots <= 0:
+                    break
+                limit = self.mode_limits.get(job.mode)
+                if limit is not None and per_mode.get(job.mode, 0) >= limit:
+                    continue
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                get_metrics().observe("seadog_job_queue_wait_seconds", job.started_at - job.created_at, mode=job.mode)
+                self._journal_call("set_job_status", job.job_key, JOB_RUNNING)
+                job.downloader = Downloader()
+                per_mode[job.mode] = per_mode.get(job.mode, 0) + 1
+                slots -= 1
+                to_start.append(job)
+
+        for job in to_start:
+            self._start(job)
+        if to_start:
+            self._changed()
+
+    def _start(self, job: DownloadJob):
+        self._emit(job, f"Starting job {job.job_id}.")
+        _log.info("Starting job", extra={"job": job.job_id, "url": job.url})
+        kwargs = dict(job.download_kwargs)
+        if self.journal is not None and job.job_key:
+            kwargs["journal"] = self._journal_call("handle", job.job_key)
+        try:
+            job.downloader.download(
+                url=job.url,
+                out_dir=job.out_dir,
+                mode=job.mode,
+                status_callback=lambda msg, job=job: self._emit(job, msg),
+                progress_callback=lambda event, job=job: self._on_progress(job, event),
+                finished_callback=lambda ok, job=job: self._on_finished(job, ok),
+                job_id=job.job_id,
+                **kwargs,
+            )
+        except Exception as e:
+            _log.exception("Failed to start job", extra={"job": job.job_id, "url": job.url})
+            self._emit(job, f"Failed to start job: {e}")
+            self._on_finished(job, False)
+
+    def _on_progress(self, job: DownloadJob, event):
+        if event.phase == "download" and event.fraction is not None:
+            # a job's items report from several worker threads; jobs() reads under the same lock
+            with self._lock:
+                job._item_progress[event.item_index] = event.fraction
+                total = event.item_count or len(job._item_progress)
+                job.progress = int(100 * sum(job._item_progress.values()) / total)
+        if job.progress_callback:
+            job.progress_callback(event)
+
+    def _on_finished(self, job: DownloadJob, ok: bool):
+        with self._lock:
+            cancelled = job.downloader is not None and job.downloader.cancelled
+            job.status = JOB_DONE if ok else (JOB_CANCELLED if cancelled else JOB_FAILED)
+            job.finished_at = time.time()
+            if ok:
+                job.progress = 100
+            if job.downloader is not None:
+                job.metrics = job.downloader.metrics
+                job.downloaded = list(job.downloader.downloaded)
+            job.downloader = None
+            if not self._shutting_down:
+                self._journal_call("set_job_status", job.job_key, job.status)
+            self._finishing += 1
+
+        _log.log(
+            logging.INFO if ok else logging.WARNING, "Job %s", job.status,
+            extra={
+                "job": job.job_id, "url": job.url, "status": job.status,
+                "seconds": round(job.finished_at - (job.started_at or job.finished_at), 3),
+            },
+        )
+        self._write_metrics()
+        self._notify_finished(job, ok)
+        self._changed()
+        self._schedule()
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    @staticmethod
+    def _emit(job: DownloadJob, msg: str):
+        if job.status_callback:
+            job.status_callback(f"[job {job.job_id}] {msg}")
+
+    def _notify_finished(self, job: DownloadJob, ok: bool):
+        # _finishing was counted up when the job's status was set
+        try:
+            if job.finished_callback:
+                job.finished_callback(ok)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._finishing -= 1
+
+    def _write_metrics(self):
+        if not self.metrics_textfile:
+            return
+        try:
+            get_metrics().write_prometheus(self.metrics_textfile)
+        except OSError:
+            pass
+
+    def _journal_call(self, method: str, *args):
+        """Call a JobJournal method; journal errors never break the queue."""
+        if self.journal is None:
+            return None
+        try:
+            return getattr(self.journal, method)(*args)
+        except Exception:
+            return None
+
+    def _changed(self):
+        with self._idle:
+            self._idle.notify_all()
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+_queue: Optional[DownloadQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_download_queue() -> DownloadQueue:
+    """
+    The process-wide DownloadQueue, created on first use with limits from config.
+    Later changes to the limit keys in config are applied automatically.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            from utils.config import ConfigManager
+
+            config = ConfigManager()
+
+            def limits():
+                return {
+                    "max_concurrent_jobs": config.get("max_concurrent_jobs", 2),
+                    "mode_limits": {
+                        "audio": config.get("max_concurrent_audio_jobs", 1),
+                        "video": config.get("max_concurrent_video_jobs", 1),
+                    },
+                }
+
+            def on_config_changed(key, value):
+                if key in ("max_concurrent_jobs", "max_concurrent_audio_jobs", "max_concurrent_video_jobs"):
+                    _queue.set_limits(**limits())
+                elif key == "metrics_textfile":
+                    _queue.metrics_textfile = value or ""
+
+            journal = None
+            if config.get("resume_interrupted_jobs", True):
+                try:
+                    from engine.journal import JobJournal
+                    journal = JobJournal()
+                    journal.prune()
+                except Exception:
+                    journal = None
+
+            _queue = DownloadQueue(journal=journal, metrics_textfile=config.get("metrics_textfile", ""), **limits())
+            config.add_listener(on_config_changed)
+        return _queue
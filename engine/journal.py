@@ -0,0 +1,228 @@
+"""
+Durable job journal.
+
+Records every queued job and the state of each of its items so work that was
+interrupted (app closed, crash, power loss) can be resumed on the next start:
+
+- jobs: url, out_dir, mode, priority, the JSON-serialisable download options
+  and a status (queued / running / done / failed / cancelled).
+- items: one row per playlist index with state pending / partial / done /
+  failed, the video ID and, for partial items, the yt-dlp .part file.
+
+On resume, items that are done are skipped and partial items are downloaded
+again with the same output template, so yt-dlp continues the .part file
+instead of starting over.
+
+Records live in a small SQLite database (WAL mode) next to config.json.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.paths import config_path
+
+ITEM_PENDING = "pending"
+ITEM_PARTIAL = "partial"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+# Job statuses that mean "not finished yet"
+RESUMABLE_STATUSES = ("queued", "running")
+
+
+class JobJournal:
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            db_path = config_path("jobs.sqlite3")
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        os.makedirs(self.db_path.parent, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_key     TEXT PRIMARY KEY,
+                url         TEXT NOT NULL,
+                out_dir     TEXT NOT NULL,
+                mode        TEXT NOT NULL,
+                priority    INTEGER NOT NULL DEFAULT 0,
+                options     TEXT NOT NULL DEFAULT '{}',
+                status      TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                updated_at  REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                job_key     TEXT NOT NULL,
+                idx         INTEGER NOT NULL,
+                url         TEXT,
+                video_id    TEXT,
+                state       TEXT NOT NULL,
+                part_path   TEXT,
+                updated_at  REAL NOT NULL,
+                PRIMARY KEY (job_key, idx)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+
+    # -----------------
+    # Jobs
+    # -----------------
+    def add_job(self, job_key: str, url: str, out_dir: str, mode: str, priority: int = 0, options: Optional[dict] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_key, url, out_dir, mode, priority, options, status, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_key, url, out_dir, mode, int(priority), json.dumps(serializable_options(options)), now, now),
+            )
+            self._conn.commit()
+
+    def set_job_status(self, job_key: str, status: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_key = ?", (status, time.time(), job_key)
+            )
+            self._conn.commit()
+
+    def unfinished_jobs(self) -> List[dict]:
+        """Jobs that were queued or running when the app last stopped, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_key, url, out_dir, mode, priority, options FROM jobs"
+                f" WHERE status IN ({','.join('?' * len(RESUMABLE_STATUSES))}) ORDER BY created_at",
+                RESUMABLE_STATUSES,
+            ).fetchall()
+        jobs = []
+        for job_key, url, out_dir, mode, priority, options in rows:
+            try:
+                options = json.loads(options)
+            except ValueError:
+                options = {}
+            jobs.append({
+                "job_key": job_key, "url": url, "out_dir": out_dir,
+                "mode": mode, "priority": priority, "options": options,
+            })
+        return jobs
+
+    def prune(self, older_than: float = 7 * 86400):
+        """Forget finished jobs (and their items) older than `older_than` seconds."""
+        cutoff = time.time() - older_than
+        with self._lock:
+            keys = [
+                k for (k,) in self._conn.execute(
+                    f"SELECT job_key FROM jobs WHERE status NOT IN ({','.join('?' * len(RESUMABLE_STATUSES))})"
+                    " AND updated_at < ?",
+                    (*RESUMABLE_STATUSES, cutoff),
+                )
+            ]
+            self._conn.executemany("DELETE FROM items WHERE job_key = ?", [(k,) for k in keys])
+            self._conn.executemany("DELETE FROM jobs WHERE job_key = ?", [(k,) for k in keys])
+            self._conn.commit()
+
+    # -----------------
+    # Items
+    # -----------------
+    def set_item(self, job_key: str, idx: int, state: str, url: Optional[str] = None,
+                 video_id: Optional[str] = None, part_path: Optional[str] = None):
+        """Insert or update one item. url/video_id/part_path keep their old value when None."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO items (job_key, idx, url, video_id, state, part_path, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (job_key, idx) DO UPDATE SET
+                    url = COALESCE(excluded.url, url),
+                    video_id = COALESCE(excluded.video_id, video_id),
+                    state = excluded.state,
+                    part_path = CASE WHEN excluded.state = 'partial'
+                                     THEN COALESCE(excluded.part_path, part_path) ELSE NULL END,
+                    updated_at = excluded.updated_at
+                """,
+                (job_key, idx, url, video_id, state, part_path, time.time()),
+            )
+            self._conn.commit()
+
+    def items(self, job_key: str) -> Dict[int, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, url, video_id, state, part_path FROM items WHERE job_key = ?", (job_key,)
+            ).fetchall()
+        return {
+            idx: {"url": url, "video_id": video_id, "state": state, "part_path": part_path}
+            for idx, url, video_id, state, part_path in rows
+        }
+
+    def handle(self, job_key: str) -> "JournalHandle":
+        return JournalHandle(self, job_key)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JournalHandle:
+    """
+    The journal as seen by one Downloader run: item updates for a single job,
+    plus the items already completed by an earlier (interrupted) run.
+    """
+
+    def __init__(self, journal: JobJournal, job_key: str):
+        self.journal = journal
+        self.job_key = job_key
+        self._previous = journal.items(job_key)
+        self._done_ids = {i["video_id"] for i in self._previous.values() if i["state"] == ITEM_DONE and i["video_id"]}
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self._previous)
+
+    def is_done(self, idx: int, video_id: Optional[str]) -> bool:
+        """True if an earlier run completed this item (matched by video ID, else by index)."""
+        if video_id:
+            return video_id in self._done_ids
+        previous = self._previous.get(idx)
+        return previous is not None and previous["state"] == ITEM_DONE
+
+    def partial_path(self, idx: int) -> Optional[str]:
+        """The .part file an earlier run left for this item, if it still exists."""
+        previous = self._previous.get(idx)
+        if previous and previous["state"] == ITEM_PARTIAL and previous["part_path"]:
+            if os.path.exists(previous["part_path"]):
+                return previous["part_path"]
+        return None
+
+    def pending(self, idx: int, url: str, video_id: Optional[str]):
+        self._set(idx, ITEM_PENDING, url=url, video_id=video_id)
+
+    def partial(self, idx: int, part_path: str):
+        self._set(idx, ITEM_PARTIAL, part_path=part_path)
+
+    def finished(self, idx: int, ok: bool):
+        self._set(idx, ITEM_DONE if ok else ITEM_FAILED)
+
+    def _set(self, idx, state, **fields):
+        # Journal trouble must never break a download
+        try:
+            self.journal.set_item(self.job_key, idx, state, **fields)
+        except Exception:
+            pass
+
+
+def serializable_options(options: Optional[dict]) -> dict:
+    """The JSON-serialisable subset of Downloader.download() keyword arguments."""
+    result = {}
+    for key, value in (options or {}).items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        result[key] = value
+    return result
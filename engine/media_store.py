@@ -0,0 +1,331 @@
+"""
+Global media store: reuse files already downloaded elsewhere.
+
+Every finished item is indexed by (extractor, video ID, variant) - the
+same (extractor, video ID) key as the download archive - where the variant is
+the mode plus the quality / format selection ("audio:0", "video:bv*+ba/best").
+When the same video is requested again, in any output directory, the
+existing file is linked into place instead of downloaded and transcoded
+again: a hardlink when both paths are on one filesystem, a reflink
+(copy-on-write clone) where the filesystem supports it, a plain copy
+otherwise. Music is never hardlinked: each copy gets its own tags (album,
+track number) after the download, and a hardlink would share them. A file
+changed in place after it was indexed (tagged) is recorded again with
+refresh(); lookup() drops records whose size no longer matches.
+
+scan() indexes existing libraries by reading the source URL that yt-dlp's
+--embed-metadata stores in the file (comment / purl tag). Only URLs whose
+extractor is known (YouTube) are indexed; an ID guessed from another site's
+URL could match a different site's video. Scanned files match any quality.
+
+Records live in a small SQLite database next to config.json.
+
+Usage (example):
+    from engine.media_store import get_media_store
+
+    store = get_media_store()
+    store.scan("/home/eric/Music")                     # index an existing library
+    path = store.lookup("youtube", "dQw4w9WgXcQ", "audio:0")   # an existing copy, or None
+"""
+
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils.paths import config_path
+
+ANY_QUALITY = "*"
+
+MEDIA_EXTENSIONS = {
+    "audio": (".mp3", ".m4a", ".opus", ".ogg", ".flac", ".wav", ".aac"),
+    "video": (".mp4", ".mkv", ".webm", ".mov", ".avi"),
+}
+
+# Linux FICLONE ioctl (btrfs, XFS, bcachefs...)
+_FICLONE = 0x40049409
+
+_YOUTUBE_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+
+MediaKey = Tuple[str, str]  # (extractor, video_id), as engine.archive.ArchiveKey
+
+
+def media_variant(mode: str, quality: Optional[str]) -> str:
+    """Store key for a mode and its quality / format selection."""
+    return f"{mode}:{quality or 'default'}"
+
+
+def media_key_from_url(url: str) -> Optional[MediaKey]:
+    """(extractor, video ID) of a YouTube watch URL; None for other sites, whose IDs can't be told from the URL."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.scheme.startswith("http"):
+        return None
+    host = parts.netloc.lower().split("@")[-1].split(":")[0]
+    segments = [s for s in parts.path.split("/") if s]
+    video_id = None
+    if host == "youtu.be" and segments:
+        video_id = segments[0]
+    elif host == "youtube.com" or host.endswith(".youtube.com"):
+        query = parse_qs(parts.query)
+        if "v" in query:
+            video_id = query["v"][0]
+        elif len(segments) >= 2 and segments[0] in ("shorts", "live", "embed", "v"):
+            video_id = segments[1]
+    if video_id and _YOUTUBE_ID.fullmatch(video_id):
+        return "youtube", video_id
+    return None
+
+
+def embedded_media_key(path: str) -> Optional[MediaKey]:
+    """(extractor, video ID) of a downloaded file, from its comment / purl tag."""
+    url = _embedded_url(path)
+    return media_key_from_url(url) if url else None
+
+
+def _embedded_url(path: str) -> Optional[str]:
+    try:
+        import mutagen
+    except ImportError:
+        return None
+    try:
+        tags = getattr(mutagen.File(path), "tags", None)
+    except Exception:
+        tags = None
+    if tags is None:
+        # ID3 tags can be read even when the audio frames can't be parsed
+        try:
+            from mutagen.id3 import ID3
+
+            tags = ID3(path)
+        except Exception:
+            return None
+    for key in ("TXXX:purl", "COMM::eng", "COMM", "\xa9cmt", "purl", "comment", "PURL", "COMMENT"):
+        if key in tags:
+            value = tags[key]
+            value = getattr(value, "text", value)
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if value and str(value).startswith("http"):
+                return str(value)
+    return None
+
+
+def link_file(src: str, dst: str, hardlink: bool = True) -> str:
+    """
+    Place `src` at `dst` as a hardlink, reflink or copy. Returns the method used.
+    With hardlink=False the new file never shares its data with `src` when written to.
+    """
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    if _reflink(src, dst):
+        return "reflink"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def _reflink(src: str, dst: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        return False
+
+
+class MediaStore:
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            db_path = config_path("media.sqlite3")
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        os.makedirs(self.db_path.parent, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(media)")}
+        if columns and "extractor" not in columns:
+            # records from before the extractor was part of the key can't be told apart; a scan rebuilds them
+            self._conn.execute("DROP TABLE media")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS media (
+                extractor  TEXT NOT NULL,
+                video_id   TEXT NOT NULL,
+                variant    TEXT NOT NULL,
+                path       TEXT NOT NULL,
+                size       INTEGER NOT NULL,
+                added_at   REAL NOT NULL,
+                PRIMARY KEY (extractor, video_id, variant, path)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------
+    # Public API
+    # -----------------
+    def lookup(self, extractor: str, video_id: str, variant: str) -> Optional[str]:
+        """
+        An existing, unchanged file for this video in this variant (or a
+        scanned file of the same mode), or None. Stale records are dropped.
+        """
+        mode = variant.split(":", 1)[0]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size FROM media WHERE extractor = ? AND video_id = ? AND variant IN (?, ?)"
+                " ORDER BY variant = ? DESC, added_at DESC",
+                (extractor, video_id, variant, media_variant(mode, ANY_QUALITY), variant),
+            ).fetchall()
+        for path, size in rows:
+            try:
+                if os.path.getsize(path) == size:
+                    self.hits += 1
+                    return path
+            except OSError:
+                pass
+            self._forget(path)
+        self.misses += 1
+        return None
+
+    def add(self, extractor: str, video_id: str, variant: str, path: str):
+        """Index a finished file (again after it was changed, e.g. tagged)."""
+        path = os.path.realpath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media (extractor, video_id, variant, path, size, added_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (extractor, video_id, variant, path, size, time.time()),
+            )
+            self._conn.commit()
+
+    def refresh(self, path: str):
+        """Record the new size of an indexed file that was changed in place (e.g. tagged)."""
+        path = os.path.realpath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._conn.execute("UPDATE media SET size = ? WHERE path = ?", (size, path))
+            self._conn.commit()
+
+    def reuse(
+        self, extractor: str, video_id: str, variant: str, dst_dir: str, filename: Callable[[str], str],
+        hardlink: Optional[bool] = None,
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Link an indexed copy into `dst_dir`. `filename(ext)` names the new file.
+        hardlink=None allows hardlinks for video only (music is re-tagged per copy).
+        Returns (path, method) or None when there is no usable copy.
+        """
+        if hardlink is None:
+            hardlink = not variant.startswith("audio:")
+        src = self.lookup(extractor, video_id, variant)
+        if src is None:
+            return None
+        dst = os.path.join(dst_dir, filename(os.path.splitext(src)[1]))
+        if os.path.exists(dst):
+            return dst, "existing"
+        if os.path.realpath(src) == os.path.realpath(dst):
+            return dst, "existing"
+        method = link_file(src, dst, hardlink)
+        self.add(extractor, video_id, variant, dst)
+        return dst, method
+
+    def scan(self, root: str, status_callback: Optional[Callable[[str], None]] = None) -> Tuple[int, int]:
+        """
+        Index every media file under `root` whose source (extractor and video ID) can be read.
+        Returns (files scanned, files indexed).
+        """
+        scanned = indexed = 0
+        rows = []
+        for dirpath, _dirs, files in os.walk(os.path.expanduser(root)):
+            for name in files:
+                ext = os.path.splitext(name)[1].lower()
+                mode = next((m for m, exts in MEDIA_EXTENSIONS.items() if ext in exts), None)
+                if mode is None:
+                    continue
+                path = os.path.realpath(os.path.join(dirpath, name))
+                scanned += 1
+                key = embedded_media_key(path)
+                if key is None:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                rows.append((*key, media_variant(mode, ANY_QUALITY), path, size, time.time()))
+                indexed += 1
+                if status_callback and indexed % 500 == 0:
+                    status_callback(f"Indexed {indexed} of {scanned} files...")
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO media (extractor, video_id, variant, path, size, added_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        if status_callback:
+            status_callback(f"Indexed {indexed} of {scanned} media files under {root}.")
+        return scanned, indexed
+
+    def prune(self) -> int:
+        """Forget files that no longer exist. Returns how many records were removed."""
+        with self._lock:
+            paths = [p for (p,) in self._conn.execute("SELECT DISTINCT path FROM media")]
+        missing = [p for p in paths if not os.path.exists(p)]
+        for path in missing:
+            self._forget(path)
+        return len(missing)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _forget(self, path: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM media WHERE path = ?", (path,))
+            self._conn.commit()
+
+
+_store: Optional[MediaStore] = None
+_store_lock = threading.Lock()
+
+
+def get_media_store() -> MediaStore:
+    """The process-wide MediaStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MediaStore()
+        return _store
@@ -0,0 +1,311 @@
+"""
+Download metrics.
+
+Two layers:
+
+- JobMetrics / ItemMetrics: what one Downloader run measured - probe time,
+  per-item queue wait, download duration, bytes, mean/peak throughput,
+  retries and post-processing time (ffmpeg extraction, thumbnail embedding,
+  metadata). JobMetrics.summary_lines() is printed at the end of each job.
+- MetricsRegistry: process-wide counters and histograms fed by every job,
+  readable as a dict (snapshot()), as Prometheus text (render_prometheus()),
+  written to a file for node_exporter's textfile collector
+  (config["metrics_textfile"]) or served over HTTP (serve_metrics()).
+
+Usage (example):
+    from engine.metrics import get_metrics
+
+    print(get_metrics().snapshot()["counters"]["seadog_items_total"])
+    get_metrics().write_prometheus("/var/lib/node_exporter/seadog.prom")
+"""
+
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from utils.formatting import format_size
+
+# Histogram buckets (upper bounds) per unit
+SECONDS_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+BYTES_BUCKETS = (1 << 20, 4 << 20, 16 << 20, 64 << 20, 256 << 20, 1 << 30, 4 << 30)
+RATE_BUCKETS = (128 << 10, 512 << 10, 1 << 20, 4 << 20, 16 << 20, 64 << 20)
+
+_HELP = {
+    "seadog_jobs_total": ("counter", "Finished download jobs by result"),
+    "seadog_items_total": ("counter", "Finished playlist items by result"),
+    "seadog_item_retries_total": ("counter", "Extra attempts needed by items"),
+    "seadog_downloaded_bytes_total": ("counter", "Bytes downloaded"),
+    "seadog_probe_seconds": ("histogram", "Time to list a URL (full listing)"),
+    "seadog_probe_first_entry_seconds": ("histogram", "Time until the first entry of a listing arrived"),
+    "seadog_job_queue_wait_seconds": ("histogram", "Time a job waited in the download queue"),
+    "seadog_item_queue_wait_seconds": ("histogram", "Time an item waited for a worker and pacing"),
+    "seadog_item_download_seconds": ("histogram", "Time spent transferring an item"),
+    "seadog_item_postprocess_seconds": ("histogram", "Post-processing time per item and step"),
+    "seadog_item_bytes": ("histogram", "Bytes per item"),
+    "seadog_item_throughput_bytes_per_second": ("histogram", "Mean transfer rate per item"),
+    "seadog_item_peak_bytes_per_second": ("histogram", "Peak transfer rate reported by yt-dlp per item"),
+}
+
+
+def _labels_key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + inner + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, _Histogram]] = {}
+
+    # -----------------
+    # Recording
+    # -----------------
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets=SECONDS_BUCKETS, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # -----------------
+    # Reading
+    # -----------------
+    def snapshot(self) -> dict:
+        """
+        {"counters": {name: total}, "histograms": {name: {"count", "sum", "mean"}}},
+        summed over labels.
+        """
+        with self._lock:
+            counters = {name: sum(series.values()) for name, series in self._counters.items()}
+            histograms = {}
+            for name, series in self._histograms.items():
+                count = sum(h.count for h in series.values())
+                total = sum(h.sum for h in series.values())
+                histograms[name] = {"count": count, "sum": total, "mean": total / count if count else 0.0}
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._header(lines, name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                self._header(lines, name, "histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write render_prometheus() to `path`."""
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _header(lines, name, kind):
+        kind, text = _HELP.get(name, (kind, name))
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+# -----------------
+# Per-job measurements
+# -----------------
+@dataclass
+class ItemMetrics:
+    item_index: int
+    url: str
+    ok: bool = False
+    probe_seconds: float = 0.0           # listing time spent waiting for this entry
+    queue_wait_seconds: float = 0.0      # entry listed -> worker started
+    download_seconds: float = 0.0
+    bytes: int = 0
+    peak_bytes_per_second: float = 0.0
+    attempts: int = 0
+    throttled: int = 0
+    postprocess_seconds: float = 0.0
+    postprocessors: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    @property
+    def mean_bytes_per_second(self) -> float:
+        return self.bytes / self.download_seconds if self.download_seconds > 0 else 0.0
+
+
+class JobMetrics:
+    def __init__(self, url: str, mode: str):
+        self.url = url
+        self.mode = mode
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.probe_first_entry_seconds: Optional[float] = None
+        self.probe_seconds: Optional[float] = None
+        self.items: List[ItemMetrics] = []
+        self._lock = threading.Lock()
+
+    def add_item(self, item: ItemMetrics, registry: Optional[MetricsRegistry] = None):
+        with self._lock:
+            self.items.append(item)
+        if registry is not None:
+            record_item(registry, item, self.mode)
+
+    def finish(self, ok: bool, registry: Optional[MetricsRegistry] = None):
+        self.finished_at = time.monotonic()
+        if registry is None:
+            return
+        registry.inc("seadog_jobs_total", mode=self.mode, result="ok" if ok else "failed")
+        if self.probe_seconds is not None:
+            registry.observe("seadog_probe_seconds", self.probe_seconds, mode=self.mode)
+        if self.probe_first_entry_seconds is not None:
+            registry.observe("seadog_probe_first_entry_seconds", self.probe_first_entry_seconds, mode=self.mode)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def summary_lines(self) -> List[str]:
+        with self._lock:
+            items = list(self.items)
+        done = [i for i in items if i.ok]
+        total_bytes = sum(i.bytes for i in items)
+        download = sum(i.download_seconds for i in items)
+        postprocess = sum(i.postprocess_seconds for i in items)
+        waits = sorted(i.queue_wait_seconds for i in items)
+        peak = max((i.peak_bytes_per_second for i in items), default=0.0)
+
+        lines = [f"Summary: {len(done)}/{len(items)} items ok in {self.elapsed:.1f}s"]
+        if self.probe_seconds is not None:
+            first = self.probe_first_entry_seconds or 0.0
+            lines.append(f"  listing: {self.probe_seconds:.1f}s (first entry after {first:.1f}s)")
+        if items:
+            lines.append(
+                f"  download: {download:.1f}s for {format_size(total_bytes)}"
+                f" (mean {format_size(total_bytes / download if download else 0)}/s, peak {format_size(peak)}/s)"
+            )
+            lines.append(
+                f"  postprocess: {postprocess:.1f}s; queue wait: median {waits[len(waits) // 2]:.1f}s,"
+                f" max {waits[-1]:.1f}s"
+            )
+            retries = sum(i.retries for i in items)
+            throttled = sum(i.throttled for i in items)
+            if retries or throttled:
+                lines.append(f"  retries: {retries} (rate limited {throttled}x)")
+        return lines
+
+
+def record_item(registry: MetricsRegistry, item: ItemMetrics, mode: str):
+    result = "ok" if item.ok else "failed"
+    registry.inc("seadog_items_total", mode=mode, result=result)
+    if item.retries:
+        registry.inc("seadog_item_retries_total", item.retries, mode=mode)
+    if item.bytes:
+        registry.inc("seadog_downloaded_bytes_total", item.bytes, mode=mode)
+        registry.observe("seadog_item_bytes", item.bytes, BYTES_BUCKETS, mode=mode)
+    registry.observe("seadog_item_queue_wait_seconds", item.queue_wait_seconds, mode=mode)
+    if item.download_seconds:
+        registry.observe("seadog_item_download_seconds", item.download_seconds, mode=mode)
+        registry.observe(
+            "seadog_item_throughput_bytes_per_second", item.mean_bytes_per_second, RATE_BUCKETS, mode=mode
+        )
+    if item.peak_bytes_per_second:
+        registry.observe("seadog_item_peak_bytes_per_second", item.peak_bytes_per_second, RATE_BUCKETS, mode=mode)
+    for step, seconds in item.postprocessors.items():
+        registry.observe("seadog_item_postprocess_seconds", seconds, mode=mode, step=step)
+    if item.postprocess_seconds and not item.postprocessors:
+        registry.observe("seadog_item_postprocess_seconds", item.postprocess_seconds, mode=mode, step="total")
+
+
+# -----------------
+# Process-wide registry
+# -----------------
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1"):
+    """
+    Serve get_metrics() as Prometheus text on http://host:port/metrics from a
+    daemon thread. Returns the HTTPServer (call shutdown() to stop it).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = get_metrics().render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="seadog-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,221 @@
+"""
+Adaptive, rate-limit aware pacing.
+
+Every host (youtube.com, soundcloud.com, ...) gets one HostPacer, shared by
+all jobs and workers in the process:
+
+- A token bucket spaces out item starts. The refill interval starts at the
+  limiter's minimum (0 = no spacing).
+- Each job passes its own minimum spacing (config["playlist_delay"]) to
+  acquire(): its items start at least that long after the host's previous
+  item start, without changing the pace of other jobs.
+- When yt-dlp output shows throttling (HTTP 429, "rate limit", bot checks),
+  report_throttle() blocks the host for an exponentially growing, jittered
+  backoff and doubles the interval.
+- Every successful item calls report_success(), which shrinks the interval
+  back towards the minimum, so the pace recovers while requests succeed.
+
+Usage (example):
+    from engine.pacing import get_rate_limiter
+
+    pacer = get_rate_limiter().pacer_for(url)
+    if pacer.acquire(stop_event, min_interval=delay):   # waits for a token, False if stopped
+        ...download...
+        pacer.report_success()         # or pacer.report_throttle()
+"""
+
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+# yt-dlp output that means "slow down"
+_THROTTLE_RE = re.compile(
+    r"HTTP Error 429|Too Many Requests|rate[- ]?limit|try again later|"
+    r"confirm you.re not a bot|Got error: .*\b(?:429|503)\b",
+    re.IGNORECASE,
+)
+
+# hosts that share one rate limit
+_HOST_ALIASES = {
+    "youtu.be": "youtube.com",
+    "music.youtube.com": "youtube.com",
+    "youtube-nocookie.com": "youtube.com",
+}
+
+
+def is_throttle_message(line: str) -> bool:
+    """True if a yt-dlp output line indicates rate limiting."""
+    return bool(_THROTTLE_RE.search(line or ""))
+
+
+def host_key(url: str) -> str:
+    """Pacing key for a URL: its host, without www./m. and with aliases merged."""
+    host = urlsplit(url).netloc.lower().split("@")[-1].split(":")[0]
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return _HOST_ALIASES.get(host, host) or "default"
+
+
+def retry_backoff(attempt: int, base: float, cap: float = 300.0) -> float:
+    """Exponential backoff with +/-50% jitter for retry `attempt` (1-based)."""
+    delay = min(cap, max(0.0, base) * (2 ** max(0, attempt - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class HostPacer:
+    def __init__(
+        self,
+        host: str,
+        min_interval: float = 0.0,     # seconds between item starts when all is well
+        max_interval: float = 60.0,    # ceiling for the adaptive interval
+        max_backoff: float = 300.0,    # ceiling for the block after a throttle
+        burst: int = 1,                # item starts allowed back-to-back
+    ):
+        self.host = host
+        self.min_interval = max(0.0, float(min_interval))
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.burst = max(1, int(burst))
+
+        self._lock = threading.Lock()
+        self.interval = self.min_interval
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._started_at: Optional[float] = None   # last item start
+        self._blocked_until = 0.0
+        self._strikes = 0              # consecutive throttles
+
+        # counters
+        self.throttles = 0
+        self.successes = 0
+
+    # -----------------
+    # Public API
+    # -----------------
+    def acquire(self, stop_event: Optional[threading.Event] = None, min_interval: float = 0.0) -> bool:
+        """
+        Wait for permission to start one item, at least `min_interval` seconds
+        after the host's previous start. Returns False if stop_event was set.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0 and min_interval > 0 and self._started_at is not None:
+                    wait = self._started_at + min_interval - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self._started_at = now
+                        return True
+                    wait = (1 - self._tokens) * self.interval
+            if stop_event is not None:
+                if stop_event.wait(min(wait, 1.0)):
+                    return False
+            else:
+                time.sleep(min(wait, 1.0))
+
+    def report_throttle(self):
+        """yt-dlp was throttled: block the host for a while and slow down."""
+        with self._lock:
+            self.throttles += 1
+            self._strikes += 1
+            backoff = min(self.max_backoff, 5.0 * (2 ** (self._strikes - 1)))
+            backoff *= random.uniform(0.75, 1.25)
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + backoff)
+            self.interval = min(self.max_interval, max(self.interval * 2, 1.0))
+            self._tokens = 0.0
+            self._refilled_at = now
+
+    def report_success(self):
+        """An item went through: speed back up towards the minimum interval."""
+        with self._lock:
+            self.successes += 1
+            self._strikes = 0
+            interval = self.interval * 0.8
+            # below half a second the difference is noise; snap to the floor
+            self.interval = self.min_interval if interval < max(self.min_interval, 0.5) else interval
+
+    def configure(self, min_interval: Optional[float] = None, burst: Optional[int] = None):
+        with self._lock:
+            if min_interval is not None:
+                self.min_interval = max(0.0, float(min_interval))
+                self.interval = max(self.interval, self.min_interval)
+            if burst is not None:
+                self.burst = max(1, int(burst))
+
+    def backoff_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _refill(self, now: float):
+        if self.interval <= 0:
+            self._tokens = float(self.burst)
+        else:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) / self.interval)
+        self._refilled_at = now
+
+
+class RateLimiter:
+    """Registry of HostPacers, one per host."""
+
+    def __init__(self, min_interval: float = 0.0, burst: int = 1):
+        self._lock = threading.Lock()
+        self._pacers: Dict[str, HostPacer] = {}
+        self.min_interval = min_interval
+        self.burst = burst
+
+    def pacer_for(self, url: str) -> HostPacer:
+        key = host_key(url)
+        with self._lock:
+            pacer = self._pacers.get(key)
+            if pacer is None:
+                pacer = HostPacer(key, min_interval=self.min_interval, burst=self.burst)
+                self._pacers[key] = pacer
+            return pacer
+
+    def configure(self, min_interval: Optional[float] = None, burst: Optional[int] = None):
+        """Apply new defaults to every known and future host."""
+        with self._lock:
+            if min_interval is not None:
+                self.min_interval = min_interval
+            if burst is not None:
+                self.burst = burst
+            pacers = list(self._pacers.values())
+        for pacer in pacers:
+            pacer.configure(min_interval, burst)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            pacers = list(self._pacers.values())
+        return {
+            p.host: {
+                "interval": round(p.interval, 2),
+                "backoff_remaining": round(p.backoff_remaining(), 1),
+                "throttles": p.throttles,
+                "successes": p.successes,
+            }
+            for p in pacers
+        }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide RateLimiter shared by all jobs."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,436 @@
+"""
+Background follower for playlists listed in config["follow_playlists"].
+
+Every `playlist_monitor_interval` seconds (with per-playlist jitter so checks
+spread out instead of firing together) each followed playlist is checked on a
+shared worker pool. A check is incremental: it only reads the newest
+`window` entries plus, when the playlist has grown, the entries past the last
+known end. IDs that were not seen before are queued as single-item jobs on the
+shared DownloadQueue. An ID becomes known when its job succeeds; until then
+it is kept as unfinished (also across restarts) and queued again by the next
+checks, up to MAX_ATTEMPTS times (the download archive skips what did finish).
+
+The first check of a playlist records its full listing as the baseline and
+queues the playlist once as a whole (the download archive and media store
+skip what is already on disk). Downloads are queued through the Music /
+Video controllers, with the same options, tagging and notifications as a
+download started from a tab.
+
+follow_playlists format:
+    {
+        "https://www.youtube.com/playlist?list=...": {
+            "mode": "audio",            # "audio" (default) or "video"
+            "out_dir": "",              # empty = music/video output dir from config
+            "enabled": true
+        }
+    }
+
+Usage (example):
+    from engine.playlist_monitor import PlaylistMonitor
+
+    monitor = PlaylistMonitor(status_callback=print)
+    monitor.start()
+    ...
+    monitor.stop()
+"""
+
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from engine.downloader import PlaylistEntry, _popen_group, _reap, _signal_group, entry_from_probe
+from engine.session import JobSession, session_options
+from utils.logging import get_logger
+from utils.paths import config_path
+
+_log = get_logger("monitor")
+
+# seconds a probe may run before it is killed (a hung extractor must not hold a worker)
+PROBE_TIMEOUT = 300.0
+
+# downloads of one new item before the monitor gives up on it (deleted, private...)
+MAX_ATTEMPTS = 3
+
+
+class PlaylistMonitor:
+    def __init__(
+        self,
+        config=None,
+        queue=None,
+        status_callback: Optional[Callable[[str], None]] = None,
+        window: int = 30,              # newest entries read per check
+        jitter: float = 0.2,           # +/- fraction of the interval
+        max_workers: int = 4,          # concurrent playlist checks
+        state_path: Optional[Path] = None,
+        enabled: Optional[bool] = None,   # None = follow config["playlist_monitor_enabled"]
+        interval: Optional[float] = None, # None = config["playlist_monitor_interval"]
+        quality: Optional[str] = None,    # audio quality / video format of queued jobs (None = controller default)
+        priority: int = 0,                # queue priority of queued jobs
+        send_notification: Optional[bool] = None,  # None = config["gotify_enabled"]
+    ):
+        if config is None:
+            from utils.config import ConfigManager
+            config = ConfigManager()
+        if queue is None:
+            from engine.job_queue import get_download_queue
+            queue = get_download_queue()
+
+        self.config = config
+        self.queue = queue
+        self.status_callback = status_callback
+        self.window = max(1, int(window))
+        self.jitter = jitter
+        self.max_workers = max(1, int(max_workers))
+        self.state_path = Path(state_path or config_path("monitor_state.json"))
+        self.enabled = enabled
+        self.interval = interval
+        self.quality = quality
+        self.priority = priority
+        self.send_notification = send_notification
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, dict] = {}
+        self._next_due: Dict[str, float] = {}
+        self._in_flight: Set[str] = set()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # cookies / YouTube session for probes, reloaded when the settings change
+        self._session: Optional[JobSession] = None
+        self._session_lock = threading.Lock()
+        # Music / Video controllers that queue the downloads (see _queue_download)
+        self._controllers: Dict[str, object] = {}
+        # running probe processes, signalled by stop()
+        self._probes: Set[subprocess.Popen] = set()
+        # (playlist URL, video ID) of new items whose job hasn't finished yet
+        self._queued: Set[Tuple[str, str]] = set()
+
+        self._load_state()
+
+    # -----------------
+    # Public API
+    # -----------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="seadog-monitor")
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        with self._lock:
+            probes = list(self._probes)
+        for proc in probes:
+            _signal_group(proc)
+        self._close_session()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop_event.is_set())
+
+    def check_all(self, wait: bool = True) -> int:
+        """
+        Check every followed playlist now (one shared pool). Returns the number
+        of new items queued when `wait` is True, else 0.
+        """
+        followed = self._followed()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="seadog-monitor")
+        futures = [pool.submit(self.check_playlist, url, settings) for url, settings in followed.items()]
+        # the checks keep running in the background when not waiting
+        pool.shutdown(wait=False)
+        if not wait:
+            return 0
+        try:
+            return sum(f.result() for f in futures)
+        finally:
+            if not self.running:
+                self._close_session()
+
+    def check_playlist(self, url: str, settings: Optional[dict] = None) -> int:
+        """
+        Check one playlist and queue entries that were not seen before (or not
+        downloaded yet). Returns the number of entries queued (the whole
+        listing on the first check).
+        """
+        settings = self._normalize_settings(settings)
+        mode = settings["mode"]
+        out_dir = settings["out_dir"] or self.config.get(
+            "music_output_dir" if mode == "audio" else "video_output_dir"
+        )
+
+        with self._lock:
+            state = self._state.get(url)
+            known = set(state["known_ids"]) if state else None
+            known_count = state.get("entry_count") if state else None
+
+        if known is None:
+            return self._baseline(url, mode, out_dir)
+
+        # Newest entries first: covers channels/uploads and "newest first" playlists
+        head, count = self._probe(url, f"1:{self.window}")
+        if head is None:
+            self._status(f"Monitor: could not read {url}")
+            return 0
+        listing = list(head)
+
+        # Playlist grew past what we know: read only the entries after the old end
+        if count and known_count and count > known_count and count > self.window:
+            tail_start = max(self.window, known_count - self.window) + 1
+            tail, _ = self._probe(url, f"{tail_start}:")
+            listing.extend(tail or [])
+
+        with self._lock:
+            state = self._state.setdefault(url, {"known_ids": []})
+            unfinished = state.setdefault("unfinished", {})
+            for entry in listing:
+                if entry.video_id and entry.video_id not in known and entry.video_id not in unfinished:
+                    unfinished[entry.video_id] = {"url": entry.url, "attempts": 0}
+            # new items, and earlier ones whose download failed or was interrupted
+            new_entries = []
+            for video_id, item in unfinished.items():
+                if (url, video_id) not in self._queued:
+                    self._queued.add((url, video_id))
+                    item["attempts"] += 1
+                    new_entries.append((video_id, item["url"]))
+            if count:
+                state["entry_count"] = count
+            state["last_checked"] = time.time()
+        self._save_state()
+
+        for video_id, entry_url in new_entries:
+            self._queue_download(
+                entry_url, out_dir, mode,
+                finished_callback=lambda ok, video_id=video_id: self._item_finished(url, video_id, ok),
+            )
+
+        if new_entries:
+            self._status(f"Monitor: queued {len(new_entries)} item(s) from {url}")
+        return len(new_entries)
+
+    # -----------------
+    # Scheduling
+    # -----------------
+    def _loop(self):
+        while not self._stop_event.is_set():
+            enabled = self.enabled
+            if enabled is None:
+                enabled = self.config.get("playlist_monitor_enabled", False)
+            if enabled:
+                self._dispatch_due()
+            self._stop_event.wait(1.0)
+
+    def _dispatch_due(self):
+        interval = self.interval or self.config.get("playlist_monitor_interval", 60)
+        interval = max(10, float(interval))
+        now = time.time()
+        followed = self._followed()
+
+        with self._lock:
+            for url in list(self._next_due):
+                if url not in followed:
+                    del self._next_due[url]
+            due = []
+            for url in followed:
+                if url not in self._next_due:
+                    # spread first checks across one interval
+                    last = self._state.get(url, {}).get("last_checked")
+                    self._next_due[url] = (last + interval) if last else now + random.uniform(0, interval)
+                if self._next_due[url] <= now and url not in self._in_flight:
+                    self._in_flight.add(url)
+                    self._next_due[url] = now + interval * (1 + random.uniform(-self.jitter, self.jitter))
+                    due.append(url)
+
+        pool = self._pool
+        for url in due:
+            if pool is None:
+                break
+            pool.submit(self._run_check, url, followed[url])
+
+    def _run_check(self, url, settings):
+        try:
+            self.check_playlist(url, settings)
+        except Exception as e:
+            self._status(f"Monitor: check failed for {url}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(url)
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _baseline(self, url, mode, out_dir) -> int:
+        """First check: remember the full listing and queue the playlist once."""
+        entries, count = self._probe(url, None)
+        if entries is None:
+            self._status(f"Monitor: could not read {url}")
+            return 0
+        ids = sorted({e.video_id for e in entries if e.video_id})
+        with self._lock:
+            self._state[url] = {
+                "known_ids": ids,
+                "entry_count": count or len(entries),
+                "last_checked": time.time(),
+            }
+        self._save_state()
+
+        self._queue_download(url, out_dir, mode)
+        self._status(f"Monitor: now following {url} ({len(ids)} entries)")
+        return len(ids)
+
+    def _item_finished(self, url, video_id, ok):
+        """A new item's job ended: remember it if it succeeded (or ran out of attempts)."""
+        gave_up = False
+        with self._lock:
+            self._queued.discard((url, video_id))
+            state = self._state.get(url)
+            if state is None:
+                return
+            item = state.get("unfinished", {}).get(video_id)
+            if item is None:
+                return
+            gave_up = not ok and item["attempts"] >= MAX_ATTEMPTS
+            if ok or gave_up:
+                del state["unfinished"][video_id]
+                state["known_ids"] = sorted(set(state["known_ids"]) | {video_id})
+        self._save_state()
+        if gave_up:
+            self._status(f"Monitor: giving up on {item['url']} after {MAX_ATTEMPTS} failed downloads")
+
+    def _probe(self, url, items: Optional[str]) -> Tuple[Optional[List[PlaylistEntry]], Optional[int]]:
+        """
+        Flat-probe `url`, limited to `items` (yt-dlp --playlist-items syntax).
+        Returns (entries, playlist_count), or (None, None) on failure.
+        """
+        session = self._probe_session()
+        cmd = ["yt-dlp", *(session.ytdlp_args(url) if session else []), "--flat-playlist", "-J"]
+        if items:
+            cmd += ["--playlist-items", items]
+        cmd.append(url)
+        if self._stop_event.is_set():
+            return None, None
+        try:
+            proc = _popen_group(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError:
+            return None, None
+        with self._lock:
+            self._probes.add(proc)
+        try:
+            # stop() may have run between the check above and Popen
+            if self._stop_event.is_set():
+                _signal_group(proc)
+            stdout, _ = proc.communicate(timeout=PROBE_TIMEOUT)
+            if proc.returncode != 0 or self._stop_event.is_set():
+                return None, None
+            data = json.loads(stdout)
+        except subprocess.TimeoutExpired:
+            _signal_group(proc)
+            _reap(proc)
+            self._status(f"Monitor: probe of {url} timed out after {PROBE_TIMEOUT:.0f}s")
+            return None, None
+        except Exception:
+            return None, None
+        finally:
+            with self._lock:
+                self._probes.discard(proc)
+        entries = [e for e in (entry_from_probe(e) for e in data.get("entries") or []) if e]
+        return entries, data.get("playlist_count")
+
+    def _probe_session(self) -> Optional[JobSession]:
+        options = session_options(self.config)
+        with self._session_lock:
+            if self._session is not None and self._session.options != (options or {}):
+                self._session.close()
+                self._session = None
+            if self._session is None and options:
+                self._session = JobSession(options)
+                self._session.load(self._status)
+            return self._session
+
+    def _close_session(self):
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def _queue_download(self, url, out_dir, mode, finished_callback=None):
+        """Queue through the mode's controller: same options, tagging and notifications as the tabs."""
+        with self._lock:
+            controller = self._controllers.get(mode)
+            if controller is None:
+                from controllers.jobs import controller_for
+                controller = self._controllers[mode] = controller_for(mode, self.config, self.queue)
+        kwargs = {}
+        if self.quality is not None:
+            kwargs["audio_quality" if mode == "audio" else "video_quality"] = self.quality
+        send_notification = self.send_notification
+        if send_notification is None:
+            send_notification = bool(self.config.get("gotify_enabled", False))
+        return controller.start_download(
+            url,
+            output_dir=out_dir,
+            progress_callback=self.status_callback,
+            send_notification=send_notification,
+            finished_callback=finished_callback,
+            priority=self.priority,
+            **kwargs,
+        )
+
+    def _followed(self) -> Dict[str, dict]:
+        followed = self.config.get("follow_playlists", {}) or {}
+        if isinstance(followed, list):
+            followed = {url: {} for url in followed}
+        result = {}
+        for url, settings in followed.items():
+            settings = self._normalize_settings(settings)
+            if settings["enabled"]:
+                result[url] = settings
+        return result
+
+    @staticmethod
+    def _normalize_settings(settings) -> dict:
+        if isinstance(settings, str):
+            settings = {"mode": settings}
+        settings = dict(settings or {})
+        mode = settings.get("mode", "audio")
+        return {
+            "mode": mode if mode in ("audio", "video") else "audio",
+            "out_dir": settings.get("out_dir", ""),
+            "enabled": settings.get("enabled", True),
+        }
+
+    def _status(self, msg):
+        _log.info(msg)
+        if self.status_callback:
+            self.status_callback(msg)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._state = data
+        except (OSError, ValueError):
+            self._state = {}
+
+    def _save_state(self):
+        with self._lock:
+            payload = json.dumps(self._state)
+            try:
+                os.makedirs(self.state_path.parent, exist_ok=True)
+                tmp = self.state_path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp, self.state_path)
+            except OSError:
+                pass
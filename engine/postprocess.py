@@ -0,0 +1,226 @@
+"""
+Deferred audio post-processing.
+
+In deferred mode yt-dlp only downloads (best audio stream, info JSON and
+thumbnail). The MP3 transcode, ID3 tagging (mutagen) and cover embedding
+run here, on a process pool sized to the CPU count, so the next item's
+download overlaps the previous item's ffmpeg run instead of waiting for it.
+
+The tags match what yt-dlp's --embed-metadata writes (title, artist, album,
+track, date, genre, description, and the webpage URL as comment and purl),
+so files look the same whichever mode produced them.
+
+Usage (example):
+    from engine.postprocess import get_postprocessor, AudioTask
+
+    future = get_postprocessor().submit(AudioTask(source="/music/01 - x.webm", quality="0"))
+    result = future.result()       # {"ok": True, "path": "/music/01 - x.mp3", "steps": {...}}
+"""
+
+import glob
+import importlib.util
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+THUMBNAIL_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+@dataclass
+class AudioTask:
+    source: str                          # file downloaded by yt-dlp
+    quality: str = "0"                   # --audio-quality: 0 (best) .. 9 (worst) VBR
+    embed_thumbnail: bool = True
+    ffmpeg: str = "ffmpeg"
+
+
+def deferred_available() -> bool:
+    """True if ffmpeg and mutagen are present, i.e. deferred mode can work."""
+    return bool(shutil.which("ffmpeg")) and importlib.util.find_spec("mutagen") is not None
+
+
+def deferred_audio_args() -> list:
+    """yt-dlp arguments for the download half of deferred audio mode."""
+    return ["-f", "bestaudio/best", "--write-info-json", "--write-thumbnail"]
+
+
+# -----------------
+# Worker (runs in a pool process)
+# -----------------
+def process_audio(task: dict) -> dict:
+    """
+    Transcode, tag and add cover art for one downloaded file, then remove the
+    intermediate files (source, info JSON, thumbnail). Returns a result dict:
+    {"ok", "path", "error", "steps": {step: seconds}}.
+    """
+    source = task["source"]
+    root, ext = os.path.splitext(source)
+    target = root + ".mp3"
+    info_path = root + ".info.json"
+    steps: Dict[str, float] = {}
+
+    try:
+        info = {}
+        if os.path.exists(info_path):
+            with open(info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+
+        started = time.monotonic()
+        if ext.lower() != ".mp3":
+            temp = root + ".temp.mp3"
+            cmd = [
+                task.get("ffmpeg") or "ffmpeg", "-y", "-nostdin", "-loglevel", "error",
+                "-i", source, "-vn", "-map_metadata", "-1",
+                "-c:a", "libmp3lame", "-q:a", str(task.get("quality") or "0"), "-f", "mp3", temp,
+            ]
+            proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+            if proc.returncode != 0:
+                _remove(temp)
+                return {"ok": False, "path": source, "error": f"ffmpeg: {proc.stderr.strip()[-300:]}", "steps": steps}
+            os.replace(temp, target)
+            _remove(source)
+        steps["ExtractAudio"] = time.monotonic() - started
+
+        started = time.monotonic()
+        _write_tags(target, info)
+        steps["Metadata"] = time.monotonic() - started
+
+        thumbnails = [p for p in glob.glob(glob.escape(root) + ".*") if p.lower().endswith(THUMBNAIL_EXTENSIONS)]
+        if thumbnails and task.get("embed_thumbnail", True):
+            started = time.monotonic()
+            _embed_cover(target, thumbnails[0], task.get("ffmpeg") or "ffmpeg")
+            steps["EmbedThumbnail"] = time.monotonic() - started
+        for path in thumbnails + [info_path]:
+            _remove(path)
+        return {"ok": True, "path": target, "error": None, "steps": steps}
+    except Exception as e:
+        return {"ok": False, "path": source, "error": str(e), "steps": steps}
+
+
+def _write_tags(path: str, info: dict):
+    from mutagen.id3 import COMM, ID3, ID3NoHeaderError, TALB, TCON, TDRC, TIT2, TPE1, TPE2, TPOS, TRCK, TXXX
+
+    try:
+        tags = ID3(path)
+    except ID3NoHeaderError:
+        tags = ID3()
+
+    def first(*keys):
+        for key in keys:
+            value = info.get(key)
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value if v)
+            if value not in (None, ""):
+                return str(value)
+        return None
+
+    date = first("release_date", "upload_date")
+    year = first("release_year") or (date[:4] if date else None)
+    track = first("track_number", "playlist_index")
+    url = first("webpage_url", "original_url")
+    frames = [
+        (TIT2, first("track", "title")),
+        (TPE1, first("artist", "artists", "creator", "creators", "uploader", "uploader_id")),
+        (TALB, first("album", "playlist_title", "playlist")),
+        (TPE2, first("album_artist")),
+        (TRCK, track),
+        (TPOS, first("disc_number")),
+        (TDRC, year),
+        (TCON, first("genre", "genres")),
+    ]
+    for frame, value in frames:
+        if value:
+            tags.setall(frame.__name__, [frame(encoding=3, text=value)])
+    if url:
+        tags.setall("COMM", [COMM(encoding=3, lang="eng", desc="", text=url)])
+        tags.add(TXXX(encoding=3, desc="purl", text=url))
+    description = first("description")
+    if description:
+        tags.add(TXXX(encoding=3, desc="description", text=description))
+    tags.save(path, v2_version=3)
+
+
+def _embed_cover(path: str, thumbnail: str, ffmpeg: str):
+    from mutagen.id3 import APIC, ID3
+
+    image = thumbnail
+    if not thumbnail.lower().endswith((".jpg", ".jpeg", ".png")):
+        # most players can't show WebP covers
+        image = os.path.splitext(thumbnail)[0] + ".cover.jpg"
+        proc = subprocess.run(
+            [ffmpeg, "-y", "-nostdin", "-loglevel", "error", "-i", thumbnail, image],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+        )
+        if proc.returncode != 0 or not os.path.exists(image):
+            return
+    mime = "image/png" if image.lower().endswith(".png") else "image/jpeg"
+    with open(image, "rb") as f:
+        data = f.read()
+    tags = ID3(path)
+    tags.setall("APIC", [APIC(encoding=3, mime=mime, type=3, desc="Cover (front)", data=data)])
+    tags.save(path, v2_version=3)
+    if image != thumbnail:
+        _remove(image)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# -----------------
+# Pool
+# -----------------
+class PostProcessor:
+    """Process pool for deferred audio work, started on first use."""
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers or os.cpu_count() or 2
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, task: AudioTask) -> Future:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process with Qt and download threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool.submit(process_audio, asdict(task))
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_postprocessor: Optional[PostProcessor] = None
+_postprocessor_lock = threading.Lock()
+
+
+def get_postprocessor() -> PostProcessor:
+    """The process-wide PostProcessor, sized by config["postprocess_workers"] (0 = CPU count)."""
+    global _postprocessor
+    with _postprocessor_lock:
+        if _postprocessor is None:
+            from utils.config import ConfigManager
+            _postprocessor = PostProcessor(ConfigManager().get("postprocess_workers", 0))
+        return _postprocessor
+
+
+def shutdown_postprocessor(wait: bool = True):
+    """Stop the pool if it was ever started (application exit)."""
+    with _postprocessor_lock:
+        postprocessor = _postprocessor
+    if postprocessor is not None:
+        postprocessor.shutdown(wait=wait)
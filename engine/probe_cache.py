@@ -0,0 +1,188 @@
+"""
+Playlist probe cache.
+
+Remembers the flat entry listing of recently probed playlists so repeated
+syncs of the same playlist don't pay for a full extractor round-trip.
+
+- Keys are normalized URLs (tracking parameters dropped, YouTube playlists
+  reduced to their list ID).
+- Entries younger than `ttl` seconds are used as-is.
+- Older entries are revalidated with a cheap first-page probe: if the
+  playlist's entry count and first entry ID ("fingerprint") are unchanged,
+  the cached listing is reused and its TTL restarts.
+- The cache holds at most `max_entries` playlists (least recently used are
+  evicted) and is persisted as JSON next to config.json.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from utils.paths import config_path
+
+# Query parameters that never change what a URL points at
+_TRACKING_PARAMS = {"si", "feature", "pp", "utm_source", "utm_medium", "utm_campaign", "index", "start_radio"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key for a playlist/channel URL."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m."):
+        host = host[2:]
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in _TRACKING_PARAMS]
+
+    if host in ("youtube.com", "music.youtube.com", "youtu.be"):
+        list_id = dict(query).get("list")
+        if list_id and not dict(query).get("v"):
+            return f"youtube:playlist:{list_id}"
+
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, urlencode(sorted(query)), ""))
+
+
+class ProbeCache:
+    def __init__(self, path: Optional[Path] = None, ttl: float = 3600, max_entries: int = 200):
+        if path is None:
+            path = config_path("probe_cache.json")
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+        self._load()
+
+    # -----------------
+    # Public API
+    # -----------------
+    def get(self, url: str) -> Optional[dict]:
+        """
+        Return the cached record for `url` (fresh or stale), or None.
+        Use is_fresh() to decide whether it needs revalidation, then count the
+        outcome with record_hit() / record_miss().
+        """
+        key = normalize_url(url)
+        with self._lock:
+            record = self._items.get(key)
+            if record is not None:
+                self._items.move_to_end(key)
+            return record
+
+    def is_fresh(self, record: dict) -> bool:
+        return time.time() - record.get("validated_at", 0) < self.ttl
+
+    def matches(self, record: dict, entry_count: Optional[int], first_id: Optional[str]) -> bool:
+        """True if a first-page probe result agrees with the cached listing."""
+        if not first_id or first_id != record.get("first_id"):
+            return False
+        return entry_count is None or entry_count == record.get("entry_count")
+
+    def record_hit(self, url: str, revalidated: bool = False):
+        """Count a hit; a revalidated hit also restarts the entry's TTL."""
+        key = normalize_url(url)
+        with self._lock:
+            self.hits += 1
+            if revalidated:
+                self.revalidated += 1
+                record = self._items.get(key)
+                if record is not None:
+                    record["validated_at"] = time.time()
+        if revalidated:
+            self._save()
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, url: str, entries: List[dict], entry_count: Optional[int] = None):
+        """Store a complete listing (list of PlaylistEntry field dicts)."""
+        key = normalize_url(url)
+        now = time.time()
+        record = {
+            "url": url,
+            "fetched_at": now,
+            "validated_at": now,
+            "entry_count": entry_count if entry_count is not None else len(entries),
+            "first_id": entries[0].get("video_id") if entries else None,
+            "entries": entries,
+        }
+        with self._lock:
+            self._items[key] = record
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        self._save()
+
+    def invalidate(self, url: str):
+        with self._lock:
+            self._items.pop(normalize_url(url), None)
+        self._save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+            }
+
+    # -----------------
+    # Persistence
+    # -----------------
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        items = data.get("items", []) if isinstance(data, dict) else []
+        for key, record in items[-self.max_entries:]:
+            self._items[key] = record
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                payload = {"items": list(self._items.items())}
+            try:
+                os.makedirs(self.path.parent, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(payload, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+_cache: Optional[ProbeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_probe_cache(ttl: Optional[float] = None, max_entries: Optional[int] = None) -> ProbeCache:
+    """The process-wide ProbeCache. Given settings are applied on every call."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProbeCache()
+        if ttl is not None:
+            _cache.ttl = ttl
+        if max_entries is not None:
+            _cache.max_entries = max(1, int(max_entries))
+        return _cache
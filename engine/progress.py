@@ -0,0 +1,109 @@
+"""
+Typed progress events.
+
+yt-dlp is asked to print progress through a machine-readable
+--progress-template (one JSON object per line behind a fixed marker), which
+the Downloader turns into ProgressEvent objects instead of forwarding the raw
+text. The in-process engine builds the same events straight from yt-dlp's
+progress hooks.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import List, Optional
+
+PROGRESS_MARKER = "[seadog-progress] "
+
+PHASE_DOWNLOAD = "download"
+PHASE_POSTPROCESS = "postprocess"
+
+
+@dataclass
+class ProgressEvent:
+    item_index: int                      # 1-based position in the job (1 for single items)
+    item_count: Optional[int]            # total items in the job, if known
+    phase: str                           # "download" or "postprocess"
+    status: str                          # yt-dlp status: downloading, finished, started, processing, error
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None    # exact size, or yt-dlp's estimate
+    speed: Optional[float] = None        # bytes/second
+    eta: Optional[float] = None          # seconds
+    video_id: Optional[str] = None
+    filename: Optional[str] = None
+    postprocessor: Optional[str] = None
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Completed fraction of this item's current phase (0.0 - 1.0), if known."""
+        if self.status == "finished":
+            return 1.0
+        if self.downloaded_bytes is not None and self.total_bytes:
+            return max(0.0, min(1.0, self.downloaded_bytes / self.total_bytes))
+        return None
+
+
+def progress_template_args() -> List[str]:
+    """
+    yt-dlp arguments that make it print one JSON progress record per line.
+    """
+    download = PROGRESS_MARKER + '{"phase":"download","id":%(info.id)j,"progress":%(progress)j}'
+    postprocess = PROGRESS_MARKER + '{"phase":"postprocess","id":%(info.id)j,"progress":%(progress)j}'
+    return [
+        "--newline",
+        "--progress-template", f"download:{download}",
+        "--progress-template", f"postprocess:{postprocess}",
+    ]
+
+
+def event_from_hook(phase: str, status: dict, item_index: int, item_count: Optional[int]) -> ProgressEvent:
+    """
+    Build a ProgressEvent from a yt-dlp progress/postprocessor hook dict
+    (or the "progress" object printed by progress_template_args()).
+    """
+    info = status.get("info_dict") or {}
+    total = status.get("total_bytes") or status.get("total_bytes_estimate")
+    return ProgressEvent(
+        item_index=item_index,
+        item_count=item_count,
+        phase=phase,
+        status=status.get("status") or "",
+        downloaded_bytes=_as_int(status.get("downloaded_bytes")),
+        total_bytes=_as_int(total),
+        speed=_as_float(status.get("speed")),
+        eta=_as_float(status.get("eta")),
+        video_id=info.get("id") or status.get("_seadog_id"),
+        filename=status.get("tmpfilename") or status.get("filename") or info.get("filepath"),
+        postprocessor=status.get("postprocessor"),
+    )
+
+
+def parse_progress_line(line: str, item_index: int, item_count: Optional[int]) -> Optional[ProgressEvent]:
+    """
+    Parse a line printed via progress_template_args().
+    Returns None if the line is not a progress record.
+    """
+    if not line.startswith(PROGRESS_MARKER):
+        return None
+    try:
+        record = json.loads(line[len(PROGRESS_MARKER):])
+    except ValueError:
+        return None
+    status = record.get("progress") or {}
+    if not isinstance(status, dict):
+        return None
+    status = dict(status, _seadog_id=record.get("id"))
+    return event_from_hook(record.get("phase") or PHASE_DOWNLOAD, status, item_index, item_count)
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,353 @@
+"""
+Cookie profiles and YouTube session state, shared by every item of a job.
+
+A job's cookies come from one profile: a cookies.txt file, or a browser
+(yt-dlp's --cookies-from-browser syntax: BROWSER[+KEYRING][:PROFILE][::CONTAINER]).
+They are loaded once when the job starts - reading a browser's cookie
+database (and its keyring) per item is the slow part of --cookies-from-browser -
+and written to a private snapshot. yt-dlp rewrites its cookie file when it
+exits, so every worker thread gets its own copy of the snapshot and the
+user's cookies.txt is never written to.
+
+Optionally (youtube_session_reuse, off by default), YouTube requests
+without cookies reuse one guest session: the visitor data of a youtube.com
+visit is cached in session.json with an expiry and passed to yt-dlp
+(extractor args visitor_data, player_skip=webpage,configs), so items don't
+each fetch the watch page and its configs to start a new one. Skipping
+those pages can cost some formats and metadata, hence opt-in. The visitor
+data is dropped when YouTube's bot check rejects it and fetched again for
+the next attempt. A PO token (and the visitor data it is
+bound to) can be set in the config; yt-dlp's PO token provider plugins,
+when installed, work as usual.
+
+Usage (example):
+    from engine.session import JobSession, session_options
+
+    session = JobSession(session_options(config))
+    session.load(status_callback=print)
+    cmd = ["yt-dlp", *session.ytdlp_args(url), url]
+    ...
+    session.close()
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+from urllib.parse import urlsplit
+
+from utils.logging import get_logger
+from utils.paths import config_path
+
+DEFAULT_SESSION_TTL = 6 * 3600
+
+_YOUTUBE_HOSTS = ("youtube.com", "youtu.be", "youtube-nocookie.com")
+_VISITOR_DATA_RES = (
+    re.compile(r'"VISITOR_DATA"\s*:\s*"([^"]+)"'),
+    re.compile(r'"visitorData"\s*:\s*"([^"]+)"'),
+)
+# the bot check; ordinary 403s (format URLs, geo blocks) say nothing about the session
+_REJECTED_RE = re.compile(r"confirm you.re not a bot", re.IGNORECASE)
+
+_log = get_logger("session")
+
+
+def session_options(config) -> Optional[dict]:
+    """
+    Session settings for Downloader.download(session_options=...) from the
+    config (JSON-serializable, so they survive in the job journal), or None
+    when neither cookies nor session reuse are enabled.
+    """
+    options = {
+        "cookies_file": (config.get("cookies_file", "") or "").strip(),
+        "cookies_from_browser": (config.get("cookies_from_browser", "") or "").strip(),
+        "reuse_session": bool(config.get("youtube_session_reuse", False)),
+        "session_ttl": max(0, int(config.get("youtube_session_ttl", DEFAULT_SESSION_TTL) or 0)),
+        "po_token": (config.get("youtube_po_token", "") or "").strip(),
+        "visitor_data": (config.get("youtube_visitor_data", "") or "").strip(),
+    }
+    if not (options["cookies_file"] or options["cookies_from_browser"] or options["reuse_session"]
+            or options["po_token"] or options["visitor_data"]):
+        return None
+    return options
+
+
+def is_youtube_url(url: str) -> bool:
+    host = urlsplit(url or "").netloc.lower().split("@")[-1].split(":")[0]
+    return any(host == h or host.endswith("." + h) for h in _YOUTUBE_HOSTS)
+
+
+def is_session_rejected(line: str) -> bool:
+    """True if a yt-dlp output line suggests YouTube refused the session."""
+    return bool(_REJECTED_RE.search(line or ""))
+
+
+def fetch_visitor_data(timeout: float = 10.0) -> Optional[str]:
+    """Visitor data of a new guest session (one youtube.com request), or None."""
+    try:
+        import requests
+
+        response = requests.get(
+            "https://www.youtube.com/",
+            headers={"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"},
+            # skips the EU consent interstitial
+            cookies={"SOCS": "CAI"},
+            timeout=timeout,
+        )
+        if not response.ok:
+            return None
+        for pattern in _VISITOR_DATA_RES:
+            match = pattern.search(response.text)
+            if match:
+                return match.group(1).encode().decode("unicode_escape")
+    except Exception:
+        pass
+    return None
+
+
+# -----------------
+# Cached session state
+# -----------------
+class SessionCache:
+    """
+    Session values with an expiry, persisted as JSON next to config.json.
+    Only one thread fetches a missing value; the others wait for its result.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        if path is None:
+            path = config_path("session.json")
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._items = {}
+        self._load()
+
+    def get(self, key: str) -> Optional[str]:
+        """The cached value, or None if it is missing or expired."""
+        with self._lock:
+            record = self._items.get(key)
+            if record and record.get("expires_at", 0) > time.time():
+                return record.get("value")
+        return None
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Optional[str]], ttl: float) -> Optional[str]:
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._fetch_lock:
+            value = self.get(key)
+            if value is None:
+                value = fetch()
+                if value:
+                    self.put(key, value, ttl)
+        return value
+
+    def put(self, key: str, value: str, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._items[key] = {"value": value, "fetched_at": now, "expires_at": now + ttl}
+        self._save()
+
+    def invalidate(self, key: str, value: Optional[str] = None):
+        """Forget `key` (only if it still holds `value`, when given)."""
+        with self._lock:
+            record = self._items.get(key)
+            if record is None or (value is not None and record.get("value") != value):
+                return
+            del self._items[key]
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self._items = {k: v for k, v in data.items() if isinstance(v, dict)}
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                payload = dict(self._items)
+            try:
+                os.makedirs(self.path.parent, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(payload, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+_cache: Optional[SessionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_session_cache() -> SessionCache:
+    """The process-wide SessionCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SessionCache()
+        return _cache
+
+
+# -----------------
+# Per-job session
+# -----------------
+class JobSession:
+    """
+    Cookies and session arguments for one job. load() once, then
+    ytdlp_args(url) from any worker thread; close() when the job ends.
+    """
+
+    def __init__(self, options: Optional[dict], cache: Optional[SessionCache] = None):
+        self.options = dict(options or {})
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._dir: Optional[str] = None
+        self._snapshot: Optional[str] = None        # cookies loaded for this job
+        self._cookie_args: List[str] = []           # used when there is no snapshot
+        self._copies = 0
+        self._visitor_value: Optional[str] = None
+        self._visitor_failed = False
+
+    @property
+    def has_cookies(self) -> bool:
+        return bool(self._snapshot or self._cookie_args)
+
+    def load(self, status_callback: Optional[Callable[[str], None]] = None):
+        """Read the cookie profile once. Problems are reported and the job runs without cookies."""
+        cookies_file = self.options.get("cookies_file")
+        browser = self.options.get("cookies_from_browser")
+        try:
+            if cookies_file:
+                path = os.path.expanduser(cookies_file)
+                if not os.path.isfile(path):
+                    raise OSError(f"cookies file not found: {path}")
+                self._snapshot = os.path.join(self._private_dir(), "cookies.txt")
+                shutil.copyfile(path, self._snapshot)
+                source = path
+            elif browser:
+                self._snapshot = self._extract_browser_cookies(browser)
+                source = browser
+            else:
+                return
+        except Exception as e:
+            self._snapshot = None
+            _log.warning("Could not load cookies: %s", e)
+            if status_callback:
+                status_callback(f"Could not load cookies ({e}); continuing without them.")
+            return
+
+        if self._snapshot is None:
+            # yt_dlp can't be imported here: let every yt-dlp process read the browser itself
+            self._cookie_args = ["--cookies-from-browser", browser]
+            source = f"{browser} (read by each yt-dlp process)"
+        _log.info("Using cookies from %s", source)
+        if status_callback:
+            status_callback(f"Using cookies from {source}.")
+
+    def cookie_file(self) -> Optional[str]:
+        """This thread's copy of the job's cookies (yt-dlp writes it back on exit)."""
+        if self._snapshot is None:
+            return None
+        path = getattr(self._local, "cookie_file", None)
+        if path is None:
+            with self._lock:
+                self._copies += 1
+                path = os.path.join(os.path.dirname(self._snapshot), f"cookies-{self._copies}.txt")
+            shutil.copyfile(self._snapshot, path)
+            self._local.cookie_file = path
+        return path
+
+    def ytdlp_args(self, url: str) -> List[str]:
+        """yt-dlp options for a request to `url` (probe or download)."""
+        args = []
+        cookie_file = self.cookie_file()
+        if cookie_file:
+            args += ["--cookies", cookie_file]
+        else:
+            args += self._cookie_args
+
+        if is_youtube_url(url):
+            youtube = []
+            visitor_data = None if self.has_cookies else self._visitor_data()
+            if visitor_data:
+                # the visitor data replaces what yt-dlp would read from the webpage and configs
+                youtube += [f"visitor_data={visitor_data}", "player_skip=webpage,configs"]
+            if self.options.get("po_token"):
+                youtube.append(f"po_token={self.options['po_token']}")
+            if youtube:
+                args += ["--extractor-args", "youtube:" + ";".join(youtube)]
+        return args
+
+    def rejected(self):
+        """YouTube refused a request: drop the cached visitor data (fetched again on the next attempt)."""
+        if self.options.get("visitor_data") or not self.options.get("reuse_session"):
+            return
+        _log.info("YouTube rejected the cached session; starting a new one")
+        self._visitor_failed = False
+        # other workers may have replaced it already
+        self._session_cache().invalidate("youtube_visitor_data", self._visitor_value)
+
+    def close(self):
+        """Remove the job's cookie snapshot and copies."""
+        with self._lock:
+            directory, self._dir = self._dir, None
+            self._snapshot = None
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _private_dir(self) -> str:
+        with self._lock:
+            if self._dir is None:
+                # mkdtemp creates the folder readable by this user only
+                self._dir = tempfile.mkdtemp(prefix="seadog-session-")
+            return self._dir
+
+    def _extract_browser_cookies(self, spec: str) -> Optional[str]:
+        try:
+            from yt_dlp import parse_options
+            from yt_dlp.cookies import extract_cookies_from_browser
+        except ImportError:
+            return None
+        # yt-dlp validates and splits BROWSER[+KEYRING][:PROFILE][::CONTAINER]
+        browser, profile, keyring, container = parse_options(["--cookies-from-browser", spec]).ydl_opts["cookiesfrombrowser"]
+        jar = extract_cookies_from_browser(browser, profile, keyring=keyring, container=container)
+        path = os.path.join(self._private_dir(), "cookies.txt")
+        jar.save(path, ignore_discard=True, ignore_expires=True)
+        return path
+
+    def _visitor_data(self) -> Optional[str]:
+        if self.options.get("visitor_data"):
+            return self.options["visitor_data"]
+        if self.options.get("po_token") or not self.options.get("reuse_session") or self._visitor_failed:
+            # a PO token is bound to its own visitor data, set with it in the config
+            return None
+        ttl = self.options.get("session_ttl", DEFAULT_SESSION_TTL)
+        if not ttl:
+            return None
+        value = self._session_cache().get_or_fetch("youtube_visitor_data", fetch_visitor_data, ttl)
+        if value is None:
+            # don't try again for every item of this job
+            self._visitor_failed = True
+        self._visitor_value = value
+        return value
+
+    def _session_cache(self) -> SessionCache:
+        if self._cache is None:
+            self._cache = get_session_cache()
+        return self._cache
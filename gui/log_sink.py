@@ -0,0 +1,79 @@
+from collections import deque
+import threading
+
+from PyQt5.QtCore import QObject, QTimer
+
+# set_progress() value that switches the bar to busy (indeterminate) mode
+BUSY = -1
+
+
+class BufferedLogSink(QObject):
+    """
+    Batches status lines and progress updates for a QTextEdit / QProgressBar.
+
+    append() and set_progress() may be called from any thread; they only touch
+    a lock-protected buffer. A timer on the GUI thread flushes pending lines in
+    one append() every `interval_ms` and applies only the latest progress value
+    (BUSY shows a busy bar until the next percentage). Pending lines and the
+    widget's history are capped at `max_lines`.
+    """
+
+    def __init__(self, text_edit, progress_bar=None, interval_ms=100, max_lines=5000, parent=None):
+        super().__init__(parent or text_edit)
+        self._text_edit = text_edit
+        self._progress_bar = progress_bar
+        self._lock = threading.Lock()
+        self._pending = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._progress = None
+
+        # Oldest blocks are discarded once the document reaches max_lines
+        self._text_edit.document().setMaximumBlockCount(max_lines)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    # -----------------
+    # Thread-safe producers
+    # -----------------
+    def append(self, msg: str):
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(msg)
+
+    def set_progress(self, value: int):
+        with self._lock:
+            self._progress = value
+
+    # -----------------
+    # GUI thread
+    # -----------------
+    def flush(self):
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+            progress, self._progress = self._progress, None
+
+        if dropped:
+            lines.insert(0, f"... {dropped} earlier lines skipped ...")
+        if lines:
+            self._text_edit.append("\n".join(lines))
+        if progress is not None and self._progress_bar is not None:
+            if progress == BUSY:
+                self._progress_bar.setRange(0, 0)
+            else:
+                if self._progress_bar.maximum() == 0:
+                    self._progress_bar.setRange(0, 100)
+                self._progress_bar.setValue(progress)
+
+    def clear(self):
+        """Drop pending output and clear the widget (GUI thread only)."""
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+            self._progress = None
+        self._text_edit.clear()
@@ -1,21 +1,34 @@
+import importlib
+
 from PyQt5.QtWidgets import (
     QMainWindow,
     QTabWidget,
     QAction,
     QMessageBox,
     QWidget,
+    QVBoxLayout,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
-from gui.music_tab import MusicTab
-from gui.video_tab import VideoTab
-from gui.settings_tab import SettingsTab
+from utils.config import ConfigManager
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # (label, module, class); a tab's module is imported when it is first shown
+    TABS = [
+        ("Music", "gui.music_tab", "MusicTab"),
+        ("Video", "gui.video_tab", "VideoTab"),
+        ("Queue", "gui.queue_tab", "QueueTab"),
+        ("Settings", "gui.settings_tab", "SettingsTab"),
+    ]
+
+    def __init__(self, profiler=None):
         super().__init__()
 
+        # Optional startup profiler (main.py --profile-startup)
+        self.profiler = profiler
+        self.playlist_monitor = None
+
         # Version injected from main.py after construction
         self.app_version = "0.3.0"
 
@@ -39,12 +52,65 @@ class MainWindow(QMainWindow):
         # -----------------
         self.setWindowTitle("Project SeaDog")
 
-        tabs = QTabWidget()
-        tabs.addTab(MusicTab(), "Music")
-        tabs.addTab(VideoTab(), "Video")
-        tabs.addTab(SettingsTab(), "Settings")
+        # Tabs start as empty placeholders and are built on first activation
+        self.tabs = QTabWidget()
+        self._built_tabs = {}
+        for label, _, _ in self.TABS:
+            placeholder = QWidget()
+            layout = QVBoxLayout(placeholder)
+            layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(placeholder, label)
+        self.tabs.currentChanged.connect(self.ensure_tab)
+        self.ensure_tab(self.tabs.currentIndex())
+
+        self.setCentralWidget(self.tabs)
+
+        # Start background services once the window is up
+        QTimer.singleShot(0, self.start_background_services)
+
+    def ensure_tab(self, index):
+        """Build the tab at `index` if it has not been built yet. Returns the tab widget."""
+        if index < 0 or index >= len(self.TABS):
+            return None
+        label, module_name, class_name = self.TABS[index]
+        if label in self._built_tabs:
+            return self._built_tabs[label]
+
+        tab_class = getattr(importlib.import_module(module_name), class_name)
+        tab = tab_class()
+        self.tabs.widget(index).layout().addWidget(tab)
+        self._built_tabs[label] = tab
+
+        if self.profiler is not None:
+            self.profiler.mark(f"{label} tab built")
+        return tab
+
+    def start_background_services(self):
+        from controllers.jobs import resume_unfinished
+        from engine.playlist_monitor import PlaylistMonitor
+
+        # Downloads interrupted by the last exit continue where they stopped
+        resumed = resume_unfinished()
+        if resumed:
+            self.statusBar().showMessage(f"Resumed {len(resumed)} interrupted download(s); see the Queue tab.", 10000)
+
+        # Followed playlists are only checked while monitoring is enabled in Settings
+        self.playlist_monitor = PlaylistMonitor()
+        self.playlist_monitor.start()
+
+    def closeEvent(self, event):
+        from engine.job_queue import get_download_queue
+        from engine.postprocess import shutdown_postprocessor
+        from utils.kid3 import shutdown_tagger
 
-        self.setCentralWidget(tabs)
+        if self.playlist_monitor is not None:
+            self.playlist_monitor.stop()
+        # Running downloads stay in the job journal and resume on next start
+        get_download_queue().shutdown()
+        shutdown_postprocessor(wait=False)
+        shutdown_tagger(wait=False)
+        ConfigManager().flush()
+        super().closeEvent(event)
 
     def show_about_dialog(self):
         QMessageBox.about(
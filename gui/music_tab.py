@@ -3,18 +3,31 @@ from PyQt5.QtWidgets import (
     QPushButton, QCheckBox, QFileDialog, QTextEdit,
     QGroupBox, QStyle, QProgressBar, QRadioButton
 )
-from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
 from controllers.music_controller import MusicController
 from utils.config import ConfigManager
-import os
+from utils.paths import default_output_dir
+from gui.log_sink import BUSY, BufferedLogSink
+import itertools
+import threading
 
 
 class MusicTab(QWidget):
+    # (job key, success), emitted on the downloader thread and handled on the GUI thread
+    job_finished = pyqtSignal(int, bool)
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.controller = MusicController()
         self.config = ConfigManager()
+        self._item_progress = {}
+        self._item_counts = {}
+        self._active_jobs = set()
+        self._job_keys = itertools.count(1)
+        # guards the three above: progress events arrive on worker threads
+        self._jobs_lock = threading.Lock()
+        self.job_finished.connect(self._on_job_finished)
 
         main_layout = QVBoxLayout(self)
         main_layout.setSpacing(15)
@@ -26,7 +39,7 @@ class MusicTab(QWidget):
         source_layout = QVBoxLayout()
 
         self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("YouTube URL or playlist")
+        self.url_input.setPlaceholderText("YouTube URL or playlist (separate several with spaces)")
 
         source_layout.addWidget(QLabel("URL:"))
         source_layout.addWidget(self.url_input)
@@ -41,7 +54,7 @@ class MusicTab(QWidget):
 
         self.dir_input = QLineEdit()
         self.dir_input.setText(
-            self.config.get("music_output_dir", os.path.expanduser("~/Music"))
+            self.config.get("music_output_dir", default_output_dir("audio"))
         )
 
         browse_btn = QPushButton("Browse")
@@ -59,7 +72,7 @@ class MusicTab(QWidget):
         options_group = QGroupBox("Options")
         options_layout = QVBoxLayout()
 
-        self.kid3_checkbox = QCheckBox("Open Kid3 after download")
+        self.kid3_checkbox = QCheckBox("Open Kid3 for files that need tagging")
         self.kid3_checkbox.setChecked(True)
 
         self.gotify_checkbox = QCheckBox("Send Gotify notification on completion")
@@ -68,6 +81,9 @@ class MusicTab(QWidget):
         options_layout.addWidget(self.kid3_checkbox)
         options_layout.addWidget(self.gotify_checkbox)
 
+        self.follow_checkbox = QCheckBox("Follow playlist (download new items automatically)")
+        options_layout.addWidget(self.follow_checkbox)
+
         options_group.setLayout(options_layout)
         main_layout.addWidget(options_group)
 
@@ -123,6 +139,9 @@ class MusicTab(QWidget):
         self.status_output.setReadOnly(True)
         status_layout.addWidget(self.status_output)
 
+        # Batched, capped log/progress updates (safe to feed from worker threads)
+        self.log_sink = BufferedLogSink(self.status_output, self.progress_bar)
+
         status_group.setLayout(status_layout)
         main_layout.addWidget(status_group)
 
@@ -145,47 +164,95 @@ class MusicTab(QWidget):
             self.dir_input.setText(path)
 
     def start_download(self):
-        url = self.url_input.text().strip()
-        if not url:
+        urls = self.url_input.text().split()
+        if not urls:
             self.append_status("Please enter a URL.")
             return
 
-        self.progress_bar.setValue(0)
-        self.status_output.clear()
-        self.toggle_controls(False)
-
-        self.controller.start_download(
-            url=url,
-            output_dir=self.dir_input.text(),
-            open_kid3=self.kid3_checkbox.isChecked(),
-            audio_quality=self.get_audio_quality(),
-            progress_callback=self.append_status,
-            finished_callback=self.download_finished
-        )
+        with self._jobs_lock:
+            idle = not self._active_jobs
+            if idle:
+                self._item_progress = {}
+                self._item_counts = {}
+        if idle:
+            self.log_sink.clear()
+            self._set_progress(0)
+        self.cancel_btn.setEnabled(True)
+
+        if self.follow_checkbox.isChecked():
+            self.follow_playlists(urls)
+
+        # Every URL becomes its own job on the shared download queue
+        for url in urls:
+            key = next(self._job_keys)
+            with self._jobs_lock:
+                self._active_jobs.add(key)
+            self.controller.start_download(
+                url=url,
+                output_dir=self.dir_input.text(),
+                open_kid3=self.kid3_checkbox.isChecked(),
+                audio_quality=self.get_audio_quality(),
+                send_notification=self.gotify_checkbox.isChecked(),
+                progress_callback=self.append_status,
+                progress_event_callback=lambda event, key=key: self.update_progress(key, event),
+                finished_callback=lambda ok, key=key: self.download_finished(key, ok),
+            )
+        self.url_input.clear()
+
+    def follow_playlists(self, urls):
+        followed = dict(self.config.get("follow_playlists", {}) or {})
+        for url in urls:
+            followed[url] = {"mode": "audio", "out_dir": self.dir_input.text(), "enabled": True}
+        self.config.set("follow_playlists", followed)
+        self.append_status(f"Following {len(urls)} playlist(s); enable monitoring in Settings.")
 
     def cancel_download(self):
         self.controller.cancel_download()
         self.append_status("Download cancelled.")
-        self.toggle_controls(True)
+        self.cancel_btn.setEnabled(False)
 
     # =========================
     # Thread-safe UI helpers
     # =========================
     def append_status(self, msg):
-        QtCore.QMetaObject.invokeMethod(
-            self.status_output,
-            "append",
-            QtCore.Qt.QueuedConnection,
-            QtCore.Q_ARG(str, msg)
-        )
+        self.log_sink.append(msg)
 
-    def download_finished(self, success):
-        self.progress_bar.setValue(100 if success else 0)
+    def update_progress(self, job_key, event):
+        """Overall progress across this tab's jobs from engine.progress.ProgressEvent objects."""
+        if event.phase != "download":
+            return
+        fraction = event.fraction
+        if fraction is None:
+            return
+        with self._jobs_lock:
+            self._item_progress[(job_key, event.item_index)] = fraction
+            self._item_counts[job_key] = event.item_count
+            counts = list(self._item_counts.values())
+            done = sum(self._item_progress.values())
+        if None in counts:
+            # a playlist whose length isn't known yet: no meaningful percentage
+            self.log_sink.set_progress(BUSY)
+            return
+        self._set_progress(min(100, int(100 * done / sum(counts))))
+
+    def _set_progress(self, value: int):
+        self.log_sink.set_progress(value)
+
+    def download_finished(self, job_key, success):
+        # called on the downloader thread; widgets are updated in _on_job_finished
+        self.job_finished.emit(job_key, success)
+
+    def _on_job_finished(self, job_key, success):
+        with self._jobs_lock:
+            self._active_jobs.discard(job_key)
+            idle = not self._active_jobs
+            if job_key in self._item_counts:
+                # count the finished job as complete (its length may never have been known)
+                items = [k for k in self._item_progress if k[0] == job_key]
+                for k in items:
+                    self._item_progress[k] = 1.0
+                self._item_counts[job_key] = len(items)
         self.append_status("Finished." if success else "Finished with errors.")
-        self.toggle_controls(True)
-
-    def toggle_controls(self, enabled):
-        self.start_btn.setEnabled(enabled)
-        self.cancel_btn.setEnabled(not enabled)
-        self.url_input.setEnabled(enabled)
-        self.dir_input.setEnabled(enabled)
+        if idle:
+            self._set_progress(100 if success else 0)
+            self.cancel_btn.setEnabled(False)
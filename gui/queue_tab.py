@@ -0,0 +1,155 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+    QGroupBox, QLabel, QSpinBox
+)
+from PyQt5.QtCore import QTimer
+
+from engine.job_queue import get_download_queue, JOB_QUEUED
+from utils.config import ConfigManager
+
+
+class QueueTab(QWidget):
+    COLUMNS = ["Job", "Mode", "Status", "Progress", "Priority", "URL"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.queue = get_download_queue()
+        self.config = ConfigManager()
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setSpacing(15)
+
+        # =========================
+        # Limits
+        # =========================
+        limits_group = QGroupBox("Limits")
+        limits_layout = QHBoxLayout()
+
+        self.global_spin = QSpinBox()
+        self.global_spin.setRange(1, 16)
+        self.global_spin.setValue(self.queue.max_concurrent_jobs)
+
+        self.audio_spin = QSpinBox()
+        self.audio_spin.setRange(1, 16)
+        self.audio_spin.setValue(self.queue.mode_limits.get("audio", 1))
+
+        self.video_spin = QSpinBox()
+        self.video_spin.setRange(1, 16)
+        self.video_spin.setValue(self.queue.mode_limits.get("video", 1))
+
+        for spin in (self.global_spin, self.audio_spin, self.video_spin):
+            spin.valueChanged.connect(self.apply_limits)
+
+        limits_layout.addWidget(QLabel("Jobs at once:"))
+        limits_layout.addWidget(self.global_spin)
+        limits_layout.addWidget(QLabel("Music:"))
+        limits_layout.addWidget(self.audio_spin)
+        limits_layout.addWidget(QLabel("Video:"))
+        limits_layout.addWidget(self.video_spin)
+        limits_layout.addStretch()
+
+        limits_group.setLayout(limits_layout)
+        main_layout.addWidget(limits_group)
+
+        # =========================
+        # Jobs
+        # =========================
+        jobs_group = QGroupBox("Jobs")
+        jobs_layout = QVBoxLayout()
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(len(self.COLUMNS) - 1, QHeaderView.Stretch)
+        jobs_layout.addWidget(self.table)
+
+        controls_layout = QHBoxLayout()
+
+        self.pause_btn = QPushButton("Pause Queue")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+
+        up_btn = QPushButton("Raise Priority")
+        up_btn.clicked.connect(lambda: self.change_priority(1))
+
+        down_btn = QPushButton("Lower Priority")
+        down_btn.clicked.connect(lambda: self.change_priority(-1))
+
+        cancel_btn = QPushButton("Cancel Selected")
+        cancel_btn.clicked.connect(self.cancel_selected)
+
+        clear_btn = QPushButton("Clear Finished")
+        clear_btn.clicked.connect(self.queue.clear_finished)
+
+        for btn in (self.pause_btn, up_btn, down_btn, cancel_btn, clear_btn):
+            controls_layout.addWidget(btn)
+
+        jobs_layout.addLayout(controls_layout)
+        jobs_group.setLayout(jobs_layout)
+        main_layout.addWidget(jobs_group)
+
+        # Poll the queue; cheaper than a cross-thread signal per change
+        self._timer = QTimer(self)
+        self._timer.setInterval(500)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.refresh()
+
+    # =========================
+    # Actions
+    # =========================
+    def refresh(self):
+        jobs = self.queue.jobs()
+        self.table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            values = [
+                str(job.job_id),
+                job.mode,
+                job.status,
+                f"{job.progress}%",
+                str(job.priority),
+                job.url,
+            ]
+            for col, value in enumerate(values):
+                item = self.table.item(row, col)
+                if item is None:
+                    self.table.setItem(row, col, QTableWidgetItem(value))
+                elif item.text() != value:
+                    item.setText(value)
+
+        self.pause_btn.setText("Resume Queue" if self.queue.paused else "Pause Queue")
+
+    def selected_job_ids(self):
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return [int(self.table.item(row, 0).text()) for row in sorted(rows)]
+
+    def toggle_pause(self):
+        if self.queue.paused:
+            self.queue.resume()
+        else:
+            self.queue.pause()
+        self.refresh()
+
+    def change_priority(self, delta):
+        jobs = {job.job_id: job for job in self.queue.jobs()}
+        for job_id in self.selected_job_ids():
+            job = jobs.get(job_id)
+            if job and job.status == JOB_QUEUED:
+                self.queue.set_priority(job_id, job.priority + delta)
+        self.refresh()
+
+    def cancel_selected(self):
+        for job_id in self.selected_job_ids():
+            self.queue.cancel(job_id)
+        self.refresh()
+
+    def apply_limits(self):
+        # The queue follows these config keys (see get_download_queue)
+        self.config.update({
+            "max_concurrent_jobs": self.global_spin.value(),
+            "max_concurrent_audio_jobs": self.audio_spin.value(),
+            "max_concurrent_video_jobs": self.video_spin.value(),
+        })
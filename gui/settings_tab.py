@@ -1,11 +1,11 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QFileDialog, QMessageBox,
-    QGroupBox, QSpinBox
+    QGroupBox, QSpinBox, QCheckBox
 )
 from utils.config import ConfigManager
+from utils.paths import default_output_dir
 from utils.gotify import test_gotify_notification
-import os
 
 
 class SettingsTab(QWidget):
@@ -62,16 +62,69 @@ class SettingsTab(QWidget):
         self.playlist_delay_spin.setRange(0, 300)
         self.playlist_delay_spin.setSuffix(" sec")
         self.playlist_delay_spin.setToolTip(
-            "Delay between playlist items to avoid rate limiting"
+            "Minimum delay between item starts; increased automatically while a site is rate limiting"
+        )
+
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 16)
+        self.concurrency_spin.setToolTip(
+            "How many playlist items to download at the same time"
         )
 
         playlist_layout.addWidget(QLabel("Delay between items:"))
         playlist_layout.addWidget(self.playlist_delay_spin)
+        playlist_layout.addWidget(QLabel("Parallel downloads:"))
+        playlist_layout.addWidget(self.concurrency_spin)
         playlist_layout.addStretch()
 
         playlist_group.setLayout(playlist_layout)
         main_layout.addWidget(playlist_group)
 
+        # =========================
+        # Video Acceleration
+        # =========================
+        accel_group = QGroupBox("Accelerated Video Downloads")
+        accel_layout = QHBoxLayout()
+
+        self.accel_checkbox = QCheckBox("Enable by default")
+
+        self.fragments_spin = QSpinBox()
+        self.fragments_spin.setRange(1, 32)
+        self.fragments_spin.setToolTip(
+            "Fragments downloaded in parallel (aria2c: connections per file)"
+        )
+
+        self.aria2c_checkbox = QCheckBox("Use aria2c if installed")
+
+        accel_layout.addWidget(self.accel_checkbox)
+        accel_layout.addWidget(QLabel("Parallel fragments:"))
+        accel_layout.addWidget(self.fragments_spin)
+        accel_layout.addWidget(self.aria2c_checkbox)
+        accel_layout.addStretch()
+
+        accel_group.setLayout(accel_layout)
+        main_layout.addWidget(accel_group)
+
+        # =========================
+        # Playlist Monitoring
+        # =========================
+        monitor_group = QGroupBox("Playlist Monitoring")
+        monitor_layout = QHBoxLayout()
+
+        self.monitor_checkbox = QCheckBox("Check followed playlists for new items")
+
+        self.monitor_interval_spin = QSpinBox()
+        self.monitor_interval_spin.setRange(10, 86400)
+        self.monitor_interval_spin.setSuffix(" sec")
+
+        monitor_layout.addWidget(self.monitor_checkbox)
+        monitor_layout.addWidget(QLabel("Every:"))
+        monitor_layout.addWidget(self.monitor_interval_spin)
+        monitor_layout.addStretch()
+
+        monitor_group.setLayout(monitor_layout)
+        main_layout.addWidget(monitor_group)
+
         # =========================
         # Gotify Configuration
         # =========================
@@ -149,14 +202,32 @@ class SettingsTab(QWidget):
 
     def load_settings(self):
         self.music_dir_input.setText(
-            self.config.get("music_output_dir", os.path.expanduser("~/Music"))
+            self.config.get("music_output_dir", default_output_dir("audio"))
         )
         self.video_dir_input.setText(
-            self.config.get("video_output_dir", os.path.expanduser("~/Videos"))
+            self.config.get("video_output_dir", default_output_dir("video"))
         )
         self.playlist_delay_spin.setValue(
             self.config.get("playlist_delay", 0)
         )
+        self.concurrency_spin.setValue(
+            self.config.get("max_concurrent_downloads", 1)
+        )
+        self.accel_checkbox.setChecked(
+            self.config.get("video_accelerated_download", False)
+        )
+        self.fragments_spin.setValue(
+            self.config.get("video_concurrent_fragments", 8)
+        )
+        self.aria2c_checkbox.setChecked(
+            self.config.get("video_use_aria2c", True)
+        )
+        self.monitor_checkbox.setChecked(
+            self.config.get("playlist_monitor_enabled", False)
+        )
+        self.monitor_interval_spin.setValue(
+            self.config.get("playlist_monitor_interval", 60)
+        )
         self.gotify_url_input.setText(
             self.config.get("gotify_url", "")
         )
@@ -177,6 +248,30 @@ class SettingsTab(QWidget):
             "playlist_delay",
             self.playlist_delay_spin.value()
         )
+        self.config.set(
+            "max_concurrent_downloads",
+            self.concurrency_spin.value()
+        )
+        self.config.set(
+            "video_accelerated_download",
+            self.accel_checkbox.isChecked()
+        )
+        self.config.set(
+            "video_concurrent_fragments",
+            self.fragments_spin.value()
+        )
+        self.config.set(
+            "video_use_aria2c",
+            self.aria2c_checkbox.isChecked()
+        )
+        self.config.set(
+            "playlist_monitor_enabled",
+            self.monitor_checkbox.isChecked()
+        )
+        self.config.set(
+            "playlist_monitor_interval",
+            self.monitor_interval_spin.value()
+        )
         self.config.set(
             "gotify_url",
             self.gotify_url_input.text()
@@ -1,9 +1,11 @@
 import sys
-import os
+import time
 import argparse
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QPalette, QColor, QIcon
-from PyQt5.QtCore import Qt
+import multiprocessing
+
+_STARTED = time.perf_counter()
+
+import cli  # noqa: E402  (headless entry point, no Qt)
 
 APP_NAME = "SeaDog"
 APP_VERSION = "0.4.0"
@@ -12,17 +14,38 @@ APP_VERSION = "0.4.0"
 def resource_path(relative_path):
     """
     Get absolute path to resource.
-    Works for development and PyInstaller.
+    Works for development and PyInstaller (see utils.paths).
+    """
+    from utils.paths import resource_path as _resource_path
+    return _resource_path(relative_path)
+
+
+class StartupProfiler:
     """
-    try:
-        base_path = sys._MEIPASS  # PyInstaller temp dir
-    except Exception:
-        base_path = os.path.abspath(".")
+    Records named checkpoints since main.py was loaded and prints a timing
+    report to stderr (enabled with --profile-startup).
+    """
+
+    def __init__(self):
+        self.start = _STARTED
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
 
-    return os.path.join(base_path, relative_path)
+    def report(self):
+        lines = ["Startup timing:"]
+        previous = self.start
+        for name, at in self.marks:
+            lines.append(f"  {(at - self.start) * 1000:8.1f} ms  (+{(at - previous) * 1000:7.1f})  {name}")
+            previous = at
+        print("\n".join(lines), file=sys.stderr)
 
 
-def apply_dark_theme(app: QApplication):
+def apply_dark_theme(app):
+    from PyQt5.QtGui import QPalette, QColor
+    from PyQt5.QtCore import Qt
+
     app.setStyle("Fusion")
 
     palette = QPalette()
@@ -44,23 +67,49 @@ def apply_dark_theme(app: QApplication):
 
 
 def main():
-    parser = argparse.ArgumentParser()
+    from utils.logging import configure_logging
+    configure_logging()
+
+    # Headless commands never import PyQt5 (see cli.py)
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+
+    parser = argparse.ArgumentParser(
+        epilog="Headless mode: seadog download|sync|daemon --help"
+    )
     parser.add_argument(
         "--version",
         action="store_true",
         help="Show SeaDog version and exit"
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print a startup timing report to stderr"
+    )
     args = parser.parse_args()
 
     if args.version:
         print(f"{APP_NAME} v{APP_VERSION}")
         sys.exit(0)
 
+    profiler = StartupProfiler() if args.profile_startup else None
+
+    def mark(name):
+        if profiler is not None:
+            profiler.mark(name)
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtCore import Qt, QTimer
+    mark("PyQt5 imported")
+
     # ✅ Enable proper scaling
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
 
     app = QApplication(sys.argv)
+    mark("QApplication created")
 
     # ✅ Set application icon
     icon_path = resource_path("resources/icons/icon.png")
@@ -68,19 +117,32 @@ def main():
 
     # ✅ Apply dark theme explicitly
     apply_dark_theme(app)
+    mark("Theme applied")
 
     # Import GUI after QApplication
     from gui.main_window import MainWindow  # noqa
+    mark("Main window imported")
 
-    window = MainWindow()
+    window = MainWindow(profiler=profiler)
     window.app_version = APP_VERSION
+    mark("Main window created")
 
     window.setWindowIcon(QIcon(icon_path))  # extra safety for some WMs
     window.resize(1000, 700)
     window.show()
+    mark("Main window shown")
+
+    if profiler is not None:
+        # Runs on the first event loop iteration, i.e. once the window is painted
+        def first_event():
+            mark("Event loop running")
+            profiler.report()
+        QTimer.singleShot(0, first_event)
 
     sys.exit(app.exec_())
 
 
 if __name__ == "__main__":
+    # post-processing pool workers are spawned; needed for PyInstaller builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,123 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.gotify import GotifyNotifier
+
+pytest.importorskip("requests")
+
+
+class _Gotify(BaseHTTPRequestHandler):
+    """Gotify stand-in: records each POST /message and answers with the next scripted status."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.requests.append({"path": self.path, "client": self.client_address, **json.loads(body)})
+            status = server.statuses.pop(0) if server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Gotify)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _notifier(server, **kwargs):
+    config = {"gotify_url": f"http://127.0.0.1:{server.server_address[1]}/", "gotify_token": "secret"}
+    kwargs = {"coalesce_window": 0.05, "backoff": 0.01, **kwargs}
+    return GotifyNotifier(config=config, **kwargs)
+
+
+def test_bursts_are_coalesced(server):
+    notifier = _notifier(server, coalesce_window=0.3)
+    for i in range(5):
+        notifier.notify("Music Download Completed", f"item {i}")
+    assert notifier.flush(timeout=5)
+    notifier.close()
+
+    assert len(server.requests) == 1
+    request = server.requests[0]
+    assert request["path"] == "/message?token=secret"
+    assert request["title"] == "Music Download Completed (x5)"
+    assert request["message"].splitlines() == [f"item {i}" for i in range(5)]
+    assert (notifier.sent, notifier.coalesced) == (1, 4)
+
+
+def test_server_errors_are_retried(server):
+    server.statuses = [500, 503, 200]
+    notifier = _notifier(server)
+    notifier.notify("title", "message")
+    assert notifier.flush(timeout=5)
+    notifier.close()
+    assert len(server.requests) == 3
+    assert (notifier.sent, notifier.failed) == (1, 0)
+
+
+def test_too_many_requests_is_retried(server):
+    server.statuses = [429, 200]
+    notifier = _notifier(server)
+    notifier.notify("title", "message")
+    assert notifier.flush(timeout=5)
+    notifier.close()
+    assert len(server.requests) == 2
+    assert notifier.sent == 1
+
+
+def test_client_errors_are_not_retried(server):
+    server.statuses = [401]
+    notifier = _notifier(server)
+    notifier.notify("title", "message")
+    assert notifier.flush(timeout=5)
+    notifier.close()
+    assert len(server.requests) == 1
+    assert (notifier.sent, notifier.failed) == (0, 1)
+
+
+def test_gives_up_after_max_retries(server):
+    server.statuses = [500] * 10
+    notifier = _notifier(server, max_retries=2)
+    notifier.notify("title", "message")
+    assert notifier.flush(timeout=5)
+    notifier.close()
+    assert len(server.requests) == 3
+    assert notifier.failed == 1
+
+
+def test_session_is_reused(server):
+    notifier = _notifier(server)
+    for i in range(3):
+        notifier.notify("title", f"message {i}")
+        assert notifier.flush(timeout=5)
+    notifier.close()
+    assert len(server.requests) == 3
+    # one pooled connection: every request comes from the same client port
+    assert len({r["client"] for r in server.requests}) == 1
+
+
+def test_not_configured_is_skipped(server):
+    notifier = GotifyNotifier(config={"gotify_url": "", "gotify_token": ""}, coalesce_window=0.01)
+    notifier.notify("title", "message")
+    assert notifier.flush(timeout=5)
+    notifier.close()
+    assert server.requests == []
+    assert (notifier.skipped, notifier.failed) == (1, 0)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from engine.job_queue import JOB_DONE, DownloadQueue
+from engine.progress import ProgressEvent
+
+
+class _Downloader:
+    """Finishes at once, on its own thread, like a real Downloader."""
+
+    cancelled = False
+    metrics = None
+    downloaded = []
+
+    def download(self, finished_callback=None, **kwargs):
+        threading.Thread(target=finished_callback, args=(True,)).start()
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr("engine.job_queue.Downloader", _Downloader)
+    return DownloadQueue()
+
+
+def test_wait_idle_waits_for_finished_callbacks(queue):
+    finished = []
+
+    def slow_callback(ok):
+        time.sleep(0.2)
+        finished.append(ok)
+
+    queue.submit(url="https://example.com/a", out_dir="/tmp", finished_callback=slow_callback)
+    assert queue.wait_idle(timeout=5)
+    assert finished == [True]
+    assert queue.jobs()[0].status == JOB_DONE
+
+
+def test_progress_from_several_workers(queue):
+    queue.pause()
+    job = queue.submit(url="https://example.com/a", out_dir="/tmp")
+    count = 200
+
+    def worker(first):
+        for idx in range(first, count + 1, 4):
+            queue._on_progress(job, ProgressEvent(idx, count, "download", "finished"))
+
+    threads = [threading.Thread(target=worker, args=(first,)) for first in range(1, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert job.progress == 100
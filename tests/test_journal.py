@@ -0,0 +1,60 @@
+import pytest
+
+from engine.journal import ITEM_DONE, ITEM_PARTIAL, ITEM_PENDING, JobJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = JobJournal(tmp_path / "jobs.sqlite3")
+    yield journal
+    journal.close()
+
+
+def test_unfinished_jobs(journal):
+    journal.add_job("a", "https://example.com/a", "/out", "audio", options={"delay": 2, "cache": object()})
+    journal.add_job("b", "https://example.com/b", "/out", "video")
+    journal.set_job_status("b", "done")
+    jobs = journal.unfinished_jobs()
+    assert [j["job_key"] for j in jobs] == ["a"]
+    # options that aren't JSON-serializable are left out
+    assert jobs[0]["options"] == {"delay": 2}
+
+
+def test_item_bookkeeping(journal, tmp_path):
+    part = tmp_path / "song.mp3.part"
+    part.write_bytes(b"x")
+    handle = journal.handle("a")
+    assert not handle.resumed
+    handle.pending(1, "https://example.com/1", "id1")
+    handle.finished(1, True)
+    handle.pending(2, "https://example.com/2", "id2")
+    handle.partial(2, str(part))
+    handle.pending(3, "https://example.com/3", None)
+
+    items = journal.items("a")
+    assert items[1]["state"] == ITEM_DONE
+    assert items[2]["state"] == ITEM_PARTIAL and items[2]["part_path"] == str(part)
+    assert items[3]["state"] == ITEM_PENDING
+
+    resumed = journal.handle("a")
+    assert resumed.resumed
+    assert resumed.is_done(1, "id1")
+    # matched by video ID, so a reordered playlist still skips it
+    assert resumed.is_done(7, "id1")
+    assert not resumed.is_done(2, "id2")
+    assert resumed.partial_path(2) == str(part)
+    assert resumed.partial_path(3) is None
+
+
+def test_partial_path_is_cleared(journal, tmp_path):
+    part = tmp_path / "song.mp3.part"
+    part.write_bytes(b"x")
+    handle = journal.handle("a")
+    handle.partial(1, str(part))
+    handle.finished(1, True)
+    assert journal.items("a")[1]["part_path"] is None
+
+
+def test_missing_part_file_is_ignored(journal, tmp_path):
+    journal.handle("a").partial(1, str(tmp_path / "gone.part"))
+    assert journal.handle("a").partial_path(1) is None
@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+from engine.media_store import MediaStore, media_key_from_url, media_variant
+from utils.kid3 import TagItem, apply_rules
+
+mutagen = pytest.importorskip("mutagen")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MediaStore(tmp_path / "media.sqlite3")
+    yield store
+    store.close()
+
+
+def _song(path, title="Artist - Song"):
+    from mutagen.id3 import ID3, TIT2
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\xff\xfb" + b"\x00" * 4096)
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=title))
+    # no padding, so every tag change changes the size
+    tags.save(str(path), padding=lambda info: 0)
+    return path
+
+
+def _album(path):
+    from mutagen.id3 import ID3
+
+    return [str(f.text[0]) for f in ID3(str(path)).getall("TALB")]
+
+
+def test_lookup_and_stale_records(store, tmp_path):
+    song = _song(tmp_path / "a" / "song.mp3")
+    store.add("youtube", "dQw4w9WgXcQ", "audio:0", str(song))
+    assert store.lookup("youtube", "dQw4w9WgXcQ", "audio:0") == str(song)
+    assert store.lookup("youtube", "dQw4w9WgXcQ", "audio:5") is None
+    with open(song, "ab") as f:
+        f.write(b"changed")
+    assert store.lookup("youtube", "dQw4w9WgXcQ", "audio:0") is None
+
+
+def test_other_extractors_dont_match(store, tmp_path):
+    video = tmp_path / "a" / "clip.mp4"
+    video.parent.mkdir()
+    video.write_bytes(b"\x00" * 1024)
+    store.add("vimeo", "123456", "video:best", str(video))
+    assert store.lookup("dailymotion", "123456", "video:best") is None
+    assert store.lookup("vimeo", "123456", "video:best") == str(video)
+
+
+def test_media_key_from_url():
+    assert media_key_from_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=1") == ("youtube", "dQw4w9WgXcQ")
+    assert media_key_from_url("https://youtu.be/dQw4w9WgXcQ") == ("youtube", "dQw4w9WgXcQ")
+    assert media_key_from_url("https://music.youtube.com/watch?v=dQw4w9WgXcQ") == ("youtube", "dQw4w9WgXcQ")
+    # no guessing from other sites' paths
+    assert media_key_from_url("https://example.com/videos/123456") is None
+    assert media_key_from_url("https://example.com/video/index.html") is None
+
+
+def test_music_is_not_hardlinked(store, tmp_path):
+    song = _song(tmp_path / "a" / "song.mp3")
+    store.add("youtube", "dQw4w9WgXcQ", media_variant("audio", "0"), str(song))
+    path, method = store.reuse("youtube", "dQw4w9WgXcQ", "audio:0", str(tmp_path / "b"), lambda ext: "copy" + ext)
+    assert method != "hardlink"
+    assert os.stat(song).st_nlink == 1
+    assert path == str(tmp_path / "b" / "copy.mp3")
+
+
+def test_video_is_hardlinked(store, tmp_path):
+    video = tmp_path / "a" / "clip.mp4"
+    video.parent.mkdir()
+    video.write_bytes(b"\x00" * 1024)
+    store.add("youtube", "dQw4w9WgXcQ", "video:best", str(video))
+    path, method = store.reuse("youtube", "dQw4w9WgXcQ", "video:best", str(tmp_path / "b"), lambda ext: "clip" + ext)
+    assert method == "hardlink"
+    assert os.path.samefile(path, video)
+
+
+def test_tagging_a_reused_file_keeps_the_original(store, tmp_path):
+    song = _song(tmp_path / "a" / "song.mp3")
+    apply_rules(TagItem(str(song), album="First", track=1), fetch_cover=False)
+    store.add("youtube", "dQw4w9WgXcQ", "audio:0", str(song))
+
+    path, _ = store.reuse("youtube", "dQw4w9WgXcQ", "audio:0", str(tmp_path / "b"), lambda ext: "song" + ext)
+    apply_rules(TagItem(path, album="Second", track=4), fetch_cover=False)
+    assert _album(path) == ["Second"]
+    assert _album(song) == ["First"]
+
+
+def test_tagging_unshares_a_hardlinked_file(tmp_path):
+    song = _song(tmp_path / "a" / "song.mp3")
+    apply_rules(TagItem(str(song), album="First"), fetch_cover=False)
+    linked = tmp_path / "b" / "song.mp3"
+    linked.parent.mkdir()
+    os.link(song, linked)
+
+    apply_rules(TagItem(str(linked), album="Second"), fetch_cover=False)
+    assert not os.path.samefile(song, linked)
+    assert _album(linked) == ["Second"]
+    assert _album(song) == ["First"]
+
+
+def test_tagged_file_is_still_reused(store, tmp_path, monkeypatch):
+    from controllers.music_controller import MusicController
+    from utils.kid3 import TagReport
+
+    monkeypatch.setattr("controllers.download_options.get_media_store", lambda: store)
+    monkeypatch.setattr("controllers.download_options.get_probe_cache", lambda *args: None)
+    song = _song(tmp_path / "a" / "song.mp3")
+    store.add("youtube", "dQw4w9WgXcQ", "audio:0", str(song))
+
+    # tagged after the download was indexed, as the music controller does
+    result = apply_rules(TagItem(str(song), album="First", track=1), fetch_cover=False)
+    assert result.changed
+    MusicController(config={}, queue=object())._on_tagged(TagReport([result]), False, "kid3", None)
+
+    assert store.lookup("youtube", "dQw4w9WgXcQ", "audio:0") == str(song)
+    path, _ = store.reuse("youtube", "dQw4w9WgXcQ", "audio:0", str(tmp_path / "b"), lambda ext: "song" + ext)
+    assert _album(path) == ["First"]
@@ -0,0 +1,37 @@
+from engine.downloader import _OrderedStatus
+
+
+def test_lines_come_out_in_playlist_order():
+    lines = []
+    status = _OrderedStatus(lines.append)
+    status.emit(2, "2a")
+    status.emit(1, "1a")
+    status.emit(3, "3a")
+    status.emit(2, "2b")
+    assert lines == ["1a"]
+    status.finish(1)
+    assert lines == ["1a", "2a", "2b"]
+    # the head streams straight through
+    status.emit(2, "2c")
+    assert lines[-1] == "2c"
+    status.finish(2)
+    assert lines == ["1a", "2a", "2b", "2c", "3a"]
+
+
+def test_items_finishing_out_of_order():
+    lines = []
+    status = _OrderedStatus(lines.append)
+    status.emit(3, "3a")
+    status.finish(3)
+    status.emit(2, "2a")
+    status.finish(2)
+    assert lines == []
+    status.skip(1)
+    assert lines == ["2a", "3a"]
+
+
+def test_no_callback():
+    status = _OrderedStatus(None)
+    status.emit(2, "ignored")
+    status.finish(1)
+    status.finish(2)
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from engine.pacing import HostPacer, RateLimiter, host_key, is_throttle_message
+
+
+def test_burst_then_interval():
+    pacer = HostPacer("example.com", min_interval=0.2, burst=2)
+    start = time.monotonic()
+    assert pacer.acquire()
+    assert pacer.acquire()
+    assert time.monotonic() - start < 0.1
+    assert pacer.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_no_interval_never_waits():
+    pacer = HostPacer("example.com")
+    start = time.monotonic()
+    for _ in range(50):
+        assert pacer.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def test_acquire_returns_false_when_stopped():
+    pacer = HostPacer("example.com", min_interval=30)
+    assert pacer.acquire()
+    stop = threading.Event()
+    stop.set()
+    assert pacer.acquire(stop) is False
+
+
+def test_throttle_blocks_and_slows_down():
+    pacer = HostPacer("example.com", min_interval=0.0)
+    pacer.report_throttle()
+    assert pacer.interval == 1.0
+    # 5 s backoff with +/-25% jitter
+    assert 3.5 <= pacer.backoff_remaining() <= 6.5
+    pacer.report_throttle()
+    assert pacer.interval == 2.0
+    assert pacer.backoff_remaining() >= 7.0
+
+
+def test_success_recovers_to_the_minimum():
+    pacer = HostPacer("example.com", min_interval=0.2)
+    pacer.report_throttle()
+    for _ in range(20):
+        pacer.report_success()
+    assert pacer.interval == 0.2
+    assert pacer.throttles == 1 and pacer.successes == 20
+
+
+def test_hosts_share_a_pacer():
+    assert host_key("https://www.youtube.com/watch?v=x") == "youtube.com"
+    assert host_key("https://music.youtube.com/playlist?list=x") == "youtube.com"
+    assert host_key("https://youtu.be/x") == "youtube.com"
+    limiter = RateLimiter()
+    assert limiter.pacer_for("https://youtu.be/x") is limiter.pacer_for("https://m.youtube.com/watch?v=y")
+    assert limiter.pacer_for("https://soundcloud.com/a") is not limiter.pacer_for("https://youtu.be/x")
+
+
+def test_throttle_messages():
+    assert is_throttle_message("ERROR: HTTP Error 429: Too Many Requests")
+    assert is_throttle_message("Sign in to confirm you're not a bot")
+    assert not is_throttle_message("[download]  42.0% of 3.00MiB")
+
+
+def test_min_interval_is_per_call():
+    pacer = HostPacer("example.com", burst=5)
+    start = time.monotonic()
+    assert pacer.acquire(min_interval=0.2)
+    # a job without a delay isn't held back by another job's delay
+    assert pacer.acquire()
+    assert time.monotonic() - start < 0.1
+    # the delayed job waits for its spacing after the host's last start
+    assert pacer.acquire(min_interval=0.2)
+    assert time.monotonic() - start >= 0.15
+    assert pacer.interval == 0.0
@@ -0,0 +1,81 @@
+import pytest
+
+from engine.downloader import PlaylistEntry
+from engine.playlist_monitor import MAX_ATTEMPTS, PlaylistMonitor
+
+URL = "https://www.youtube.com/playlist?list=PL1"
+
+
+def _entry(video_id):
+    return PlaylistEntry(url=f"https://www.youtube.com/watch?v={video_id}", video_id=video_id, extractor="youtube")
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    monitor = PlaylistMonitor(config={"music_output_dir": str(tmp_path)}, queue=object(),
+                              state_path=tmp_path / "monitor_state.json")
+    monitor.listing = [_entry("a" * 11)]
+    monitor.queued = []
+    monitor._probe = lambda url, items: (list(monitor.listing), len(monitor.listing))
+    monitor._queue_download = lambda url, out_dir, mode, finished_callback=None: monitor.queued.append(
+        (url, finished_callback)
+    )
+    return monitor
+
+
+def test_new_items_are_known_after_they_succeed(monitor):
+    assert monitor.check_playlist(URL) == 1          # baseline: the whole playlist
+    monitor.queued.clear()
+
+    monitor.listing.insert(0, _entry("b" * 11))
+    assert monitor.check_playlist(URL) == 1
+    # still downloading: not queued twice
+    assert monitor.check_playlist(URL) == 0
+
+    url, finished = monitor.queued[0]
+    finished(True)
+    assert "b" * 11 in monitor._state[URL]["known_ids"]
+    assert monitor.check_playlist(URL) == 0
+
+
+def test_failed_items_are_queued_again(monitor, tmp_path):
+    monitor.check_playlist(URL)
+    monitor.queued.clear()
+    monitor.listing.insert(0, _entry("b" * 11))
+    monitor.check_playlist(URL)
+    monitor.queued.pop()[1](False)
+    assert "b" * 11 not in monitor._state[URL]["known_ids"]
+
+    # also after a restart, and even when the item has left the checked window
+    monitor.listing.pop(0)
+    restarted = PlaylistMonitor(config=monitor.config, queue=object(), state_path=tmp_path / "monitor_state.json")
+    restarted._probe = monitor._probe
+    restarted._queue_download = monitor._queue_download
+    assert restarted.check_playlist(URL) == 1
+    assert monitor.queued[-1][0].endswith("b" * 11)
+
+
+def test_gives_up_after_max_attempts(monitor):
+    monitor.check_playlist(URL)
+    monitor.listing.insert(0, _entry("b" * 11))
+    for _ in range(MAX_ATTEMPTS):
+        monitor.queued.clear()
+        assert monitor.check_playlist(URL) == 1
+        monitor.queued[0][1](False)
+    assert "b" * 11 in monitor._state[URL]["known_ids"]
+    monitor.queued.clear()
+    assert monitor.check_playlist(URL) == 0
+
+
+def test_download_options_are_passed_to_the_controller(tmp_path):
+    class Controller:
+        def start_download(self, url, **kwargs):
+            self.kwargs = kwargs
+
+    monitor = PlaylistMonitor(config={"gotify_enabled": False}, queue=object(), state_path=tmp_path / "state.json",
+                              quality="720p", priority=3, send_notification=True)
+    controller = monitor._controllers["video"] = Controller()
+    monitor._queue_download("https://example.com/v", str(tmp_path), "video")
+    assert controller.kwargs["video_quality"] == "720p"
+    assert controller.kwargs["priority"] == 3
+    assert controller.kwargs["send_notification"] is True
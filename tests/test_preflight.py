@@ -0,0 +1,50 @@
+from utils.paths import BYTES_PER_SECOND, DiskSpacePreflight
+
+GB = 1024 ** 3
+
+
+def test_unlisted_items_count_at_the_average():
+    preflight = DiskSpacePreflight("/tmp", "video")
+    preflight.add(1, filesize_approx=1 * GB, playlist_count=4)
+    preflight.add(2, filesize_approx=3 * GB, playlist_count=4)
+    # two listed, two more expected at the 2 GB average
+    assert preflight.needed() == 8 * GB
+
+
+def test_finished_items_are_no_longer_needed():
+    preflight = DiskSpacePreflight("/tmp", "video")
+    preflight.add(1, filesize_approx=1 * GB)
+    preflight.add(2, filesize_approx=2 * GB)
+    preflight.done(1)
+    assert preflight.needed() == 2 * GB
+
+
+def test_skipped_items_are_not_estimated():
+    preflight = DiskSpacePreflight("/tmp", "video")
+    for idx in range(1, 10):
+        # archived, or done before a restart
+        preflight.skip(idx, playlist_count=10)
+    preflight.add(10, filesize_approx=int(12.5 * GB), playlist_count=10)
+    assert preflight.needed() == int(12.5 * GB)
+
+
+def test_audio_estimate_uses_the_duration():
+    preflight = DiskSpacePreflight("/tmp", "audio")
+    preflight.add(1, filesize_approx=500 * 1024 * 1024, duration=200)
+    assert preflight.needed() == int(200 * BYTES_PER_SECOND["audio"])
+
+
+def test_nothing_known_means_no_shortfall():
+    preflight = DiskSpacePreflight("/tmp", "video")
+    preflight.add(1)
+    assert preflight.needed() == 0
+    assert preflight.shortfall() is None
+
+
+def test_shortfall(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.paths.free_space", lambda path: 1 * GB)
+    preflight = DiskSpacePreflight(str(tmp_path), "video", reserve_bytes=512 * 1024 * 1024)
+    preflight.add(1, filesize_approx=GB // 4)
+    assert preflight.shortfall() is None
+    preflight.add(2, filesize_approx=GB // 2)
+    assert "Not enough disk space" in preflight.shortfall()
@@ -0,0 +1,49 @@
+import time
+
+from engine.probe_cache import ProbeCache, normalize_url
+
+ENTRIES = [{"video_id": "aaaaaaaaaaa"}, {"video_id": "bbbbbbbbbbb"}]
+
+
+def test_normalize_url():
+    assert normalize_url("https://www.youtube.com/playlist?list=PL1&si=abc") == "youtube:playlist:PL1"
+    assert normalize_url("https://music.youtube.com/playlist?list=PL1") == "youtube:playlist:PL1"
+    assert normalize_url("https://example.com/set/?utm_source=x&b=2&a=1") == "https://example.com/set?a=1&b=2"
+
+
+def test_ttl(tmp_path):
+    cache = ProbeCache(tmp_path / "probe_cache.json", ttl=60)
+    url = "https://www.youtube.com/playlist?list=PL1"
+    cache.put(url, ENTRIES)
+    record = cache.get(url)
+    assert cache.is_fresh(record)
+    assert cache.matches(record, 2, "aaaaaaaaaaa")
+    assert not cache.matches(record, 3, "aaaaaaaaaaa")
+
+    record["validated_at"] = time.time() - 120
+    assert not cache.is_fresh(record)
+    # a revalidated hit restarts the TTL
+    cache.record_hit(url, revalidated=True)
+    assert cache.is_fresh(cache.get(url))
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ProbeCache(tmp_path / "probe_cache.json", max_entries=2)
+    cache.put("https://example.com/a", ENTRIES)
+    cache.put("https://example.com/b", ENTRIES)
+    # a read makes "a" the most recently used
+    assert cache.get("https://example.com/a") is not None
+    cache.put("https://example.com/c", ENTRIES)
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a") is not None
+    assert cache.get("https://example.com/c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persisted(tmp_path):
+    path = tmp_path / "probe_cache.json"
+    ProbeCache(path).put("https://example.com/a", ENTRIES)
+    record = ProbeCache(path).get("https://example.com/a")
+    assert record["entries"] == ENTRIES
+    assert record["first_id"] == "aaaaaaaaaaa"
@@ -1,12 +1,55 @@
+import atexit
+import copy
 import os
 import json
-from pathlib import Path
+import tempfile
+import threading
+from typing import Callable, List
+
+from utils.paths import config_dir, default_output_dir
 
 
 class ConfigManager:
+    """
+    Process-wide config store.
+
+    ConfigManager() always returns the same instance, so config.json is read
+    once per process. Reads and writes are thread-safe. set() updates memory
+    immediately and schedules a write `save_delay` seconds later, so a burst
+    of changes (e.g. the Settings tab saving every field) is written once.
+    Writes go to a temp file that is fsynced and renamed over config.json, so
+    a crash mid-write leaves the previous file intact. Pending changes are
+    flushed at interpreter exit.
+
+    add_listener(callback) registers callback(key, value), called after a
+    value changes (from the thread that changed it).
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
     def __init__(self):
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()     # keeps snapshots written in order
+        self._listeners: List[Callable[[str, object], None]] = []
+        self._save_timer = None
+        self._dirty = False
+        self.save_delay = 0.5
+
         # Final end-user config location
-        self.config_dir = Path.home() / ".config" / "seadog"
+        self.config_dir = config_dir()
         self.config_file = self.config_dir / "config.json"
 
         # Default config with SAFE examples and explanations
@@ -14,21 +57,52 @@ class ConfigManager:
             "__help": {
                 "music_output_dir": "Default directory where downloaded music is saved",
                 "video_output_dir": "Default directory where downloaded videos are saved",
-                "open_kid3_after_download": "Automatically open Kid3 after music downloads complete",
+                "open_kid3_after_download": "Open Kid3 after music downloads for the files automatic tagging could not complete",
+                "auto_tag_music": "Tag finished music downloads: artist/title from the video title, album from the playlist name, track number, cover art",
                 "kid3_path": "Path to the kid3 executable (usually just 'kid3')",
-                "gotify_enabled": "Enable Gotify notifications",
+                "gotify_enabled": "Send Gotify notifications for downloads started in the background (followed playlists, resumed jobs); the tabs have their own checkbox",
                 "gotify_url": "Base URL of your Gotify server (example: https://gotify.example.com)",
                 "gotify_token": "Gotify application token",
-                "playlist_delay": "Delay in seconds between playlist items to avoid rate limits",
+                "playlist_delay": "Minimum seconds between item starts per site; grows automatically when the site rate-limits",
+                "max_concurrent_downloads": "How many playlist items to download at the same time",
+                "use_download_archive": "Skip items that were already downloaded to the same folder",
+                "media_store_enabled": "Link files already downloaded to another folder (same video and quality) instead of downloading them again",
+                "check_free_space": "Before and during a download, compare its estimated size with the free disk space and stop early if it won't fit",
+                "min_free_space_mb": "Disk space (MB) to leave free when checking whether a download fits",
+                "cookies_file": "cookies.txt (Netscape format) to use for every download, e.g. for members-only or age-restricted videos (empty = none)",
+                "cookies_from_browser": "Read cookies from a browser once per download instead: BROWSER[+KEYRING][:PROFILE][::CONTAINER], e.g. 'firefox' or 'chrome:Profile 1'",
+                "youtube_session_reuse": "Without cookies, share one cached YouTube guest session (visitor data) between downloads instead of starting one per item; skips the watch page, which can cost some formats and metadata",
+                "youtube_session_ttl": "Seconds a cached YouTube session is reused before a new one is started",
+                "youtube_po_token": "Optional YouTube PO token passed to yt-dlp (CLIENT.CONTEXT+TOKEN, e.g. 'web.gvs+...')",
+                "youtube_visitor_data": "Visitor data the PO token was created for (used instead of the cached session)",
+                "resume_interrupted_jobs": "Re-queue downloads that were interrupted when SeaDog last closed",
+                "metrics_textfile": "Write download metrics in Prometheus text format to this file after each job (empty disables)",
+                "log_enabled": "Write a JSON log to ~/.config/seadog/logs/seadog.log (rotated by size)",
+                "log_level": "Default log level: DEBUG, INFO, WARNING or ERROR",
+                "log_levels": "Per-subsystem levels (queue, downloader, ytdlp, tagging, monitor, session, notify); 'ytdlp': 'DEBUG' logs every yt-dlp output line",
+                "log_max_mb": "Size (MB) at which the log file is rotated",
+                "log_backup_count": "How many rotated log files to keep",
+                "max_concurrent_jobs": "How many queued downloads (URLs) may run at the same time",
+                "max_concurrent_audio_jobs": "Limit for simultaneous music jobs",
+                "max_concurrent_video_jobs": "Limit for simultaneous video jobs",
+                "probe_cache_ttl": "Seconds a playlist listing is reused before it is checked again (0 disables the cache)",
+                "probe_cache_size": "How many playlist listings to keep cached",
+                "download_engine": "'subprocess' runs yt-dlp per item; 'inprocess' reuses one yt-dlp instance per job",
+                "audio_postprocess": "'deferred' converts and tags music on a background process pool while the next items download; 'inline' lets yt-dlp do it per item",
+                "postprocess_workers": "Processes for deferred music conversion (0 = one per CPU core)",
+                "video_accelerated_download": "Download video fragments in parallel (and use aria2c if installed)",
+                "video_concurrent_fragments": "Fragments / connections per video in accelerated mode",
+                "video_use_aria2c": "Use aria2c as the downloader in accelerated mode when it is installed",
                 "playlist_monitor_enabled": "Enable automatic monitoring of followed playlists",
                 "playlist_monitor_interval": "How often (seconds) to check playlists for new content",
                 "follow_playlists": "Dictionary of playlist URLs to monitor"
             },
 
-            "music_output_dir": str(Path.home() / "Music"),
-            "video_output_dir": str(Path.home() / "Videos"),
+            "music_output_dir": default_output_dir("audio"),
+            "video_output_dir": default_output_dir("video"),
 
             "open_kid3_after_download": False,
+            "auto_tag_music": True,
             "kid3_path": "kid3",
 
             "gotify_enabled": False,
@@ -36,6 +110,36 @@ class ConfigManager:
             "gotify_token": "",
 
             "playlist_delay": 0,
+            "max_concurrent_downloads": 1,
+            "max_concurrent_jobs": 2,
+            "max_concurrent_audio_jobs": 1,
+            "max_concurrent_video_jobs": 1,
+            "download_engine": "subprocess",
+            "audio_postprocess": "inline",
+            "postprocess_workers": 0,
+            "probe_cache_ttl": 3600,
+            "probe_cache_size": 200,
+            "use_download_archive": True,
+            "media_store_enabled": True,
+            "check_free_space": True,
+            "min_free_space_mb": 500,
+            "cookies_file": "",
+            "cookies_from_browser": "",
+            "youtube_session_reuse": False,
+            "youtube_session_ttl": 21600,
+            "youtube_po_token": "",
+            "youtube_visitor_data": "",
+            "resume_interrupted_jobs": True,
+            "metrics_textfile": "",
+            "log_enabled": True,
+            "log_level": "INFO",
+            "log_levels": {"ytdlp": "WARNING"},
+            "log_max_mb": 10,
+            "log_backup_count": 5,
+
+            "video_accelerated_download": False,
+            "video_concurrent_fragments": 8,
+            "video_use_aria2c": True,
 
             "playlist_monitor_enabled": False,
             "playlist_monitor_interval": 60,
@@ -44,6 +148,7 @@ class ConfigManager:
 
         self.config = {}
         self.load_config()
+        atexit.register(self.flush)
 
     def load_config(self):
         """Load config or create it on first run. Merge new defaults safely."""
@@ -52,38 +157,128 @@ class ConfigManager:
 
         try:
             with open(self.config_file, "r", encoding="utf-8") as f:
-                self.config = json.load(f)
-        except (json.JSONDecodeError, OSError):
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError("config.json is not an object")
+        except (ValueError, OSError):
             # Corrupt or unreadable config → reset safely
-            self.config = self.default_config.copy()
+            with self._lock:
+                self.config = copy.deepcopy(self.default_config)
             self.save_config()
             return
 
         # Merge in any new default keys (future-proof)
         changed = False
         for key, value in self.default_config.items():
-            if key not in self.config:
-                self.config[key] = value
+            if key not in config:
+                config[key] = copy.deepcopy(value)
                 changed = True
 
+        with self._lock:
+            self.config = config
+
         if changed:
             self.save_config()
 
     def _create_default_config(self):
         """Create config directory and write default config."""
-        os.makedirs(self.config_dir, exist_ok=True)
-        with open(self.config_file, "w", encoding="utf-8") as f:
-            json.dump(self.default_config, f, indent=4)
+        self._write(self.default_config)
 
     def save_config(self):
-        """Persist config to disk."""
-        os.makedirs(self.config_dir, exist_ok=True)
-        with open(self.config_file, "w", encoding="utf-8") as f:
-            json.dump(self.config, f, indent=4)
+        """Persist config to disk now (cancels any pending debounced write)."""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                self._dirty = False
+                snapshot = copy.deepcopy(self.config)
+            self._write(snapshot)
+
+    def flush(self):
+        """Write pending changes, if any."""
+        with self._lock:
+            dirty = self._dirty
+        if dirty:
+            self.save_config()
 
     def get(self, key, default=None):
-        return self.config.get(key, default)
+        with self._lock:
+            return self.config.get(key, default)
 
     def set(self, key, value):
-        self.config[key] = value
-        self.save_config()
+        self.update({key: value})
+
+    def update(self, values: dict):
+        """Set several keys at once; listeners are called per changed key."""
+        changed = []
+        with self._lock:
+            for key, value in values.items():
+                if key in self.config and self.config[key] == value:
+                    continue
+                self.config[key] = value
+                changed.append((key, value))
+            if changed:
+                self._schedule_save()
+
+        for key, value in changed:
+            self._notify(key, value)
+
+    def add_listener(self, callback: Callable[[str, object], None]):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, object], None]):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # -----------------
+    # Internal helpers
+    # -----------------
+    def _schedule_save(self):
+        """Debounce: (re)start the write timer. Caller holds self._lock."""
+        self._dirty = True
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(self.save_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _notify(self, key, value):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(key, value)
+            except Exception:
+                pass
+
+    def _write(self, data: dict):
+        """Atomically replace config.json with `data` (temp file + fsync + rename)."""
+        os.makedirs(self.config_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=self.config_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.config_file)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        # Make the rename itself durable
+        try:
+            dir_fd = os.open(self.config_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
@@ -0,0 +1,13 @@
+"""
+Small text helpers shared by the engine, the CLI and the GUI.
+"""
+
+
+def format_size(num_bytes: float) -> str:
+    """Human-readable byte count, e.g. "12.3 MiB"."""
+    size = float(num_bytes)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -1,34 +1,216 @@
-import requests
+import queue
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+
 from utils.config import ConfigManager
+from utils.logging import get_logger
 
+_log = get_logger("notify")
 
-def send_gotify_notification(title: str, message: str):
+
+class GotifyNotifier:
     """
-    Used by downloads.
-    Silent, config-driven, no UI errors.
+    Background Gotify client.
+
+    notify() only enqueues and returns at once; a single worker thread sends
+    over one pooled requests.Session. Messages that arrive within
+    `coalesce_window` seconds of each other are merged into one summary
+    notification (50 item completions become one message). Failed sends are
+    retried with exponential backoff; client errors other than 429 are not
+    retried. Failures stay silent, like the original send_gotify_notification.
+    Without a gotify_url and gotify_token in the config, notifications are
+    dropped quietly (counted as skipped, not failed).
     """
-    config = ConfigManager()
 
-    url = config.get("gotify_url", "").rstrip("/")
-    token = config.get("gotify_token", "")
+    MAX_SUMMARY_LINES = 20
 
-    if not url or not token:
-        return
+    def __init__(
+        self,
+        coalesce_window: float = 2.0,      # seconds to wait for more messages
+        max_delay: float = 30.0,           # upper bound on holding back a summary
+        max_retries: int = 3,
+        backoff: float = 1.0,              # first retry delay, doubled each time
+        timeout: float = 10.0,
+        config=None,
+    ):
+        self.coalesce_window = coalesce_window
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.config = config or ConfigManager()
 
-    endpoint = f"{url}/message?token={token}"
+        self._queue: "queue.Queue[Optional[Tuple[str, str, int]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._stop_event = threading.Event()
+        self._pending = 0
+        self._pending_cond = threading.Condition()
 
-    payload = {
-        "title": title,
-        "message": message,
-        "priority": 5,
-    }
+        # counters
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.coalesced = 0
+
+    # -----------------
+    # Public API
+    # -----------------
+    def notify(self, title: str, message: str, priority: int = 5):
+        """Queue a notification. Never blocks on the network."""
+        self._ensure_worker()
+        with self._pending_cond:
+            self._pending += 1
+        self._queue.put((title, message, priority))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been sent (or given up on)."""
+        with self._pending_cond:
+            return self._pending_cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Send what is pending, then stop the worker and close the session."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+        self._stop_event.set()
+        with self._lock:
+            self._thread = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    # -----------------
+    # Worker
+    # -----------------
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._worker, name="seadog-gotify", daemon=True)
+                self._thread.start()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+
+            # Coalesce bursts: keep collecting until the queue is quiet
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while True:
+                wait = min(self.coalesce_window, deadline - time.monotonic())
+                if wait <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=wait)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            title, message, priority = self._summarize(batch)
+            self.coalesced += len(batch) - 1
+            endpoint = self._endpoint()
+            if endpoint is None:
+                # Gotify is not configured: nothing to deliver
+                self.skipped += 1
+            elif self._send_with_retries(*endpoint, title, message, priority):
+                self.sent += 1
+            else:
+                self.failed += 1
+                _log.warning("Gotify notification not delivered: %s", title)
 
-    try:
-        response = requests.post(endpoint, json=payload, timeout=10)
-        response.raise_for_status()
-    except Exception:
-        # Silent by design for background notifications
-        pass
+            with self._pending_cond:
+                self._pending -= len(batch)
+                self._pending_cond.notify_all()
+            if stop:
+                return
+
+    def _summarize(self, batch: List[Tuple[str, str, int]]) -> Tuple[str, str, int]:
+        if len(batch) == 1:
+            return batch[0]
+
+        priority = max(p for _, _, p in batch)
+        titles = {t for t, _, _ in batch}
+        title = f"{batch[0][0]} (x{len(batch)})" if len(titles) == 1 else f"SeaDog: {len(batch)} notifications"
+
+        lines = []
+        for t, m, _ in batch[:self.MAX_SUMMARY_LINES]:
+            lines.append(m if len(titles) == 1 else f"{t}: {m}")
+        if len(batch) > self.MAX_SUMMARY_LINES:
+            lines.append(f"... and {len(batch) - self.MAX_SUMMARY_LINES} more")
+        return title, "\n".join(lines), priority
+
+    def _endpoint(self) -> Optional[Tuple[str, str]]:
+        """(server URL, app token) from the config, or None if either is missing."""
+        url = (self.config.get("gotify_url", "") or "").strip().rstrip("/")
+        token = (self.config.get("gotify_token", "") or "").strip()
+        if not url or not token:
+            return None
+        return url, token
+
+    def _send_with_retries(self, url: str, token: str, title: str, message: str, priority: int) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                status = self._post(url, token, title, message, priority)
+            except Exception:
+                status = None
+            if status is not None and status < 400:
+                return True
+            # 4xx (bad token, bad request) will not get better; 429 might
+            if status is not None and 400 <= status < 500 and status != 429:
+                return False
+            if attempt < self.max_retries:
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.8, 1.2)
+                if self._stop_event.wait(delay):
+                    return False
+        return False
+
+    def _post(self, url: str, token: str, title: str, message: str, priority: int) -> int:
+        with self._lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            session = self._session
+        response = session.post(
+            f"{url}/message",
+            params={"token": token},
+            json={"title": title, "message": message, "priority": priority},
+            timeout=self.timeout,
+        )
+        return response.status_code
+
+
+_notifier: Optional[GotifyNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> GotifyNotifier:
+    """The process-wide GotifyNotifier."""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = GotifyNotifier()
+        return _notifier
+
+
+def send_gotify_notification(title: str, message: str):
+    """
+    Used by downloads.
+    Silent, config-driven, no UI errors. Returns immediately; the message is
+    sent (possibly merged with others) by the shared GotifyNotifier.
+    """
+    get_notifier().notify(title, message)
 
 
 def test_gotify_notification(title: str, message: str, url: str, token: str):
@@ -36,6 +218,8 @@ def test_gotify_notification(title: str, message: str, url: str, token: str):
     Used ONLY by the Settings tab test button.
     Loud, explicit, raises errors.
     """
+    import requests
+
     if not url or not token:
         raise ValueError("Gotify URL or token missing")
 
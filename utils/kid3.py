@@ -0,0 +1,333 @@
+"""
+Batch tagging of finished music downloads, with Kid3 for what is left.
+
+After a music job, every new file goes through a few rules on a thread pool
+(mutagen, in-process):
+
+- artist / title: "Artist - Title" video titles are split, noise such as
+  "(Official Video)" is dropped, and channel names ("X - Topic", "XVEVO")
+  are cleaned up when they are the only artist known
+- album: the playlist name
+- track: the playlist index ("3/40")
+- cover art: kept if embedded, else taken from a thumbnail next to the file
+  or downloaded from the video's thumbnail URL
+
+Tags the source already provided (a real artist, not just the uploader)
+are left alone. A file that is hardlinked elsewhere (older media store
+reuse) gets its own copy before it is written, so the other copy keeps
+its album and track number. A file fails when it still has no title, artist or cover
+afterwards; only those files are opened in Kid3.
+
+Usage (example):
+    from utils.kid3 import get_tagger, launch_kid3, tag_items
+
+    report = get_tagger().tag(tag_items(job.downloaded))
+    print(report.summary())
+    launch_kid3(report.failed_paths)
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from utils.logging import get_logger
+
+TAGGABLE_EXTENSIONS = (".mp3",)
+COVER_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+_SEPARATORS = (" - ", " – ", " — ")
+_TITLE_NOISE = re.compile(
+    r"\s*[(\[](?:official\s*)?(?:music\s*|lyrics?\s*|hd\s*|hq\s*|4k\s*)?"
+    r"(?:video|audio|visuali[sz]er|lyrics?|hd|hq|4k|video\s*clip|clip\s*officiel|video\s*oficial)[)\]]",
+    re.IGNORECASE,
+)
+_CHANNEL_SUFFIX = re.compile(r"(?:\s+-\s+topic|vevo|\s+official)$", re.IGNORECASE)
+
+_log = get_logger("tagging")
+
+
+@dataclass
+class TagItem:
+    path: str
+    title: Optional[str] = None          # source (video) title; default: the file's title tag
+    uploader: Optional[str] = None       # channel name, used to tell real artist tags from fallbacks
+    album: Optional[str] = None          # playlist name
+    track: Optional[int] = None          # playlist index
+    track_count: Optional[int] = None
+    cover_url: Optional[str] = None      # fetched if the file has no cover art
+
+
+@dataclass
+class TagResult:
+    path: str
+    ok: bool
+    changed: List[str] = field(default_factory=list)     # ID3 frames written
+    reason: Optional[str] = None                         # why the file needs Kid3
+
+
+@dataclass
+class TagReport:
+    results: List[TagResult]
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> List[TagResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def failed_paths(self) -> List[str]:
+        return [r.path for r in self.failed]
+
+    @property
+    def changed(self) -> int:
+        return sum(1 for r in self.results if r.changed)
+
+    def summary(self) -> str:
+        text = f"Tagged {self.changed} of {len(self.results)} file(s) in {self.seconds:.1f}s"
+        failed = len(self.failed)
+        return f"{text}; {failed} need review in Kid3." if failed else f"{text}."
+
+
+# -----------------
+# Rules
+# -----------------
+def clean_channel(name: Optional[str]) -> Optional[str]:
+    """"Artist - Topic" / "ArtistVEVO" -> "Artist"."""
+    if not name:
+        return None
+    return _CHANNEL_SUFFIX.sub("", name.strip()).strip() or None
+
+
+def split_artist_title(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """"Artist - Title (Official Video)" -> ("Artist", "Title"). Artist is None if there is no separator."""
+    text = _TITLE_NOISE.sub("", text or "").strip()
+    for separator in _SEPARATORS:
+        artist, found, title = text.partition(separator)
+        if found and artist.strip() and title.strip():
+            return artist.strip(), title.strip().strip("\"'“”")
+    return None, text or None
+
+
+def youtube_cover_url(video_id: Optional[str]) -> Optional[str]:
+    """Thumbnail URL of a YouTube video (None for other IDs)."""
+    if video_id and re.fullmatch(r"[A-Za-z0-9_-]{11}", video_id):
+        return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+    return None
+
+
+def tag_items(downloaded) -> List[TagItem]:
+    """TagItems for a job's engine.downloader.DownloadedItem list (files that can be tagged only)."""
+    items = []
+    for d in downloaded:
+        if not d.path.lower().endswith(TAGGABLE_EXTENSIONS):
+            continue
+        entry = d.entry
+        in_playlist = bool(entry.playlist) or (entry.playlist_count or 0) > 1
+        items.append(TagItem(
+            path=d.path,
+            title=entry.title,
+            uploader=entry.uploader,
+            album=entry.playlist if in_playlist else None,
+            track=d.item_index if in_playlist else None,
+            track_count=entry.playlist_count if in_playlist else None,
+            cover_url=youtube_cover_url(entry.video_id) if entry.extractor in (None, "youtube") else None,
+        ))
+    return items
+
+
+def apply_rules(item: TagItem, fetch_cover: bool = True) -> TagResult:
+    """Apply the tagging rules to one file and save it if anything changed."""
+    if not item.path.lower().endswith(TAGGABLE_EXTENSIONS):
+        return TagResult(item.path, False, reason="not an MP3 file")
+    try:
+        from mutagen.id3 import APIC, ID3, ID3NoHeaderError, TALB, TIT2, TPE1, TRCK
+
+        try:
+            tags = ID3(item.path)
+        except ID3NoHeaderError:
+            tags = ID3()
+
+        current_title = _text(tags, "TIT2")
+        current_artist = _text(tags, "TPE1")
+        artist, title = _artist_and_title(item, current_title, current_artist)
+
+        track = None
+        if item.track:
+            track = f"{item.track}/{item.track_count}" if item.track_count else str(item.track)
+        wanted = [(TIT2, title), (TPE1, artist), (TALB, item.album), (TRCK, track)]
+
+        changed = []
+        for frame, value in wanted:
+            if value and _text(tags, frame.__name__) != value:
+                tags.setall(frame.__name__, [frame(encoding=3, text=value)])
+                changed.append(frame.__name__)
+
+        missing = [name for name, value in (("title", title), ("artist", artist)) if not value]
+        if not tags.getall("APIC"):
+            cover = _find_cover(item, fetch_cover)
+            if cover is not None:
+                data, mime = cover
+                tags.setall("APIC", [APIC(encoding=3, mime=mime, type=3, desc="Cover (front)", data=data)])
+                changed.append("APIC")
+            else:
+                missing.append("cover art")
+
+        if changed:
+            _unshare(item.path)
+            tags.save(item.path, v2_version=3)
+        reason = f"no {', '.join(missing)}" if missing else None
+        return TagResult(item.path, not missing, changed, reason)
+    except Exception as e:
+        return TagResult(item.path, False, reason=str(e))
+
+
+def _artist_and_title(item: TagItem, current_title, current_artist):
+    split_artist, split_title = split_artist_title(item.title or current_title)
+    uploader = clean_channel(item.uploader)
+    # yt-dlp falls back to the uploader when the source has no artist metadata
+    fallback_artist = (
+        not current_artist
+        or current_artist == item.uploader
+        or clean_channel(current_artist) != current_artist
+    )
+    if split_artist and (fallback_artist or split_artist.casefold() == current_artist.casefold()):
+        return split_artist, split_title
+    if fallback_artist:
+        return clean_channel(current_artist) or uploader, current_title or split_title
+    return current_artist, current_title or split_title
+
+
+def _find_cover(item: TagItem, fetch: bool) -> Optional[Tuple[bytes, str]]:
+    root = os.path.splitext(item.path)[0]
+    for ext in COVER_EXTENSIONS:
+        if os.path.exists(root + ext):
+            with open(root + ext, "rb") as f:
+                return f.read(), "image/png" if ext == ".png" else "image/jpeg"
+    if not (fetch and item.cover_url):
+        return None
+    try:
+        import requests
+
+        response = requests.get(item.cover_url, timeout=10)
+        if response.ok and response.content:
+            return response.content, response.headers.get("Content-Type", "image/jpeg").split(";")[0]
+    except Exception:
+        pass
+    return None
+
+
+def _unshare(path: str):
+    """Replace a hardlinked file by a private copy (tags are written in place)."""
+    if os.stat(path).st_nlink < 2:
+        return
+    tmp = f"{path}.seadog-tag"
+    shutil.copy2(path, tmp)
+    os.replace(tmp, path)
+
+
+def _text(tags, frame_id: str) -> Optional[str]:
+    frames = tags.getall(frame_id)
+    if not frames or not frames[0].text:
+        return None
+    return str(frames[0].text[0]) or None
+
+
+# -----------------
+# Kid3
+# -----------------
+def launch_kid3(paths: List[str], kid3_path: str = "kid3") -> bool:
+    """Open Kid3 on the given files (or folders). Returns False if it could not be started."""
+    if not paths:
+        return False
+    try:
+        subprocess.Popen([kid3_path] + list(paths), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+    except OSError as e:
+        _log.warning("Failed to open Kid3: %s", e)
+        return False
+
+
+# -----------------
+# Pool
+# -----------------
+class BatchTagger:
+    """Thread pool that applies the tagging rules to whole jobs at a time."""
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers or min(8, (os.cpu_count() or 2) * 2)
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._batches: List[threading.Thread] = []
+
+    def tag(self, items: List[TagItem], fetch_cover: bool = True) -> TagReport:
+        """Tag every item (in parallel) and wait for the report."""
+        started = time.monotonic()
+        if not items:
+            return TagReport([], 0.0)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="seadog-tag")
+            pool = self._pool
+        results = list(pool.map(lambda item: apply_rules(item, fetch_cover), items))
+        report = TagReport(results, time.monotonic() - started)
+        _log.info(report.summary(), extra={"seconds": round(report.seconds, 3)})
+        for result in report.failed:
+            _log.warning("Needs tagging: %s", result.reason, extra={"path": result.path})
+        return report
+
+    def tag_async(self, items: List[TagItem], finished_callback: Callable[[TagReport], None]):
+        """Tag in the background; finished_callback(report) runs on a worker thread."""
+
+        def run():
+            try:
+                report = self.tag(items)
+            except RuntimeError:
+                # pool shut down (application exit)
+                return
+            try:
+                finished_callback(report)
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=run, name="seadog-tag-batch")
+        with self._lock:
+            self._batches = [t for t in self._batches if t.is_alive()] + [thread]
+        thread.start()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            batches, self._batches = self._batches, []
+        if wait:
+            for thread in batches:
+                thread.join()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_tagger: Optional[BatchTagger] = None
+_tagger_lock = threading.Lock()
+
+
+def get_tagger() -> BatchTagger:
+    """The process-wide BatchTagger."""
+    global _tagger
+    with _tagger_lock:
+        if _tagger is None:
+            _tagger = BatchTagger()
+        return _tagger
+
+
+def shutdown_tagger(wait: bool = True):
+    """Finish (or abandon) running batches at application exit."""
+    with _tagger_lock:
+        tagger = _tagger
+    if tagger is not None:
+        tagger.shutdown(wait=wait)
@@ -0,0 +1,181 @@
+"""
+Structured log files for post-mortems (overnight runs, headless daemons).
+
+Everything logs through the "seadog" logger tree, one child per subsystem:
+
+    seadog.queue        job lifecycle (queued, started, finished)
+    seadog.downloader   items, retries, rate limits, errors
+    seadog.ytdlp        raw yt-dlp output (DEBUG; "ERROR:" lines at WARNING)
+    seadog.tagging      batch tagging results
+    seadog.monitor      followed playlist checks
+    seadog.session      cookie profiles and cached YouTube sessions
+    seadog.notify       Gotify delivery failures
+
+Records are written as JSON lines with the job / item IDs they belong to,
+by a QueueListener thread, so logging call sites never wait on disk. Files
+rotate by size under ~/.config/seadog/logs/. Levels are set per subsystem
+in the config ("log_levels": {"ytdlp": "DEBUG"}).
+
+When logging is disabled the whole tree sits above CRITICAL, so a call
+costs one cached level check; hot paths hoist even that out of their loops.
+
+Usage (example):
+    from utils.logging import configure_logging, get_logger
+
+    configure_logging()                      # once, at startup (reads the config)
+    log = get_logger("downloader")
+    log.info("Item finished", extra={"job": 3, "item": 12, "video_id": "dQw4w9WgXcQ"})
+"""
+
+# this module is utils.logging; "logging" below is the standard library
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+ROOT_LOGGER = "seadog"
+LOG_FILE_NAME = "seadog.log"
+
+# extra={...} keys copied into the JSON record
+CONTEXT_FIELDS = ("job", "item", "video_id", "url", "path", "seconds", "bytes", "attempts", "status")
+
+_DISABLED = logging.CRITICAL + 1
+
+# until configure_logging() runs, records go nowhere (not to stderr via logging.lastResort)
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for one subsystem ("downloader", "queue", ...)."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def log_dir() -> Path:
+    from utils.paths import config_path
+    return config_path("logs")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and context fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+# -----------------
+# Setup
+# -----------------
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_configured_levels = set()
+_watching_config = False
+
+
+def configure_logging(config=None) -> bool:
+    """
+    (Re)apply the log settings from the config. Safe to call again when
+    they change. Returns True if logging is enabled.
+    """
+    global _watching_config
+    if config is None:
+        from utils.config import ConfigManager
+        config = ConfigManager()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.propagate = False
+    enabled = bool(config.get("log_enabled", True))
+
+    with _lock:
+        _stop_listener()
+        # subsystem levels would override the disabled root level
+        for name in _configured_levels:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        _configured_levels.clear()
+
+        if enabled:
+            try:
+                _start_listener(config)
+            except OSError:
+                enabled = False
+        if enabled:
+            root.setLevel(_level(config.get("log_level", "INFO"), logging.INFO))
+            for subsystem, level in (config.get("log_levels") or {}).items():
+                name = subsystem if subsystem.startswith(ROOT_LOGGER) else f"{ROOT_LOGGER}.{subsystem}"
+                logging.getLogger(name).setLevel(_level(level, logging.INFO))
+                _configured_levels.add(name)
+        else:
+            root.setLevel(_DISABLED)
+
+        if not _watching_config and hasattr(config, "add_listener"):
+            _watching_config = True
+            config.add_listener(_on_config_changed)
+            atexit.register(shutdown_logging)
+    return enabled
+
+
+def shutdown_logging():
+    """Write out queued records and close the log file."""
+    with _lock:
+        _stop_listener()
+
+
+def _start_listener(config):
+    global _listener, _queue_handler
+    directory = log_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        directory / LOG_FILE_NAME,
+        maxBytes=max(1, int(config.get("log_max_mb", 10))) * 1024 * 1024,
+        backupCount=max(0, int(config.get("log_backup_count", 5))),
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    records: "queue.SimpleQueue" = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, file_handler)
+    _listener.start()
+    logging.getLogger(ROOT_LOGGER).addHandler(_queue_handler)
+
+
+def _stop_listener():
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _on_config_changed(key, _value):
+    if key.startswith("log_"):
+        configure_logging()
+
+
+def _level(value, default: int) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    return level if isinstance(level, int) else default
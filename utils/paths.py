@@ -0,0 +1,185 @@
+"""
+Where SeaDog keeps and writes things, and whether the disk can take it.
+
+- config_dir() / config_path(): ~/.config/seadog and the files in it
+  (config, archive, journal, caches, logs), resolved once
+- resource_path(): bundled resources, inside a PyInstaller build (_MEIPASS)
+  or next to main.py when run from source
+- default_output_dir() / resolve_dir() / ensure_dir(): output folders with
+  "~" and $VARS expanded, created and checked for write access before a
+  job starts
+- DiskSpacePreflight: estimated size of a job (yt-dlp's filesize_approx,
+  else duration x a typical bitrate) against the free space of its output
+  folder, so a playlist that cannot fit fails at once instead of filling
+  the disk halfway through
+
+Usage (example):
+    from utils.paths import DiskSpacePreflight, ensure_dir
+
+    out_dir = ensure_dir("~/Music/Mixes")
+    preflight = DiskSpacePreflight(out_dir, "audio", reserve_bytes=500 * 1024 * 1024)
+    preflight.add(1, duration=215, playlist_count=40)
+    problem = preflight.shortfall()          # None, or "Not enough disk space: ..."
+"""
+
+import functools
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.formatting import format_size
+
+# typical output bytes per second of media, for items without a size estimate
+# (audio: VBR V0 MP3 plus the source stream during conversion; video: 1080p)
+BYTES_PER_SECOND = {"audio": 40_000, "video": 625_000}
+
+_OUTPUT_DIRS = {"audio": "Music", "video": "Videos"}
+
+
+# -----------------
+# Application paths
+# -----------------
+@functools.lru_cache(maxsize=None)
+def config_dir() -> Path:
+    """~/.config/seadog (not created here)."""
+    return Path.home() / ".config" / "seadog"
+
+
+def config_path(name: str) -> Path:
+    """A file (or folder) inside config_dir()."""
+    return config_dir() / name
+
+
+@functools.lru_cache(maxsize=None)
+def _resource_base() -> str:
+    # PyInstaller unpacks bundled files to a temp dir and records it in sys._MEIPASS
+    base = getattr(sys, "_MEIPASS", None)
+    if base:
+        return base
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def resource_path(relative_path: str) -> str:
+    """Absolute path of a bundled resource; works from source and in PyInstaller builds."""
+    return os.path.join(_resource_base(), relative_path)
+
+
+def default_output_dir(mode: str) -> str:
+    """~/Music for audio, ~/Videos for video."""
+    return str(Path.home() / _OUTPUT_DIRS.get(mode, "Music"))
+
+
+# -----------------
+# Output folders
+# -----------------
+@functools.lru_cache(maxsize=256)
+def resolve_dir(path: str) -> str:
+    """Absolute form of a user-entered folder ("~" and $VARS expanded, symlinks kept)."""
+    return os.path.abspath(os.path.expandvars(os.path.expanduser(path.strip())))
+
+
+def ensure_dir(path: str) -> str:
+    """
+    Resolve a folder, create it if needed and check that it is writable.
+    Returns the resolved path; raises OSError with a readable message otherwise.
+    """
+    resolved = resolve_dir(path)
+    os.makedirs(resolved, exist_ok=True)
+    if not os.access(resolved, os.W_OK | os.X_OK):
+        raise PermissionError(f"Output folder is not writable: {resolved}")
+    return resolved
+
+
+def free_space(path: str) -> int:
+    """Free bytes on the filesystem holding `path` (or its nearest existing parent)."""
+    path = resolve_dir(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path).free
+
+
+# -----------------
+# Free-space preflight
+# -----------------
+def estimate_item_bytes(mode: str, filesize_approx: Optional[int] = None, duration: Optional[float] = None) -> Optional[int]:
+    """Expected size of one item's output, or None if nothing is known about it."""
+    if mode == "audio" and duration:
+        # filesize_approx describes the best video+audio format, far above an MP3
+        return int(duration * BYTES_PER_SECOND["audio"])
+    if filesize_approx:
+        return int(filesize_approx)
+    if duration:
+        return int(duration * BYTES_PER_SECOND.get(mode, BYTES_PER_SECOND["video"]))
+    return None
+
+
+class DiskSpacePreflight:
+    """
+    Running estimate of the space a job still needs. Items are added as the
+    playlist listing arrives and removed when they finish (their bytes are
+    on disk by then); items not listed yet count at the average size of the
+    listed ones. shortfall() compares the estimate with the free space.
+    """
+
+    def __init__(self, out_dir: str, mode: str, reserve_bytes: int = 0):
+        self.out_dir = out_dir
+        self.mode = mode
+        self.reserve_bytes = max(0, int(reserve_bytes))
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = {}
+        self._known_total = 0
+        self._known_count = 0
+        self._listed = 0
+        self._expected = 0
+
+    def add(self, item_index: int, filesize_approx=None, duration=None, playlist_count=None):
+        estimate = estimate_item_bytes(self.mode, filesize_approx, duration)
+        with self._lock:
+            self._listed += 1
+            self._expected = max(self._expected, int(playlist_count or 0), self._listed)
+            if estimate is not None:
+                self._pending[item_index] = estimate
+                self._known_total += estimate
+                self._known_count += 1
+
+    def skip(self, item_index: int, playlist_count=None):
+        """Count a listed item that will not be downloaded (archived, done before a restart)."""
+        with self._lock:
+            self._listed += 1
+            self._expected = max(self._expected, int(playlist_count or 0), self._listed)
+
+    def done(self, item_index: int):
+        with self._lock:
+            self._pending.pop(item_index, None)
+
+    def needed(self) -> int:
+        """Estimated bytes the rest of the job will still write."""
+        with self._lock:
+            if not self._known_count:
+                return 0
+            average = self._known_total / self._known_count
+            unlisted = self._expected - self._listed
+            return int(sum(self._pending.values()) + average * unlisted)
+
+    def shortfall(self) -> Optional[str]:
+        """A message if the job is not expected to fit, else None."""
+        needed = self.needed()
+        if not needed:
+            return None
+        try:
+            free = free_space(self.out_dir)
+        except OSError:
+            return None
+        if needed + self.reserve_bytes <= free:
+            return None
+        return (
+            f"Not enough disk space: this download needs about {format_size(needed)}, "
+            f"{format_size(free)} is free in {self.out_dir}"
+            + (f" (keeping {format_size(self.reserve_bytes)} spare)." if self.reserve_bytes else ".")
+        )